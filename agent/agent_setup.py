@@ -1,37 +1,51 @@
-from langchain import hub
-from langchain.agents import create_structured_chat_agent, AgentExecutor
+import os
+import threading
+from collections import OrderedDict
+
+from langchain.agents import create_structured_chat_agent, create_tool_calling_agent, AgentExecutor
 from langchain.memory import ConversationBufferMemory
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from openai import APITimeoutError
 
 from agent.agent_wrapper import GitHubChatLLM
+from agent.answer_cache import AnswerCacheExecutor, ANSWER_CACHE_ENABLED
+from agent.cascade import cascade_llm, CASCADE_ENABLED
+from agent.fast_router import FastPathExecutor
+from agent.parallel_executor import ParallelToolExecutor
+from agent.prompts import load_agent_prompt, tool_calling_prompt
+from agent.tool_selector import tool_selector, DEFAULT_TOP_K
 from models.model_enum import ModelName
+from tools.deadline import DeadlineExceeded, deadline_scope
 from tools.tool_registry import tools
 
-# System instruction
-initial_message = """You are a smart and helpful AI assistant designed to provide factual, real-time and relevant answers to user queries by using specialized tools when necessary.
-
-You have access to the following tools:
-
-1. **Time** — Use this to tell the current time.
-2. **Wikipedia** — Use this to look up general knowledge, people, places or concepts.
-3. **Google Search** — Use this when up-to-date, trending, or real-time information is needed such as news, events, or uncommon facts not found in Wikipedia.
-4. **Stock Checker** — Use this to find real-time stock prices using ticker symbols like "AAPL" or "TSLA".
-5. **Weather** — Use this to check the current weather of a city. Input should be a city name like "Mumbai" or "New York", or use IP detection if available.
-6. **Currency Converter** — Use this to convert between currencies, like "100 USD to INR".
-7. **YouTube Video Search** — Use this to find recent YouTube videos about a person, topic, or event.
-8. **E-commerce Product Search** — Use this tool to find and recommend real product listings (phones, earbuds, laptops, etc.) from Amazon and Flipkart. Prefer this over generic search for shopping-related questions. 
-                                    Also include product names **along with clickable links** if applicable. 
-9. **Indian Holiday Lookup** — Use this to check if a specific date is a public holiday in India, or to see upcoming Indian holidays.
-10. **Train Live Status Checker** — Use this to get the live running status of a train. Input should be a valid train number like "12951".
-11. **PNR Status Checker** — Use this to check Indian Railways PNR status using a 10-digit PNR number like "1234567890".
-12. **Flight Status Checker** — Use this to get the current status of a flight using its IATA flight code, e.g. "AI101" or "UA246".
-13. **FD Rates Checker** — Use this to fetch the latest fixed deposit interest rates from BankBazaar. Always show rates from other banks as well if available.
-14. **Recharge Plan Search** — Use this to fetch real-time prepaid recharge plans for telecom operators like Airtel, Jio, VI via trusted sources.
-
-**Instructions:**
+# System instruction, assembled from the tools actually offered to the agent so a
+# trimmed tool subset also gets a trimmed catalogue.
+ASSISTANT_INTRO = "You are a smart and helpful AI assistant designed to provide factual, real-time and relevant answers to user queries by using specialized tools when necessary."
+
+TOOL_GUIDANCE = {
+    "Time": "Use this to tell the current time.",
+    "Wikipedia": "Use this to look up general knowledge, people, places or concepts.",
+    "Google Search": "Use this when up-to-date, trending, or real-time information is needed such as news, events, or uncommon facts not found in Wikipedia.",
+    "Stock Price Checker": "Use this to find real-time stock prices using ticker symbols like \"AAPL\" or \"TSLA\". Ask for several tickers in one call, like \"AAPL, MSFT and TSLA\".",
+    "Weather": "Use this to check the current weather of a city. Input should be a city name like \"Mumbai\" or \"New York\", or use IP detection if available.",
+    "Currency Converter": "Use this to convert between currencies, like \"100 USD to INR\". Convert to several currencies in one call, like \"100 USD to INR, EUR and GBP\".",
+    "YouTube Video Search": "Use this to find recent YouTube videos about a person, topic, or event.",
+    "E-commerce Product Search": """Use this tool to find and recommend real product listings (phones, earbuds, laptops, etc.) from Amazon and Flipkart. Prefer this over generic search for shopping-related questions. 
+                                    Also include product names **along with clickable links** if applicable. """,
+    "Indian Holiday Lookup": "Use this to check if a specific date is a public holiday in India, or to see upcoming Indian holidays.",
+    "Train Live Status Checker": "Use this to get the live running status of a train. Input should be a valid train number like \"12951\".",
+    "PNR Status Checker": "Use this to check Indian Railways PNR status using a 10-digit PNR number like \"1234567890\".",
+    "Flight Status Checker": "Use this to get the current status of a flight using its IATA flight code, e.g. \"AI101\" or \"UA246\".",
+    "FD Rates Checker": "Use this to fetch the latest fixed deposit interest rates from BankBazaar. Always show rates from other banks as well if available.",
+    "Recharge Plan Search": "Use this to fetch real-time prepaid recharge plans for telecom operators like Airtel, Jio, VI via trusted sources.",
+}
+
+ASSISTANT_INSTRUCTIONS = """**Instructions:**
 - Always try to reason and think before answering.
 - Use tools when your own knowledge may be outdated, limited or unreliable.
 - If a tool provides the answer, summarize it clearly and naturally.
+- Some tools return compact JSON records; present their contents as readable text with clickable links, never as raw JSON.
 - If you're unsure or a tool fails, be honest and graceful about your limitations.
 - Never fabricate information if you're uncertain.
 - If someone asks **"Who created you?"** or **"Who made you?"**, respond with: *"I was created by Md Zeeshan, a dedicated AI Engineer with a passion for building intelligent AI systems."*
@@ -39,24 +53,198 @@ You have access to the following tools:
 Your goal is to act as a reliable, real-time AI assistant capable of both reasoning and research.
 """
 
-# Default prompt (reused)
-prompt = hub.pull("hwchase17/structured-chat-agent")
+PARALLEL_TOOLS_INSTRUCTION = "- When a question needs several independent lookups, request all of those tool calls at once in a single response."
+
+
+def build_system_message(tool_list, parallel_tools: bool = False) -> str:
+    catalogue = "\n".join(
+        f"{i}. **{tool.name}** — {TOOL_GUIDANCE.get(tool.name, tool.description)}"
+        for i, tool in enumerate(tool_list, 1)
+    )
+    instructions = ASSISTANT_INSTRUCTIONS
+    if parallel_tools:
+        instructions = instructions.replace("\n\nYour goal", f"\n{PARALLEL_TOOLS_INSTRUCTION}\n\nYour goal", 1)
+    return f"{ASSISTANT_INTRO}\n\nYou have access to the following tools:\n\n{catalogue}\n\n{instructions}"
+
+
+initial_message = build_system_message(tools)
+
+# Default prompt (reused); bundled locally, set ZEENOVA_REFRESH_PROMPT=1 to pull from the Hub
+prompt = load_agent_prompt()
+
+# "tool_calling": native chat-completions tool calls, several per model response,
+# run concurrently. "structured_chat": the ReAct-style JSON-in-text agent.
+AGENT_MODES = ("tool_calling", "structured_chat")
+AGENT_MODE = os.getenv("ZEENOVA_AGENT_MODE", "structured_chat")
+
+# Process-wide registry of compiled agents, keyed by (model, tool subset). The LLM
+# (and its pooled client), tools and prompt never change per session, so they are
+# built once and shared; only the conversation memory is bound per session.
+# Bounded LRU, since per-query tool subsets can produce many combinations.
+MAX_COMPILED_AGENTS = int(os.getenv("MAX_COMPILED_AGENTS", "64"))
+
+# End-to-end budget for one turn (LLM calls and tool calls together); 0 disables it
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "45"))
+TURN_TIMEOUT_MESSAGE = "⏱️ Sorry, that took longer than expected and I had to stop. Please try again in a moment."
+
+_agents = OrderedDict()
+_agents_lock = threading.Lock()
+
+
+def _select_tools(tool_names) -> list:
+    if tool_names is None:
+        return tools
+    wanted = set(tool_names)
+    return [tool for tool in tools if tool.name in wanted]
+
+
+def _agent_prompt(tool_list) -> ChatPromptTemplate:
+    # The assistant instructions go right after the structured-chat system message,
+    # ahead of the conversation history
+    return ChatPromptTemplate.from_messages([
+        prompt.messages[0],
+        SystemMessage(content=build_system_message(tool_list)),
+        *prompt.messages[1:],
+    ])
+
 
-# Exportable factory for dynamic executor with persistent memory
-def get_agent_executor(model_enum: ModelName, memory: ConversationBufferMemory):
-    # Add system message only if memory is new
-    if not memory.chat_memory.messages:
-        memory.chat_memory.add_message(SystemMessage(content=initial_message))
+def get_agent_runnable(model_enum: ModelName, tool_names=None, mode: str = AGENT_MODE, cascade: bool = False):
+    """
+    Compiled agent for `model_enum` offering `tool_names` (all tools when None).
+    With cascade=True tool-routing steps run on a mini model (see agent/cascade.py).
+    """
+    if mode not in AGENT_MODES:
+        raise ValueError(f"Unknown agent mode {mode!r}; expected one of {AGENT_MODES}")
+    key = (model_enum, None if tool_names is None else frozenset(tool_names), mode, cascade)
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return agent
 
-    llm = GitHubChatLLM(model=model_enum.value, temperature=0.3)
-    agent = create_structured_chat_agent(llm=llm, tools=tools, prompt=prompt)
+    tool_list = _select_tools(tool_names)
+    if cascade:
+        llm = cascade_llm(model_enum, [tool.name for tool in tool_list], structured=mode == "structured_chat")
+    else:
+        llm = GitHubChatLLM(model=model_enum.value, temperature=0.3)
+    if mode == "tool_calling":
+        agent_prompt = tool_calling_prompt(build_system_message(tool_list, parallel_tools=True))
+        agent = create_tool_calling_agent(llm=llm, tools=tool_list, prompt=agent_prompt)
+    else:
+        agent = create_structured_chat_agent(llm=llm, tools=tool_list, prompt=_agent_prompt(tool_list))
 
-    return AgentExecutor.from_agent_and_tools(
-        agent=agent,
-        tools=tools,
+    with _agents_lock:
+        agent = _agents.setdefault(key, agent)
+        _agents.move_to_end(key)
+        while len(_agents) > MAX_COMPILED_AGENTS:
+            _agents.popitem(last=False)
+    return agent
+
+
+def _build_executor(model_enum: ModelName, memory: ConversationBufferMemory, tool_names=None,
+                    mode: str = AGENT_MODE, cascade: bool = False) -> AgentExecutor:
+    executor_class = ParallelToolExecutor if mode == "tool_calling" else AgentExecutor
+    return executor_class.from_agent_and_tools(
+        agent=get_agent_runnable(model_enum, tool_names, mode, cascade),
+        tools=_select_tools(tool_names),
         memory=memory,
         verbose=True,
         handle_parsing_errors=True,
     )
 
-__all__ = ["get_agent_executor"]
\ No newline at end of file
+
+class ToolSubsetExecutor:
+    """
+    Picks the few tools relevant to each query (see agent/tool_selector.py) and runs
+    an AgentExecutor that only knows about those, so the prompt carries a short
+    tool catalogue instead of all of them.
+    """
+
+    def __init__(self, model_enum: ModelName, memory: ConversationBufferMemory, top_k: int = DEFAULT_TOP_K,
+                 mode: str = AGENT_MODE, cascade: bool = False):
+        self.model_enum = model_enum
+        self.memory = memory
+        self.top_k = top_k
+        self.mode = mode
+        self.cascade = cascade
+        self.last_tool_names = ()
+
+    def _history_hint(self) -> str:
+        # The previous question helps with follow-ups like "and in Delhi?"
+        for message in reversed(self.memory.chat_memory.messages):
+            if isinstance(message, HumanMessage):
+                return str(message.content)
+        return ""
+
+    def executor_for(self, query: str) -> AgentExecutor:
+        self.last_tool_names = tool_selector.select(query, self._history_hint(), self.top_k)
+        return _build_executor(self.model_enum, self.memory, self.last_tool_names, self.mode, self.cascade)
+
+    def invoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        return self.executor_for(inputs["input"]).invoke(inputs, config=config, **kwargs)
+
+    async def ainvoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        return await self.executor_for(inputs["input"]).ainvoke(inputs, config=config, **kwargs)
+
+
+class TurnDeadlineExecutor:
+    """
+    Runs each turn under a deadline (see tools/deadline.py). Every LLM request and
+    tool call inside the turn shares the budget; when it runs out the user gets a
+    short apology instead of a hung request.
+    """
+
+    def __init__(self, agent_executor, seconds: float = TURN_DEADLINE_SECONDS):
+        self.agent_executor = agent_executor
+        self.seconds = seconds
+
+    def __getattr__(self, name):
+        return getattr(self.agent_executor, name)
+
+    def _timed_out(self, inputs: dict) -> dict:
+        memory = self.agent_executor.memory
+        if memory is not None:
+            memory.save_context({"input": inputs["input"]}, {"output": TURN_TIMEOUT_MESSAGE})
+        return {**inputs, "output": TURN_TIMEOUT_MESSAGE, "deadline_exceeded": True}
+
+    def invoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        with deadline_scope(self.seconds):
+            try:
+                return self.agent_executor.invoke(inputs, config=config, **kwargs)
+            except (DeadlineExceeded, APITimeoutError):
+                return self._timed_out(inputs)
+
+    async def ainvoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        with deadline_scope(self.seconds):
+            try:
+                return await self.agent_executor.ainvoke(inputs, config=config, **kwargs)
+            except (DeadlineExceeded, APITimeoutError):
+                return self._timed_out(inputs)
+
+
+# Exportable factory for dynamic executor with persistent memory.
+# With fast_path=True, trivial single-tool queries are answered without the LLM
+# (see agent/fast_router.py) and everything else goes to the agent.
+# tool_top_k limits the agent to the most relevant tools per query; None offers all.
+# turn_deadline bounds each turn end to end, in seconds; 0 or None disables it.
+# agent_mode picks native tool calling (default) or the structured-chat agent.
+# With answer_cache=True, repeated history-independent questions are answered
+# from the final-answer cache (see agent/answer_cache.py).
+# With cascade=True intermediate tool-routing steps run on the mini model of the
+# family and only final answers on `model_enum` (see agent/cascade.py).
+def get_agent_executor(model_enum: ModelName, memory: ConversationBufferMemory, fast_path: bool = True,
+                       tool_top_k: int = DEFAULT_TOP_K, turn_deadline: float = TURN_DEADLINE_SECONDS,
+                       agent_mode: str = AGENT_MODE, answer_cache: bool = ANSWER_CACHE_ENABLED,
+                       cascade: bool = CASCADE_ENABLED):
+    if tool_top_k:
+        executor = ToolSubsetExecutor(model_enum, memory, top_k=tool_top_k, mode=agent_mode, cascade=cascade)
+    else:
+        executor = _build_executor(model_enum, memory, mode=agent_mode, cascade=cascade)
+    if fast_path:
+        executor = FastPathExecutor(executor)
+    if answer_cache:
+        executor = AnswerCacheExecutor(executor, model_enum)
+    return TurnDeadlineExecutor(executor, turn_deadline) if turn_deadline else executor
+
+__all__ = ["get_agent_executor", "get_agent_runnable", "build_system_message", "ToolSubsetExecutor", "TurnDeadlineExecutor",
+           "AGENT_MODE"]
@@ -1,49 +1,336 @@
 import os
+import json
+import threading
 
 from langchain_core.runnables import RunnableSerializable
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.runnables.config import (
+    ensure_config,
+    get_callback_manager_for_config,
+    get_async_callback_manager_for_config,
+)
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.output_parsers.openai_tools import parse_tool_call, make_invalid_tool_call
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_core.prompt_values import PromptValue
 from pydantic import BaseModel, PrivateAttr
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, RateLimitError
+
+from models.model_enum import FALLBACK_MODELS
+from tools.deadline import clamp_timeout, remaining
+from tools.rate_limiter import quota_scheduler
+
+GITHUB_MODELS_BASE_URL = os.getenv("GITHUB_MODELS_BASE_URL", "https://models.github.ai/inference")
+# Per-request cap; inside a turn it is further shrunk to the turn's remaining budget
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Switch to the cheaper model of the family when the requested one is rate limited
+MODEL_FALLBACK_ENABLED = os.getenv("MODEL_FALLBACK", "1").lower() not in ("0", "false", "no")
+_FALLBACK_MODEL_IDS = {model.value: fallback.value for model, fallback in FALLBACK_MODELS.items()}
+
+
+def _to_langchain_messages(input) -> list:
+    if isinstance(input, PromptValue):
+        return input.to_messages()
+    if isinstance(input, dict) and "messages" in input:
+        return input["messages"]
+    if isinstance(input, list) and all(isinstance(m, BaseMessage) for m in input):
+        return input
+    return [
+        SystemMessage(content="You are a helpful assistant."),
+        HumanMessage(content=str(input)),
+    ]
+
+
+def _to_openai_messages(messages: list) -> list:
+    """Converts LangChain messages into chat completion messages."""
+    converted = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            converted.append({"role": "user", "content": msg.content})
+        elif isinstance(msg, SystemMessage):
+            converted.append({"role": "system", "content": msg.content})
+        elif isinstance(msg, AIMessage):
+            message = {"role": "assistant", "content": msg.content}
+            if msg.tool_calls:
+                message["content"] = msg.content or None
+                message["tool_calls"] = [
+                    {"id": call["id"], "type": "function",
+                     "function": {"name": call["name"], "arguments": json.dumps(call["args"], ensure_ascii=False)}}
+                    for call in msg.tool_calls
+                ]
+            converted.append(message)
+        elif isinstance(msg, ToolMessage):
+            converted.append({"role": "tool", "tool_call_id": msg.tool_call_id, "content": str(msg.content)})
+    return converted
+
+
+def _ai_message(message) -> AIMessage:
+    """Chat completion message -> AIMessage, with any tool calls parsed."""
+    tool_calls, invalid_tool_calls = [], []
+    for raw in message.tool_calls or []:
+        raw = raw.model_dump()
+        try:
+            tool_calls.append(parse_tool_call(raw, return_id=True))
+        except Exception as e:
+            invalid_tool_calls.append(make_invalid_tool_call(raw, str(e)))
+    return AIMessage(content=message.content or "", tool_calls=tool_calls, invalid_tool_calls=invalid_tool_calls)
+
+
+# One pooled OpenAI/AsyncOpenAI client pair per (endpoint, token) for the whole
+# process, so every session and model shares the same warm connections.
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_clients(base_url: str, api_key: str):
+    key = (base_url, api_key)
+    clients = _shared_clients.get(key)
+    if clients is None:
+        with _shared_clients_lock:
+            clients = _shared_clients.get(key)
+            if clients is None:
+                clients = _shared_clients[key] = (
+                    OpenAI(base_url=base_url, api_key=api_key),
+                    AsyncOpenAI(base_url=base_url, api_key=api_key),
+                )
+    return clients
+
+
+def _token_usage(usage) -> dict:
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "total_tokens": usage.total_tokens or 0,
+    }
+
+
+def _chunk_message(delta):
+    """Stream delta -> AIMessageChunk; tool call fragments are merged by index."""
+    tool_call_chunks = [
+        {"index": call.index, "id": call.id,
+         "name": call.function.name if call.function else None,
+         "args": call.function.arguments if call.function else None}
+        for call in delta.tool_calls or []
+    ]
+    if not delta.content and not tool_call_chunks:
+        return None
+    return AIMessageChunk(content=delta.content or "", tool_call_chunks=tool_call_chunks)
+
+
+def _final_message(full: AIMessageChunk) -> AIMessage:
+    return AIMessage(content=full.content, tool_calls=full.tool_calls, invalid_tool_calls=full.invalid_tool_calls)
+
+
+def _llm_result(message: AIMessage, model: str, usage=None) -> LLMResult:
+    # token_usage follows the llm_output convention of LangChain's OpenAI models,
+    # so usage-aware callback handlers can read it
+    return LLMResult(
+        generations=[[ChatGeneration(message=message)]],
+        llm_output={"token_usage": _token_usage(usage), "model_name": model},
+    )
+
 
 # Custom wrapper to make GitHub OpenAI model usable with LangChain
 class GitHubChatLLM(RunnableSerializable, BaseModel):
     model: str = "openai/gpt-4.1"
     temperature: float = 0.3
     max_tokens: int = 1024
+    allow_fallback: bool = MODEL_FALLBACK_ENABLED
 
     # Use PrivateAttr for objects that shouldn't be serialized
     _client: OpenAI = PrivateAttr()
+    _async_client: AsyncOpenAI = PrivateAttr()
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._client = OpenAI(
-            base_url="https://models.github.ai/inference",
-            api_key=os.environ["GITHUB_TOKEN"]
-        )
+        self._client, self._async_client = get_shared_clients(GITHUB_MODELS_BASE_URL, os.environ["GITHUB_TOKEN"])
+
+    @property
+    def _serialized(self) -> dict:
+        return {"id": ["agent", "agent_wrapper", "GitHubChatLLM"], "name": "GitHubChatLLM", "kwargs": {"model": self.model}}
+
+    def bind_tools(self, tools: list, tool_choice=None, parallel_tool_calls: bool = True, **kwargs):
+        """
+        Offers `tools` through the chat completions tools interface. With
+        parallel_tool_calls the model may request several tools in one response.
+        """
+        kwargs["tools"] = [convert_to_openai_tool(tool) for tool in tools]
+        kwargs["parallel_tool_calls"] = parallel_tool_calls
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(**kwargs)
+
+    def _request_kwargs(self, messages: list, kwargs: dict) -> dict:
+        request = {
+            "messages": _to_openai_messages(messages),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        if kwargs.get("stop"):
+            request["stop"] = kwargs["stop"]
+        if kwargs.get("tools"):
+            request["tools"] = kwargs["tools"]
+            request["parallel_tool_calls"] = kwargs.get("parallel_tool_calls", True)
+            if kwargs.get("tool_choice") is not None:
+                request["tool_choice"] = kwargs["tool_choice"]
+        # Raises DeadlineExceeded once the turn's budget is spent
+        request["timeout"] = clamp_timeout(LLM_TIMEOUT_SECONDS)
+        return request
+
+    def _clients(self):
+        # The SDK retries failed requests twice by default; under a turn deadline
+        # a retry would only outlive the budget, so fail fast instead
+        if remaining() is None:
+            return self._client, self._async_client
+        return self._client.with_options(max_retries=0), self._async_client.with_options(max_retries=0)
+
+    def _fallback(self, model: str):
+        return _FALLBACK_MODEL_IDS.get(model) if self.allow_fallback else None
+
+    @staticmethod
+    def _with_model(request: dict, model: str) -> dict:
+        # Waiting for a quota slot used up part of the turn; shrink the timeout to what is left
+        return {**request, "model": model, "timeout": clamp_timeout(LLM_TIMEOUT_SECONDS)}
+
+    # Every request waits for a slot in its model's quota (tools/rate_limiter.py).
+    # When the model is out of slots, or answers 429, the request goes to the
+    # cheaper model of the family instead; the SDK's own retries would only wait
+    # out the 429, so they are off when there is a fallback. Returns (model used,
+    # parsed response).
+    def _create(self, request: dict, **extra):
+        client, fallback = self._clients()[0], self._fallback(self.model)
+        if fallback is not None:
+            client = client.with_options(max_retries=0)
+        completions = client.chat.completions
+        model = quota_scheduler.acquire_model(self.model, fallback)
+        try:
+            raw = completions.with_raw_response.create(**self._with_model(request, model), **extra)
+        except RateLimitError as e:
+            quota_scheduler.observe(model, e.response.headers, 429)
+            fallback = self._fallback(model)
+            if fallback is None:
+                raise
+            model = quota_scheduler.acquire_model(fallback)
+            raw = completions.with_raw_response.create(**self._with_model(request, model), **extra)
+        quota_scheduler.observe(model, raw.headers, raw.status_code)
+        return model, raw.parse()
+
+    async def _acreate(self, request: dict, **extra):
+        client, fallback = self._clients()[1], self._fallback(self.model)
+        if fallback is not None:
+            client = client.with_options(max_retries=0)
+        completions = client.chat.completions
+        model = await quota_scheduler.aacquire_model(self.model, fallback)
+        try:
+            raw = await completions.with_raw_response.create(**self._with_model(request, model), **extra)
+        except RateLimitError as e:
+            quota_scheduler.observe(model, e.response.headers, 429)
+            fallback = self._fallback(model)
+            if fallback is None:
+                raise
+            model = await quota_scheduler.aacquire_model(fallback)
+            raw = await completions.with_raw_response.create(**self._with_model(request, model), **extra)
+        quota_scheduler.observe(model, raw.headers, raw.status_code)
+        return model, raw.parse()
+
+    # Every call reports start/new-token/end to the run's callback handlers,
+    # which is how streaming UIs and tracers observe the model.
+    def _start_run(self, messages: list, config):
+        config = ensure_config(config)
+        callback_manager = get_callback_manager_for_config(config)
+        return callback_manager.on_chat_model_start(
+            self._serialized, [messages], name=config.get("run_name"), invocation_params={"model": self.model}
+        )[0]
+
+    async def _astart_run(self, messages: list, config):
+        config = ensure_config(config)
+        callback_manager = get_async_callback_manager_for_config(config)
+        return (await callback_manager.on_chat_model_start(
+            self._serialized, [messages], name=config.get("run_name"), invocation_params={"model": self.model}
+        ))[0]
 
     def invoke(self, input, config=None, **kwargs):
-        messages = []
-
-        if isinstance(input, dict) and "messages" in input:
-            for msg in input["messages"]:
-                if isinstance(msg, HumanMessage):
-                    messages.append({"role": "user", "content": msg.content})
-                elif isinstance(msg, SystemMessage):
-                    messages.append({"role": "system", "content": msg.content})
-                elif isinstance(msg, AIMessage):
-                    messages.append({"role": "assistant", "content": msg.content})
-        else:
-            messages = [
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": str(input)}
-            ]
-
-        response = self._client.chat.completions.create(
-            messages=messages,
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens
-        )
-
-        return AIMessage(content=response.choices[0].message.content)
+        messages = _to_langchain_messages(input)
+        run_manager = self._start_run(messages, config)
+        try:
+            model, response = self._create(self._request_kwargs(messages, kwargs))
+        except BaseException as e:
+            run_manager.on_llm_error(e)
+            raise
+
+        message = _ai_message(response.choices[0].message)
+        run_manager.on_llm_end(_llm_result(message, model, response.usage))
+        return message
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        messages = _to_langchain_messages(input)
+        run_manager = await self._astart_run(messages, config)
+        try:
+            model, response = await self._acreate(self._request_kwargs(messages, kwargs))
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
+
+        message = _ai_message(response.choices[0].message)
+        await run_manager.on_llm_end(_llm_result(message, model, response.usage))
+        return message
+
+    def stream(self, input, config=None, **kwargs):
+        """Yields AIMessageChunks as the completion is generated (stream=True)."""
+        messages = _to_langchain_messages(input)
+        run_manager = self._start_run(messages, config)
+        full = AIMessageChunk(content="")
+        model, usage = self.model, None
+        try:
+            model, stream = self._create(
+                self._request_kwargs(messages, kwargs), stream=True, stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                # usage arrives on the last chunk, which has no choices
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                message_chunk = _chunk_message(chunk.choices[0].delta)
+                if message_chunk is None:
+                    continue
+                full += message_chunk
+                if message_chunk.content:
+                    run_manager.on_llm_new_token(message_chunk.content)
+                yield message_chunk
+        except BaseException as e:
+            run_manager.on_llm_error(e)
+            raise
+
+        if not full.content and not full.tool_call_chunks:
+            yield AIMessageChunk(content="")
+        run_manager.on_llm_end(_llm_result(_final_message(full), model, usage))
+
+    async def astream(self, input, config=None, **kwargs):
+        messages = _to_langchain_messages(input)
+        run_manager = await self._astart_run(messages, config)
+        full = AIMessageChunk(content="")
+        model, usage = self.model, None
+        try:
+            model, stream = await self._acreate(
+                self._request_kwargs(messages, kwargs), stream=True, stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                message_chunk = _chunk_message(chunk.choices[0].delta)
+                if message_chunk is None:
+                    continue
+                full += message_chunk
+                if message_chunk.content:
+                    await run_manager.on_llm_new_token(message_chunk.content)
+                yield message_chunk
+        except BaseException as e:
+            await run_manager.on_llm_error(e)
+            raise
 
+        if not full.content and not full.tool_call_chunks:
+            yield AIMessageChunk(content="")
+        await run_manager.on_llm_end(_llm_result(_final_message(full), model, usage))
@@ -0,0 +1,249 @@
+import os, re, datetime, threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from agent.metrics import metrics_registry
+from tools.tool_cache import ToolCache, looks_like_error, looks_partial
+
+# Final-answer cache in front of the agent.
+# Whole questions repeat across users ("who created you", "capital of France",
+# "upcoming holidays in India"). A repeat within its freshness window is
+# answered from here without running the agent or calling the LLM.
+# The freshness class comes from the tools the original turn used: no tools or
+# reference tools -> static, slowly changing data -> daily (until midnight),
+# live data -> real-time, which is never cached. The question itself can raise
+# the class: the model answers "what day is it tomorrow" or "how many days until
+# Diwali" without a tool, but not for a week. Follow-ups that lean on the
+# conversation ("and in Delhi?", "tell me more") bypass the cache entirely.
+
+STATIC, DAILY, REALTIME = "static", "daily", "realtime"
+
+TOOL_FRESHNESS = {
+    "Wikipedia": STATIC,
+    "Indian Holiday Lookup": DAILY,
+    "FD Rates Checker": DAILY,
+    "Recharge Plan Search": DAILY,
+    "YouTube Video Search": DAILY,
+    "E-commerce Product Search": DAILY,
+    # Every other tool (time, weather, prices, live status, web search) is real-time
+}
+_VOLATILITY = {STATIC: 0, DAILY: 1, REALTIME: 2}
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1").lower() not in ("0", "false", "no")
+ANSWER_CACHE_STATIC_SECONDS = float(os.getenv("ANSWER_CACHE_STATIC_SECONDS", str(7 * 24 * 3600)))
+ANSWER_CACHE_DAILY_SECONDS = float(os.getenv("ANSWER_CACHE_DAILY_SECONDS", str(24 * 3600)))
+
+# Words that point back into the conversation; with history present they make
+# the answer depend on it
+_REFERENTIAL = re.compile(
+    r"\b(it|its|this|that|these|those|they|them|their|he|she|him|her|his|there|same|again|above|"
+    r"previous|earlier|more|also|else|instead|another|other|my|me|we|our|us)\b"
+)
+_FOLLOW_UP_START = re.compile(r"^(and|but|so|then|what about|how about|ok|okay)\b")
+
+# Time-relative questions (matched on the normalized query)
+_REALTIME_WORDS = re.compile(r"\b(now|current|currently|latest|live|right now|at the moment|time is it)\b")
+_DAILY_WORDS = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|this (week|month|year)|next (week|month|year)|last (week|month|year)|"
+    r"days? (until|till|left|to go)|how long until|what (day|date|year|month)|which (day|date|year|month)|"
+    r"upcoming|recent|recently|age|old is)\b"
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.findall(r"\w+", (query or "").lower()))
+
+
+def query_freshness(normalized: str) -> str:
+    """Freshness the question itself demands, whatever tools answered it."""
+    if _REALTIME_WORDS.search(normalized):
+        return REALTIME
+    if _DAILY_WORDS.search(normalized):
+        return DAILY
+    return STATIC
+
+
+def freshness_for(tool_names, normalized: str = "") -> str:
+    """The most volatile class among the tools a turn used and the question; no tools means static."""
+    classes = [TOOL_FRESHNESS.get(name, REALTIME) for name in tool_names] + [query_freshness(normalized)]
+    return max(classes, key=_VOLATILITY.get)
+
+
+def _seconds_until_midnight() -> float:
+    now = datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return (midnight - now).total_seconds()
+
+
+def ttl_for(freshness: str) -> float:
+    if freshness == STATIC:
+        return ANSWER_CACHE_STATIC_SECONDS
+    if freshness == DAILY:
+        # Date-relative answers ("tomorrow", "upcoming") go stale at midnight
+        return min(ANSWER_CACHE_DAILY_SECONDS, _seconds_until_midnight())
+    return 0
+
+
+def is_history_dependent(normalized: str, has_history: bool) -> bool:
+    if not has_history:
+        return False
+    return len(normalized.split()) <= 3 or bool(_FOLLOW_UP_START.match(normalized) or _REFERENTIAL.search(normalized))
+
+
+class _ToolRecorder(BaseCallbackHandler):
+    """Collects the names of the tools a turn calls, and whether any of them failed (or came back partial)."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.tool_names = []
+        self.failed = False
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.tool_names.append((serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output, **kwargs):
+        output = getattr(output, "content", output)
+        self.failed = self.failed or looks_like_error(output) or looks_partial(output)
+
+    def on_tool_error(self, error, **kwargs):
+        self.failed = True
+
+
+class AnswerCache:
+    def __init__(self, store: ToolCache):
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stored = 0
+
+    def _count(self, result: str):
+        with self._lock:
+            setattr(self, result, getattr(self, result) + 1)
+        metrics_registry.inc("zeenova_answer_cache_total", help="Answer cache lookups", result=result)
+
+    @staticmethod
+    def key(model: str, normalized: str) -> str:
+        return f"answer:{model}:{normalized}"
+
+    def get(self, model: str, normalized: str):
+        value = self.store.get("answer", self.key(model, normalized))
+        if value is ToolCache._MISSING:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+
+    def put(self, model: str, normalized: str, output: str, tool_names) -> bool:
+        freshness = freshness_for(tool_names, normalized)
+        ttl = ttl_for(freshness)
+        if ttl <= 0:
+            return False
+        self.store.set("answer", self.key(model, normalized), {"output": output, "freshness": freshness}, ttl)
+        self._count("stored")
+        return True
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "bypassed": self.bypassed, "stored": self.stored,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": self.store.stats()["entries"],
+            }
+
+
+# Process-wide; set ANSWER_CACHE_DB=/path/to/answers.sqlite3 to share answers across workers and restarts
+answer_cache = AnswerCache(ToolCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "4096")),
+    sqlite_path=os.getenv("ANSWER_CACHE_DB") or None,
+))
+
+
+class AnswerCacheExecutor:
+    """
+    Wraps an agent executor: repeated, history-independent questions are answered
+    from the answer cache and saved to the session memory; everything else runs
+    the wrapped executor, whose answer is cached by freshness class.
+    """
+
+    def __init__(self, agent_executor, model_enum, cache: AnswerCache = answer_cache):
+        self.agent_executor = agent_executor
+        self.model = model_enum.value
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.agent_executor, name)
+
+    def _has_history(self) -> bool:
+        memory = self.agent_executor.memory
+        return memory is not None and bool(memory.chat_memory.messages or getattr(memory, "summary", ""))
+
+    def _lookup(self, inputs: dict):
+        normalized = normalize_query(inputs["input"])
+        if not normalized or is_history_dependent(normalized, self._has_history()):
+            self.cache._count("bypassed")
+            return None, None
+        cached = self.cache.get(self.model, normalized)
+        if cached is None:
+            return normalized, None
+        memory = self.agent_executor.memory
+        if memory is not None:
+            memory.save_context({"input": inputs["input"]}, {"output": cached["output"]})
+        return normalized, {**inputs, "output": cached["output"], "cached": cached["freshness"]}
+
+    def _store(self, normalized: str, response: dict, recorder: _ToolRecorder):
+        # Fast-path answers come from live tools; timeouts and answers built on a
+        # failed tool call should be retried next time
+        if not normalized or recorder.failed or response.get("fast_path") or response.get("deadline_exceeded"):
+            return
+        output = response.get("output", "")
+        if output and not looks_like_error(output):
+            self.cache.put(self.model, normalized, output, recorder.tool_names)
+
+    @staticmethod
+    def _with_recorder(config, recorder: _ToolRecorder) -> dict:
+        config = dict(config or {})
+        callbacks = config.get("callbacks")
+        if callbacks is None:
+            config["callbacks"] = [recorder]
+        elif isinstance(callbacks, list):
+            config["callbacks"] = [*callbacks, recorder]
+        else:  # a callback manager
+            callbacks = callbacks.copy()
+            callbacks.add_handler(recorder, inherit=True)
+            config["callbacks"] = callbacks
+        return config
+
+    def invoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        normalized, hit = self._lookup(inputs)
+        if hit is not None:
+            return hit
+        recorder = _ToolRecorder()
+        response = self.agent_executor.invoke(inputs, config=self._with_recorder(config, recorder), **kwargs)
+        self._store(normalized, response, recorder)
+        return response
+
+    async def ainvoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        normalized, hit = self._lookup(inputs)
+        if hit is not None:
+            return hit
+        recorder = _ToolRecorder()
+        response = await self.agent_executor.ainvoke(inputs, config=self._with_recorder(config, recorder), **kwargs)
+        self._store(normalized, response, recorder)
+        return response
+
+
+def get_answer_cache_stats() -> dict:
+    return answer_cache.stats()
+
+
+__all__ = [
+    "AnswerCache", "AnswerCacheExecutor", "answer_cache", "get_answer_cache_stats",
+    "normalize_query", "freshness_for", "is_history_dependent", "TOOL_FRESHNESS",
+]
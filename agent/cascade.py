@@ -0,0 +1,211 @@
+import os
+import json
+import time
+
+from langchain.agents.output_parsers import JSONAgentOutputParser
+from langchain_core.agents import AgentFinish
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableSerializable
+from langchain_core.runnables.config import ensure_config
+from pydantic import BaseModel
+
+from agent.agent_wrapper import GitHubChatLLM
+from agent.metrics import metrics_registry
+from models.model_enum import ModelName, FALLBACK_MODELS
+
+# Model cascade for the agent loop.
+# Most agent steps only pick a tool and its input, which a mini model does as
+# well as a large one and much faster. The router model runs every step of a
+# turn, including those after a tool result, so multi-tool chains (search, then
+# weather; PNR, then train status) pick each action on the mini model. A step
+# that calls a tool goes ahead as is. A step that would answer is re-run on the
+# selected model, so the user still gets its answer. So is a step the router
+# got wrong (unparseable action, unknown tool).
+#
+# The re-run costs each turn one extra mini call for its answer step; every tool
+# step saves a large-model call. On the offline benchmark (mini 30 ms, selected
+# model 150 ms per call, all queries using tools) p50 drops from about 360 ms to
+# about 285 ms. Each step's model and latency shows up in the turn metrics (role
+# "route", "answer" or "escalate").
+#
+# ZEENOVA_CASCADE_HANDOFF=1 is an opt-in shortcut that departs from the above:
+# steps after a tool result skip the router and go straight to the selected
+# model. That saves the mini call on single-tool turns (p50 about 230 ms on the
+# same benchmark) but runs every later action of a multi-tool chain on the large
+# model.
+
+CASCADE_ENABLED = os.getenv("ZEENOVA_CASCADE", "0").lower() in ("1", "true", "yes")
+CASCADE_HANDOFF = os.getenv("ZEENOVA_CASCADE_HANDOFF", "0").lower() in ("1", "true", "yes")
+# The router for each selected model (by default the mini model of its family);
+# models without one, like the mini models themselves, are not cascaded.
+# ZEENOVA_CASCADE_ROUTER (e.g. GPT_4O_MINI) is resolved in router_for, so a bad
+# value only matters once the cascade is in use
+CASCADE_ROUTER_OVERRIDE = os.getenv("ZEENOVA_CASCADE_ROUTER", "").strip()
+CASCADE_ROUTERS = dict(FALLBACK_MODELS)
+
+ROUTE, ANSWER, ESCALATE = "route", "answer", "escalate"
+HANDOFF = "handoff"  # metrics outcome: answerer called directly after a tool result
+_json_parser = JSONAgentOutputParser()
+# format_log_to_str's prefix for tool results in the structured-chat scratchpad
+_OBSERVATION = "\nObservation: "
+
+
+def router_for(model_enum: ModelName):
+    if CASCADE_ROUTER_OVERRIDE and model_enum in CASCADE_ROUTERS:
+        try:
+            router = ModelName[CASCADE_ROUTER_OVERRIDE]
+        except KeyError:
+            raise ValueError(
+                f"ZEENOVA_CASCADE_ROUTER={CASCADE_ROUTER_OVERRIDE!r} is not a model; "
+                f"use one of {', '.join(ModelName.__members__)}"
+            ) from None
+    else:
+        router = CASCADE_ROUTERS.get(model_enum)
+    return router if router is not None and router != model_enum else None
+
+
+def _with_role(config, role: str) -> dict:
+    config = ensure_config(config)
+    return {**config, "metadata": {**config.get("metadata", {}), "cascade_step": role}}
+
+
+def _has_tool_result(input) -> bool:
+    """Whether the prompt already holds a tool result for the current question."""
+    messages = input.to_messages() if isinstance(input, PromptValue) else input
+    if not isinstance(messages, list):
+        return False
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            return True
+        if isinstance(message, HumanMessage):
+            # Structured chat keeps the scratchpad in the last human message
+            return _OBSERVATION in str(message.content)
+    return False
+
+
+def _as_chunk(message: AIMessage) -> AIMessageChunk:
+    return AIMessageChunk(content=message.content, tool_call_chunks=[
+        {"index": i, "id": call["id"], "name": call["name"], "args": json.dumps(call["args"], ensure_ascii=False)}
+        for i, call in enumerate(message.tool_calls)
+    ])
+
+
+class CascadeLLM(RunnableSerializable, BaseModel):
+    """
+    Runs each agent step on `router` and hands final answers and bad actions to
+    `answerer`. `structured` selects how steps are read: JSON actions in the text
+    (structured chat) or native tool calls.
+    """
+
+    router: GitHubChatLLM
+    answerer: GitHubChatLLM
+    tool_names: frozenset = frozenset()
+    structured: bool = False
+
+    def bind_tools(self, tools: list, tool_choice=None, parallel_tool_calls: bool = True, **kwargs):
+        # Same request kwargs as the wrapped models
+        return self.bind(**self.router.bind_tools(tools, tool_choice, parallel_tool_calls, **kwargs).kwargs)
+
+    def _classify(self, message: AIMessage) -> str:
+        """ROUTE when the router's step can go ahead, else what the answerer should do."""
+        if self.structured:
+            try:
+                step = _json_parser.parse(message.content)
+            except OutputParserException:
+                return ESCALATE
+            if isinstance(step, AgentFinish):
+                return ANSWER
+            return ROUTE if not self.tool_names or step.tool in self.tool_names else ESCALATE
+        if message.invalid_tool_calls:
+            return ESCALATE
+        if not message.tool_calls:
+            return ANSWER
+        known = not self.tool_names or all(call["name"] in self.tool_names for call in message.tool_calls)
+        return ROUTE if known else ESCALATE
+
+    def _record(self, outcome: str, seconds: float):
+        metrics_registry.inc("zeenova_cascade_steps_total", help="Cascade steps by outcome", outcome=outcome,
+                             router=self.router.model, answerer=self.answerer.model)
+        metrics_registry.observe("zeenova_cascade_route_seconds", seconds, help="Router model latency per step",
+                                 router=self.router.model)
+
+    def _handoff(self, input) -> bool:
+        """Whether this step skips the router (opt-in, see CASCADE_HANDOFF)."""
+        if not CASCADE_HANDOFF or not _has_tool_result(input):
+            return False
+        metrics_registry.inc("zeenova_cascade_steps_total", help="Cascade steps by outcome", outcome=HANDOFF,
+                             router=self.router.model, answerer=self.answerer.model)
+        return True
+
+    def _route(self, input, config, kwargs):
+        started = time.perf_counter()
+        message = self.router.invoke(input, _with_role(config, ROUTE), **kwargs)
+        outcome = self._classify(message)
+        self._record(outcome, time.perf_counter() - started)
+        return message, outcome
+
+    async def _aroute(self, input, config, kwargs):
+        started = time.perf_counter()
+        message = await self.router.ainvoke(input, _with_role(config, ROUTE), **kwargs)
+        outcome = self._classify(message)
+        self._record(outcome, time.perf_counter() - started)
+        return message, outcome
+
+    def invoke(self, input, config=None, **kwargs):
+        if self._handoff(input):
+            return self.answerer.invoke(input, _with_role(config, ANSWER), **kwargs)
+        message, outcome = self._route(input, config, kwargs)
+        if outcome == ROUTE:
+            return message
+        return self.answerer.invoke(input, _with_role(config, outcome), **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        if self._handoff(input):
+            return await self.answerer.ainvoke(input, _with_role(config, ANSWER), **kwargs)
+        message, outcome = await self._aroute(input, config, kwargs)
+        if outcome == ROUTE:
+            return message
+        return await self.answerer.ainvoke(input, _with_role(config, outcome), **kwargs)
+
+    # The router step is never streamed, so only the answerer's tokens reach
+    # streaming UIs
+    def stream(self, input, config=None, **kwargs):
+        if self._handoff(input):
+            yield from self.answerer.stream(input, _with_role(config, ANSWER), **kwargs)
+            return
+        message, outcome = self._route(input, config, kwargs)
+        if outcome == ROUTE:
+            yield _as_chunk(message)
+            return
+        yield from self.answerer.stream(input, _with_role(config, outcome), **kwargs)
+
+    async def astream(self, input, config=None, **kwargs):
+        if self._handoff(input):
+            async for chunk in self.answerer.astream(input, _with_role(config, ANSWER), **kwargs):
+                yield chunk
+            return
+        message, outcome = await self._aroute(input, config, kwargs)
+        if outcome == ROUTE:
+            yield _as_chunk(message)
+            return
+        async for chunk in self.answerer.astream(input, _with_role(config, outcome), **kwargs):
+            yield chunk
+
+
+def cascade_llm(model_enum: ModelName, tool_names=(), structured: bool = False, temperature: float = 0.3):
+    """CascadeLLM answering with `model_enum`, or plain GitHubChatLLM when it has no router."""
+    answerer = GitHubChatLLM(model=model_enum.value, temperature=temperature)
+    router = router_for(model_enum)
+    if router is None:
+        return answerer
+    return CascadeLLM(
+        router=GitHubChatLLM(model=router.value, temperature=temperature),
+        answerer=answerer,
+        tool_names=frozenset(tool_names),
+        structured=structured,
+    )
+
+
+__all__ = ["CascadeLLM", "cascade_llm", "router_for", "CASCADE_ENABLED", "CASCADE_HANDOFF", "CASCADE_ROUTERS"]
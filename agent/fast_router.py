@@ -0,0 +1,187 @@
+import re
+import threading
+
+from tools.tool_registry import tools
+
+# Deterministic fast path in front of the agent.
+# Queries that unambiguously map to a single tool call ("100 USD to INR", a bare
+# PNR, "AI101") are answered by calling the tool directly and formatting the
+# result with a template, skipping the LLM round-trips. Patterns are anchored to
+# the whole query so anything with extra intent falls through to the agent.
+
+_tools_by_name = {tool.name: tool for tool in tools}
+
+_FLAGS = re.IGNORECASE
+
+# A bare "AI101" is only taken for a flight code when it starts with one of these
+# IATA airline designators; with the word "flight" any designator is accepted.
+# Otherwise "hi 2025" or "go 100" would spend Aviationstack quota.
+AIRLINE_CODES = (
+    "AI", "IX", "6E", "UK", "SG", "QP", "I5", "9I", "S5", "G8",  # Indian carriers
+    "EK", "EY", "QR", "GF", "WY", "SV", "FZ", "G9", "SQ", "TG", "MH", "CX", "UL", "BG", "KU",
+    "BA", "VS", "LH", "LX", "AF", "KL", "TK", "UA", "AA", "DL", "AC", "QF", "NH", "JL",
+)
+_AIRLINE = "|".join(AIRLINE_CODES)
+
+ROUTES = [
+    (
+        "Time",
+        re.compile(r"^(?:what(?:'s| is) the (?:current )?time(?: now| right now)?|what time is it(?: now)?|current time|time now)\??$", _FLAGS),
+        lambda m: (),
+        "🕒 The current time is {result}.",
+    ),
+    (
+        "Currency Converter",
+        re.compile(r"^(?:convert\s+)?(\d+(?:\.\d+)?)\s*([a-z]{3})\s+(?:to|in|into)\s+([a-z]{3}(?:\s*(?:,|and|&|,\s*and)\s*[a-z]{3})*)\??$", _FLAGS),
+        lambda m: (f"{m.group(1)} {m.group(2)} to {m.group(3)}",),
+        "{result}",
+    ),
+    (
+        "PNR Status Checker",
+        re.compile(r"^(?:(?:check\s+)?pnr(?:\s+status)?(?:\s+(?:of|for))?[\s:#-]*)?(\d{10})$", _FLAGS),
+        lambda m: (m.group(1),),
+        "{result}",
+    ),
+    (
+        "Train Live Status Checker",
+        re.compile(r"^(?:(?:live\s+)?(?:status\s+of\s+)?train(?:\s+(?:no\.?|number))?[\s:#-]*)?(\d{5})(?:\s+(?:live\s+)?(?:running\s+)?status)?$", _FLAGS),
+        lambda m: (m.group(1),),
+        "{result}",
+    ),
+    (
+        "Flight Status Checker",
+        re.compile(
+            r"^(?:flight(?:\s+status)?(?:\s+(?:of|for))?\s*((?:[a-z][a-z0-9]|[0-9][a-z])\s?\d{2,4})"
+            rf"|((?:{_AIRLINE})\s?\d{{2,4}}))(?:\s+(?:flight\s+)?status)?\??$",
+            _FLAGS,
+        ),
+        lambda m: ((m.group(1) or m.group(2)).replace(" ", "").upper(),),
+        "{result}",
+    ),
+    (
+        "Indian Holiday Lookup",
+        re.compile(r"^is (?:it )?(today|tomorrow) (?:a )?(?:public |national |bank )?holiday(?: in india)?\??$", _FLAGS),
+        lambda m: (f"is {m.group(1).lower()} a holiday",),
+        "{result}",
+    ),
+]
+
+# Tool outputs that signal a failure; let the agent handle those instead.
+# ("❌ Today is not a holiday" is a valid answer, so "❌" alone is not a failure.)
+_ERROR_PREFIXES = ("⚠️", "error", "failed", "no flight found", "please format", "currency api key")
+_ERROR_PHRASES = ("could not fetch", "couldn't", "error fetching")
+
+
+def _looks_like_error(result) -> bool:
+    text = str(result).strip().lower()
+    return text.startswith(_ERROR_PREFIXES) or any(phrase in text for phrase in _ERROR_PHRASES)
+
+
+class FastPathRouter:
+    """Matches trivial single-tool queries and answers them without the LLM."""
+
+    def __init__(self, routes=ROUTES):
+        self.routes = routes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hits_by_tool = {}
+
+    def match(self, query: str):
+        """Returns (tool_name, args, template) for a confident match, else None."""
+        text = " ".join(query.strip().split())
+        for tool_name, pattern, build_args, template in self.routes:
+            m = pattern.match(text)
+            if m:
+                return tool_name, build_args(m), template
+        return None
+
+    def _record(self, tool_name):
+        with self._lock:
+            if tool_name is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.hits_by_tool[tool_name] = self.hits_by_tool.get(tool_name, 0) + 1
+
+    def route(self, query: str):
+        """Returns the templated answer, or None to fall back to the full agent."""
+        matched = self.match(query)
+        if matched:
+            tool_name, args, template = matched
+            try:
+                result = _tools_by_name[tool_name].func(*args)
+            except Exception:
+                result = None
+            if result is not None and not _looks_like_error(result):
+                self._record(tool_name)
+                return template.format(result=result)
+        self._record(None)
+        return None
+
+    async def aroute(self, query: str):
+        matched = self.match(query)
+        if matched:
+            tool_name, args, template = matched
+            try:
+                result = await _tools_by_name[tool_name].coroutine(*args)
+            except Exception:
+                result = None
+            if result is not None and not _looks_like_error(result):
+                self._record(tool_name)
+                return template.format(result=result)
+        self._record(None)
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "fast_path_hits": self.hits,
+                "agent_fallbacks": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "hits_by_tool": dict(self.hits_by_tool),
+            }
+
+
+# Process-wide router shared by all sessions
+fast_router = FastPathRouter()
+
+
+class FastPathExecutor:
+    """
+    Wraps an AgentExecutor: trivial queries are answered by the router and saved
+    to the session memory; everything else goes to the wrapped agent unchanged.
+    """
+
+    def __init__(self, agent_executor, router: FastPathRouter = fast_router):
+        self.agent_executor = agent_executor
+        self.router = router
+
+    def __getattr__(self, name):
+        return getattr(self.agent_executor, name)
+
+    def _answer(self, inputs: dict, output: str) -> dict:
+        memory = self.agent_executor.memory
+        if memory is not None:
+            memory.save_context({"input": inputs["input"]}, {"output": output})
+        return {**inputs, "output": output, "fast_path": True}
+
+    def invoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        output = self.router.route(inputs["input"])
+        if output is not None:
+            return self._answer(inputs, output)
+        return self.agent_executor.invoke(inputs, config=config, **kwargs)
+
+    async def ainvoke(self, inputs: dict, config=None, **kwargs) -> dict:
+        output = await self.router.aroute(inputs["input"])
+        if output is not None:
+            return self._answer(inputs, output)
+        return await self.agent_executor.ainvoke(inputs, config=config, **kwargs)
+
+
+def get_fast_path_stats() -> dict:
+    return fast_router.stats()
+
+
+__all__ = ["FastPathRouter", "FastPathExecutor", "fast_router", "get_fast_path_stats"]
@@ -0,0 +1,213 @@
+from typing import Any, Callable, Optional
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from pydantic import PrivateAttr
+
+from models.model_enum import ModelName
+
+# Conversation-history token budget per model. This is only the history part of
+# the prompt; the tool catalogue, scratchpad and answer need the rest.
+MODEL_HISTORY_BUDGETS = {
+    ModelName.GPT_4_1: 6000,
+    ModelName.GPT_4_1_MINI: 4000,
+    ModelName.GPT_4O: 4000,
+    ModelName.GPT_4O_MINI: 3000,
+}
+DEFAULT_HISTORY_BUDGET = 3000
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# tiktoken is optional; without it a ~4 characters/token estimate is used
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text, disallowed_special=()))
+except Exception:
+    def count_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    # ~4 tokens of per-message framing (role, separators) in chat formats
+    return count_tokens(str(message.content)) + 4
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def extractive_summary(previous: str, messages: list) -> str:
+    """Cheap, LLM-free summarizer: one clipped line per folded message."""
+    lines = [previous] if previous else []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            lines.append(f"- User asked: {_clip(msg.content, 160)}")
+        elif isinstance(msg, AIMessage):
+            lines.append(f"- Assistant answered: {_clip(msg.content, 240)}")
+    return "\n".join(lines)
+
+
+class TokenBudgetMemory(ConversationBufferMemory):
+    """
+    Conversation memory that keeps the prompt history within a token budget.
+
+    Leading system messages stay pinned, the most recent turns are kept verbatim,
+    and older turns are folded into a rolling summary once the budget is exceeded.
+    Consecutive duplicate messages are dropped on save.
+    """
+
+    max_tokens: int = DEFAULT_HISTORY_BUDGET
+    keep_recent_messages: int = 6
+    summary_max_tokens: int = 600
+    summary: str = ""
+    summarizer: Optional[Callable[[str, list], str]] = None
+
+    _raw_tokens: int = PrivateAttr(default=0)
+    _tokens_saved_last_turn: int = PrivateAttr(default=0)
+    _tokens_saved_total: int = PrivateAttr(default=0)
+
+    @classmethod
+    def for_model(cls, model_enum: ModelName, **kwargs) -> "TokenBudgetMemory":
+        kwargs.setdefault("memory_key", "chat_history")
+        kwargs.setdefault("return_messages", True)
+        kwargs.setdefault("max_tokens", MODEL_HISTORY_BUDGETS.get(model_enum, DEFAULT_HISTORY_BUDGET))
+        return cls(**kwargs)
+
+    def set_model(self, model_enum: ModelName):
+        self.max_tokens = MODEL_HISTORY_BUDGETS.get(model_enum, DEFAULT_HISTORY_BUDGET)
+        self._compact()
+
+    # --- saving ---
+
+    def _add_unique(self, message: BaseMessage):
+        self._raw_tokens += message_tokens(message)
+        messages = self.chat_memory.messages
+        # Skip the message if the same role/content was just stored (e.g. saved twice)
+        if messages and type(messages[-1]) is type(message) and messages[-1].content == message.content:
+            return
+        self.chat_memory.add_message(message)
+
+    def save_context(self, inputs: dict[str, Any], outputs: dict[str, str]) -> None:
+        input_str, output_str = self._get_input_output(inputs, outputs)
+        self._add_unique(HumanMessage(content=input_str))
+        self._add_unique(AIMessage(content=output_str))
+        self._compact()
+
+    async def asave_context(self, inputs: dict[str, Any], outputs: dict[str, str]) -> None:
+        self.save_context(inputs, outputs)
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
+        self._raw_tokens = 0
+
+    # --- compaction ---
+
+    def _split(self):
+        messages = self.chat_memory.messages
+        pinned_count = 0
+        while pinned_count < len(messages) and isinstance(messages[pinned_count], SystemMessage):
+            pinned_count += 1
+        return messages[:pinned_count], messages[pinned_count:]
+
+    def _summary_message(self):
+        return SystemMessage(content=SUMMARY_PREFIX + self.summary) if self.summary else None
+
+    def _view(self) -> list:
+        pinned, history = self._split()
+        summary = self._summary_message()
+        return pinned + ([summary] if summary else []) + history
+
+    def _compact(self):
+        pinned, history = self._split()
+        fixed = sum(message_tokens(m) for m in pinned)
+        history_tokens = [message_tokens(m) for m in history]
+        summary = self._summary_message()
+        total = fixed + sum(history_tokens) + (message_tokens(summary) if summary else 0)
+        if total <= self.max_tokens:
+            return
+
+        # Fold the oldest messages into the summary until the view fits,
+        # but never touch the most recent turns
+        foldable = max(0, len(history) - self.keep_recent_messages)
+        fold = 0
+        while fold < foldable and total > self.max_tokens:
+            total -= history_tokens[fold]
+            fold += 1
+        # Keep human/assistant pairs together
+        if fold < len(history) and fold > 0 and isinstance(history[fold], AIMessage):
+            fold = min(fold + 1, foldable)
+        if fold == 0:
+            return
+
+        summarize = self.summarizer or extractive_summary
+        self.summary = self._trim_summary(summarize(self.summary, history[:fold]))
+        self.chat_memory.messages = pinned + history[fold:]
+
+    def _trim_summary(self, summary: str) -> str:
+        # Drop the oldest summary lines first so the summary itself stays bounded
+        lines = summary.split("\n")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    # --- loading ---
+
+    def _load(self) -> list:
+        self._compact()
+        view = self._view()
+        sent = sum(message_tokens(m) for m in view)
+        self._tokens_saved_last_turn = max(0, self._raw_tokens + sum(message_tokens(m) for m in self._split()[0]) - sent)
+        self._tokens_saved_total += self._tokens_saved_last_turn
+        return view
+
+    @property
+    def buffer_as_messages(self) -> list[BaseMessage]:
+        return self._view()
+
+    def load_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        messages = self._load()
+        return {self.memory_key: messages if self.return_messages else self._buffer_as_str(messages)}
+
+    async def aload_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        return self.load_memory_variables(inputs)
+
+    def stats(self) -> dict:
+        """Token accounting for the history sent with the most recent LLM call."""
+        view = self._view()
+        return {
+            "budget": self.max_tokens,
+            "history_tokens": sum(message_tokens(m) for m in view),
+            "summary_tokens": count_tokens(self.summary) if self.summary else 0,
+            "messages_kept": len(self.chat_memory.messages),
+            "tokens_saved_last_turn": self._tokens_saved_last_turn,
+            "tokens_saved_total": self._tokens_saved_total,
+        }
+
+    # --- persistence ---
+
+    def to_state(self) -> dict:
+        """Plain-data snapshot (summary, kept messages, counters) for a session store."""
+        return {
+            "summary": self.summary,
+            "messages": [[_ROLES[type(m)], m.content] for m in self.chat_memory.messages if type(m) in _ROLES],
+            "raw_tokens": self._raw_tokens,
+            "tokens_saved_total": self._tokens_saved_total,
+        }
+
+    def load_state(self, state: dict):
+        self.summary = state.get("summary", "")
+        self.chat_memory.messages = [_MESSAGE_TYPES[role](content=content) for role, content in state.get("messages", [])]
+        self._raw_tokens = state.get("raw_tokens", 0)
+        self._tokens_saved_total = state.get("tokens_saved_total", 0)
+
+
+_ROLES = {HumanMessage: "user", AIMessage: "assistant", SystemMessage: "system"}
+_MESSAGE_TYPES = {role: cls for cls, role in _ROLES.items()}
+
+
+__all__ = ["TokenBudgetMemory", "MODEL_HISTORY_BUDGETS", "count_tokens"]
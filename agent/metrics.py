@@ -0,0 +1,290 @@
+import os, json, time, threading
+from bisect import bisect_left
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from tools.tool_cache import looks_like_error
+
+# Process-wide metrics for the agent hot path: LLM latency and tokens, tool
+# latency and errors, ReAct iterations and turn latency. A MetricsCallbackHandler
+# is attached to each turn; the registry aggregates across sessions and renders
+# Prometheus text. Set ZEENOVA_METRICS_JSONL to also append one record per turn.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 8, 15)
+METRICS_JSONL_PATH = os.getenv("ZEENOVA_METRICS_JSONL") or None
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms, keyed by metric name and label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._help):
+                kind, help = self._help[name]
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                for (metric, labels), h in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*h.buckets, "+Inf"), h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {round(h.sum, 6)}")
+                    lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Counters and histogram count/sum as plain dicts (for JSON export)."""
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())]
+            histograms = [
+                {"name": n, "labels": dict(l), "count": h.count, "sum": round(h.sum, 6)}
+                for (n, l), h in sorted(self._histograms.items(), key=lambda kv: kv[0])
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics_registry = MetricsRegistry()
+_jsonl_lock = threading.Lock()
+
+
+def append_jsonl(record: dict, path: str = None):
+    path = path or METRICS_JSONL_PATH
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _jsonl_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Times one agent turn. Attach a fresh instance per turn via
+    config={"callbacks": [...]}; after the turn, `last_turn` holds the breakdown.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry, jsonl_path: str = None, session_id: str = None):
+        self.registry = registry
+        self.jsonl_path = jsonl_path
+        self.session_id = session_id
+        self._lock = threading.Lock()
+        self._starts = {}
+        self._turn = None
+        self.last_turn = None
+
+    # --- turn ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is not None:
+            return
+        with self._lock:
+            self._turn = {
+                "started": time.perf_counter(),
+                "model": None,
+                "llm_calls": 0,
+                "llm_seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "llm_steps": [],
+                "tools": [],
+                "root": run_id,
+            }
+
+    def _finish_turn(self, run_id, error: bool):
+        with self._lock:
+            turn = self._turn
+            if turn is None or turn["root"] != run_id:
+                return
+            self._turn = None
+        total = time.perf_counter() - turn["started"]
+        tool_seconds = sum(t["seconds"] for t in turn["tools"])
+        summary = {
+            "timestamp": time.time(),
+            "session_id": self.session_id,
+            "model": turn["model"],
+            "total_seconds": round(total, 4),
+            "llm_seconds": round(turn["llm_seconds"], 4),
+            "tool_seconds": round(tool_seconds, 4),
+            "other_seconds": round(max(0.0, total - turn["llm_seconds"] - tool_seconds), 4),
+            "iterations": turn["llm_calls"],
+            "prompt_tokens": turn["prompt_tokens"],
+            "completion_tokens": turn["completion_tokens"],
+            "llm_steps": turn["llm_steps"],
+            "tools": turn["tools"],
+            "error": error,
+        }
+        self.last_turn = summary
+
+        self.registry.inc("zeenova_turns_total", help="Agent turns", status="error" if error else "ok")
+        self.registry.observe("zeenova_turn_latency_seconds", total, help="End-to-end agent turn latency")
+        self.registry.observe("zeenova_agent_iterations", turn["llm_calls"], buckets=ITERATION_BUCKETS,
+                              help="LLM calls (ReAct iterations) per turn")
+        append_jsonl(summary, self.jsonl_path)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._finish_turn(run_id, error=False)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            self._finish_turn(run_id, error=True)
+
+    # --- LLM ---
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (serialized or {}).get("kwargs", {}).get("model")
+        # Cascade steps are tagged "route", "answer" or "escalate" (agent/cascade.py)
+        role = (kwargs.get("metadata") or {}).get("cascade_step")
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), model, role)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            started, model, role = self._starts.pop(run_id, (None, None, None))
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        # The model that actually answered; it differs from the requested one after a rate-limit fallback
+        model = (response.llm_output or {}).get("model_name") or model or "unknown"
+
+        self.registry.inc("zeenova_llm_requests_total", help="LLM completions", model=model)
+        self.registry.observe("zeenova_llm_latency_seconds", seconds, help="LLM completion latency", model=model)
+        self.registry.inc("zeenova_llm_tokens_total", prompt_tokens, help="LLM tokens", model=model, type="prompt")
+        self.registry.inc("zeenova_llm_tokens_total", completion_tokens, help="LLM tokens", model=model, type="completion")
+        with self._lock:
+            if self._turn is not None:
+                self._turn["model"] = model
+                self._turn["llm_calls"] += 1
+                self._turn["llm_seconds"] += seconds
+                self._turn["prompt_tokens"] += prompt_tokens
+                self._turn["completion_tokens"] += completion_tokens
+                self._turn["llm_steps"].append({"model": model, "role": role, "seconds": round(seconds, 4)})
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            started, model, _ = self._starts.pop(run_id, (None, None, None))
+        if started is not None:
+            self.registry.inc("zeenova_llm_errors_total", help="Failed LLM completions", model=model or "unknown")
+
+    # --- tools ---
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), (serialized or {}).get("name", "unknown"), None)
+
+    def _record_tool(self, run_id, failed: bool):
+        with self._lock:
+            started, name, _ = self._starts.pop(run_id, (None, None, None))
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        self.registry.inc("zeenova_tool_calls_total", help="Tool calls", tool=name)
+        self.registry.observe("zeenova_tool_latency_seconds", seconds, help="Tool call latency", tool=name)
+        if failed:
+            self.registry.inc("zeenova_tool_errors_total", help="Tool calls that failed or returned an error", tool=name)
+        with self._lock:
+            if self._turn is not None:
+                self._turn["tools"].append({"tool": name, "seconds": round(seconds, 4), "error": failed})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._record_tool(run_id, failed=looks_like_error(getattr(output, "content", output)))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._record_tool(run_id, failed=True)
+
+
+def format_turn_breakdown(turn: dict) -> str:
+    """One-line summary of a turn for UIs and logs."""
+    if not turn:
+        return ""
+    tools = ", ".join(f"{t['tool']} {t['seconds']:.2f}s" + (" ⚠️" if t["error"] else "") for t in turn["tools"])
+    models = {}
+    for step in turn.get("llm_steps", []):
+        calls, seconds = models.get(step["model"], (0, 0.0))
+        models[step["model"]] = (calls + 1, seconds + step["seconds"])
+    llm = f" ({turn['iterations']} calls)"
+    if len(models) > 1:
+        # Cascade or fallback turns: show where the LLM time went
+        llm = " (" + ", ".join(f"{model.split('/')[-1]} ×{calls} {seconds:.2f}s" for model, (calls, seconds) in models.items()) + ")"
+    return (
+        f"⏱️ {turn['total_seconds']:.2f}s total · LLM {turn['llm_seconds']:.2f}s{llm} · "
+        f"tools {turn['tool_seconds']:.2f}s" + (f" ({tools})" if tools else "") +
+        f" · tokens {turn['prompt_tokens']}→{turn['completion_tokens']}"
+    )
+
+
+def render_prometheus() -> str:
+    return metrics_registry.render_prometheus()
+
+
+def get_metrics() -> dict:
+    return metrics_registry.snapshot()
+
+
+__all__ = [
+    "MetricsRegistry", "MetricsCallbackHandler", "metrics_registry",
+    "render_prometheus", "get_metrics", "format_turn_breakdown", "append_jsonl",
+]
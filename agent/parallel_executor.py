@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import CallbackManagerForChainRun
+from langchain_core.exceptions import OutputParserException
+
+from tools.fan_out import fan_out
+
+# AgentExecutor for tool-calling agents.
+# With native tool calling the model can ask for several tools in one response
+# ("weather in Delhi and Mumbai plus USD to INR"). The stock executor runs those
+# one after another on the sync path; this one runs them concurrently, so a step
+# costs as much as its slowest tool. The async path already gathers them.
+
+# Upper bound for one step's tools; the turn deadline (tools/deadline.py) usually cuts in first
+TOOL_STEP_TIMEOUT_SECONDS = 60
+
+# Tool actions get their own pool: a tool may fan out itself (the e-commerce
+# search queries its storefronts on tools/fan_out.py's pool), and sharing that
+# pool would let busy steps starve the storefront calls they are waiting on
+TOOL_ACTION_WORKERS = int(os.getenv("TOOL_ACTION_WORKERS", "64"))
+_action_executor = ThreadPoolExecutor(max_workers=TOOL_ACTION_WORKERS, thread_name_prefix="tool-action")
+
+
+class ParallelToolExecutor(AgentExecutor):
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: dict,
+        color_mapping: dict,
+        inputs: dict,
+        intermediate_steps: list,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        try:
+            output = self._action_agent.plan(
+                self._prepare_intermediate_steps(intermediate_steps),
+                callbacks=run_manager.get_child() if run_manager else None,
+                **inputs,
+            )
+        except OutputParserException as e:
+            if not self.handle_parsing_errors:
+                raise
+            # Same recovery as AgentExecutor: hand the error back to the model as an observation
+            observation = str(e.observation) if e.send_to_llm else "Invalid or incomplete response"
+            yield AgentStep(action=AgentAction("_Exception", observation, str(e.llm_output)), observation=observation)
+            return
+
+        if isinstance(output, AgentFinish):
+            yield output
+            return
+
+        actions = [output] if isinstance(output, AgentAction) else list(output)
+        yield from actions
+        if len(actions) == 1:
+            yield self._perform_agent_action(name_to_tool_map, color_mapping, actions[0], run_manager)
+            return
+
+        calls = {
+            i: (lambda action=action: self._perform_agent_action(name_to_tool_map, color_mapping, action, run_manager))
+            for i, action in enumerate(actions)
+        }
+        outcome = fan_out(calls, TOOL_STEP_TIMEOUT_SECONDS, _action_executor)
+        for i, action in enumerate(actions):
+            if i in outcome.results:
+                yield outcome.results[i]
+            else:
+                error = outcome.failed.get(i)
+                if error is not None and not isinstance(error, Exception):
+                    raise error
+                observation = f"⚠️ {action.tool} failed: {error}" if error else f"⚠️ {action.tool} timed out."
+                yield AgentStep(action=action, observation=observation)
+
+
+__all__ = ["ParallelToolExecutor"]
@@ -0,0 +1,93 @@
+import os
+import logging
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+logger = logging.getLogger(__name__)
+
+# Vendored copy of the "hwchase17/structured-chat-agent" prompt from LangChain Hub.
+# Bundling it avoids a network call at import time and lets the app start offline.
+HUB_PROMPT_ID = "hwchase17/structured-chat-agent"
+
+STRUCTURED_CHAT_SYSTEM = '''Respond to the human as helpfully and accurately as possible. You have access to the following tools:
+
+{tools}
+
+Use a json blob to specify a tool by providing an action key (tool name) and an action_input key (tool input).
+
+Valid "action" values: "Final Answer" or {tool_names}
+
+Provide only ONE action per $JSON_BLOB, as shown:
+
+```
+{{
+  "action": $TOOL_NAME,
+  "action_input": $INPUT
+}}
+```
+
+Follow this format:
+
+Question: input question to answer
+Thought: consider previous and subsequent steps
+Action:
+```
+$JSON_BLOB
+```
+Observation: action result
+... (repeat Thought/Action/Observation N times)
+Thought: I know what to respond
+Action:
+```
+{{
+  "action": "Final Answer",
+  "action_input": "Final response to human"
+}}
+
+Begin! Reminder to ALWAYS respond with a valid json blob of a single action. Use tools if necessary. Respond directly if appropriate. Format is Action:```$JSON_BLOB```then Observation'''
+
+STRUCTURED_CHAT_HUMAN = '''{input}
+
+{agent_scratchpad}
+ (reminder to respond in a JSON blob no matter what)'''
+
+
+def structured_chat_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([
+        ("system", STRUCTURED_CHAT_SYSTEM),
+        MessagesPlaceholder("chat_history", optional=True),
+        ("human", STRUCTURED_CHAT_HUMAN),
+    ])
+
+
+def tool_calling_prompt(system_message: str) -> ChatPromptTemplate:
+    """Prompt for native tool calling: the tools travel in the request, not the prompt text."""
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=system_message),
+        MessagesPlaceholder("chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
+
+
+def load_agent_prompt(refresh: bool = None) -> ChatPromptTemplate:
+    """
+    Returns the bundled structured-chat prompt.
+    With refresh=True (or ZEENOVA_REFRESH_PROMPT=1) the latest version is pulled
+    from LangChain Hub instead, falling back to the bundled copy on any error.
+    """
+    if refresh is None:
+        refresh = os.getenv("ZEENOVA_REFRESH_PROMPT", "").lower() in ("1", "true", "yes")
+
+    if refresh:
+        try:
+            from langchain import hub
+            return hub.pull(HUB_PROMPT_ID)
+        except Exception as e:
+            logger.warning("Could not refresh %s from LangChain Hub, using bundled prompt: %s", HUB_PROMPT_ID, e)
+
+    return structured_chat_prompt()
+
+
+__all__ = ["load_agent_prompt", "structured_chat_prompt", "tool_calling_prompt"]
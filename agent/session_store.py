@@ -0,0 +1,410 @@
+import os, json, time, zlib, sqlite3, asyncio, logging, threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+
+from agent.memory import TokenBudgetMemory
+from models.model_enum import ModelName
+
+logger = logging.getLogger(__name__)
+
+# Chat sessions, persisted and evicted.
+# A session's whole state (transcript, memory summary, model) is stored as one
+# zlib-compressed JSON blob, written through after every turn. Sessions are
+# loaded lazily when a session ID comes back and dropped from RAM when idle or
+# when the process exceeds its session budget; the store keeps them.
+#
+# The transcript is the only copy of the history: the UI renders it, and the
+# memory's verbatim window is stored as a (start, count) slice of it.
+#
+# Several workers can share one store without sticky routing. Every stored
+# session carries a version: a worker reloads its resident copy when the store
+# has moved on, and saves with compare-and-set, so a turn that raced another
+# worker's is merged onto the newer state instead of overwriting it. Sessions
+# untouched for SESSION_TTL_SECONDS are purged from the store.
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")  # "sqlite" or "memory"
+SESSION_DB = os.getenv("SESSION_DB", "sessions.sqlite3")
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(30 * 86400)))  # 0 keeps sessions forever
+SESSION_PURGE_INTERVAL_SECONDS = float(os.getenv("SESSION_PURGE_INTERVAL_SECONDS", "3600"))
+SESSION_MEMORY_CAP_MB = float(os.getenv("SESSION_MEMORY_CAP_MB", "256"))
+MAX_RESIDENT_SESSIONS = int(os.getenv("MAX_RESIDENT_SESSIONS", "2000"))
+DEFAULT_MODEL = ModelName[os.getenv("ZEENOVA_DEFAULT_MODEL", "GPT_4_1")]
+
+# Fixed per-session overhead (memory object, executor wrappers) on top of the text
+_SESSION_OVERHEAD_BYTES = 16 * 1024
+_CHAT_ROLES = ("user", "assistant")
+
+
+class SessionConflict(Exception):
+    """The stored session changed since it was loaded (another worker saved a turn)."""
+
+
+def encode_state(state: dict) -> bytes:
+    return zlib.compress(json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_state(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class InMemorySessionStore:
+    """Keeps encoded sessions in a dict; for tests and single-process setups without persistence."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blobs = {}
+
+    def load(self, session_id: str):
+        """(version, state), or None for an unknown session."""
+        with self._lock:
+            entry = self._blobs.get(session_id)
+        return (entry[1], decode_state(entry[2])) if entry else None
+
+    def version(self, session_id: str):
+        with self._lock:
+            entry = self._blobs.get(session_id)
+        return entry[1] if entry else None
+
+    def save(self, session_id: str, state: dict, expected=None) -> int:
+        """Stores the session if its version is still `expected` (None: not stored yet); returns the new version."""
+        blob = encode_state(state)
+        with self._lock:
+            entry = self._blobs.get(session_id)
+            if (entry[1] if entry else None) != expected:
+                raise SessionConflict(session_id)
+            version = (expected or 0) + 1
+            self._blobs[session_id] = (time.time(), version, blob)
+        return version
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._blobs.pop(session_id, None)
+
+    def purge(self, older_than: float):
+        cutoff = time.time() - older_than
+        with self._lock:
+            for session_id in [k for k, (updated, _, _) in self._blobs.items() if updated < cutoff]:
+                del self._blobs[session_id]
+
+
+class SQLiteSessionStore:
+    """One row per session; WAL mode so several worker processes can share the file."""
+
+    def __init__(self, path: str = SESSION_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, updated_at REAL NOT NULL, state BLOB NOT NULL, "
+                "version INTEGER NOT NULL DEFAULT 1)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+            if "version" not in columns:  # files written before sessions were versioned
+                self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    def load(self, session_id: str):
+        """(version, state), or None for an unknown session."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, state FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return (row[0], decode_state(row[1])) if row else None
+
+    def version(self, session_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, state: dict, expected=None) -> int:
+        """Stores the session if its version is still `expected` (None: not stored yet); returns the new version."""
+        blob = encode_state(state)
+        with self._lock, self._conn:
+            if expected is None:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, updated_at, state, version) VALUES (?, ?, ?, 1)",
+                    (session_id, time.time(), blob),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE sessions SET updated_at = ?, state = ?, version = version + 1 "
+                    "WHERE session_id = ? AND version = ?",
+                    (time.time(), blob, session_id, expected),
+                )
+        if cursor.rowcount != 1:
+            raise SessionConflict(session_id)
+        return (expected or 0) + 1
+
+    def delete(self, session_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge(self, older_than: float):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - older_than,))
+
+
+def make_session_store(kind: str = SESSION_STORE, path: str = SESSION_DB):
+    if kind == "memory":
+        return InMemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(path)
+    raise ValueError(f"Unknown session store {kind!r}; expected 'sqlite' or 'memory'")
+
+
+class ChatSession:
+    """One conversation: transcript, token-budgeted memory and the agent bound to it."""
+
+    def __init__(self, session_id: str, model: ModelName):
+        self.session_id = session_id
+        self.model = model
+        self.memory = TokenBudgetMemory.for_model(model)
+        self.transcript = []  # [role, content]; role is "user", "assistant" or "error"
+        self.last_used = time.time()
+        self.in_turn = 0
+        self.turn_lock = None  # set by async callers that serialize turns per session
+        self.version = None  # stored version this copy is based on; None until first saved
+        self.synced = 0  # transcript entries already in that stored version
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            from agent.agent_setup import get_agent_executor
+            self._executor = get_agent_executor(self.model, self.memory)
+        return self._executor
+
+    def set_model(self, model: ModelName):
+        if model != self.model:
+            self.model = model
+            self.memory.set_model(model)
+            self._executor = None
+
+    def add(self, role: str, content: str):
+        self.transcript.append([role, content])
+
+    def approx_bytes(self) -> int:
+        text = sum(len(content) for _, content in self.transcript) + len(self.memory.summary)
+        return _SESSION_OVERHEAD_BYTES + 2 * text
+
+    def to_state(self) -> dict:
+        memory = self.memory.to_state()
+        kept = memory.pop("messages")
+        chat = [entry for entry in self.transcript if entry[0] in _CHAT_ROLES]
+        # The memory's kept messages are normally the transcript's last ones (a
+        # failed turn can follow them); store them as a slice of it then, and
+        # verbatim only when they are not found
+        for start in range(len(chat) - len(kept), max(-1, len(chat) - len(kept) - 4), -1):
+            if chat[start:start + len(kept)] == kept:
+                memory["window"] = [start, len(kept)]
+                break
+        else:
+            memory["messages"] = kept
+        return {"v": 1, "model": self.model.name, "transcript": self.transcript, "memory": memory}
+
+    def load_state(self, state: dict, version=None):
+        """Replaces this copy's history with a stored state (in place: the executor keeps its memory)."""
+        self.set_model(ModelName[state["model"]])
+        self.transcript = state.get("transcript", [])
+        memory = dict(state.get("memory", {}))
+        if "window" in memory:
+            start, count = memory.pop("window")
+            chat = [entry for entry in self.transcript if entry[0] in _CHAT_ROLES]
+            memory["messages"] = chat[start:start + count]
+        self.memory.load_state(memory)
+        self.version = version
+        self.synced = len(self.transcript)
+
+    def rebase(self, state: dict, version):
+        """Moves the entries added since the last sync on top of a newer stored state."""
+        added = self.transcript[self.synced:]
+        self.load_state(state, version)
+        self.transcript.extend(added)
+        for (role, content), (next_role, answer) in zip(added, added[1:]):
+            if role == "user" and next_role == "assistant":
+                self.memory.save_context({"input": content}, {"output": answer})
+
+    @classmethod
+    def from_state(cls, session_id: str, state: dict, version=None) -> "ChatSession":
+        session = cls(session_id, ModelName[state["model"]])
+        session.load_state(state, version)
+        return session
+
+
+class SessionManager:
+    """
+    Resident sessions in LRU order, backed by a session store. Idle sessions and
+    the least recently used ones beyond the process budget are dropped from RAM;
+    sessions inside a turn are never dropped.
+    """
+
+    def __init__(self, store, idle_seconds: float = SESSION_IDLE_SECONDS,
+                 memory_cap_mb: float = SESSION_MEMORY_CAP_MB, max_resident: int = MAX_RESIDENT_SESSIONS,
+                 ttl_seconds: float = SESSION_TTL_SECONDS, purge_interval: float = SESSION_PURGE_INTERVAL_SECONDS):
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.memory_cap_bytes = int(memory_cap_mb * 1024 * 1024)
+        self.max_resident = max_resident
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._sizes = {}
+        self.loads = 0
+        self.reloads = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    def get(self, session_id: str, model: ModelName = None) -> ChatSession:
+        """Resident session (brought up to date with the store), else the stored one, else a new empty session."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+        if session is not None:
+            self.sync(session)
+        else:
+            stored = self.store.load(session_id)
+            if stored is not None:
+                session = ChatSession.from_state(session_id, stored[1], stored[0])
+                self.loads += 1
+            else:
+                session = ChatSession(session_id, model or DEFAULT_MODEL)
+            with self._lock:
+                # Another thread may have loaded it meanwhile; keep the first copy
+                session = self._sessions.setdefault(session_id, session)
+                self._sizes[session_id] = session.approx_bytes()
+        if model is not None:
+            session.set_model(model)
+        session.last_used = time.time()
+        self.evict()
+        return session
+
+    async def aget(self, session_id: str, model: ModelName = None) -> ChatSession:
+        """get() in a worker thread, so store I/O does not block the event loop."""
+        return await asyncio.to_thread(self.get, session_id, model)
+
+    def sync(self, session: ChatSession):
+        """Reloads a resident copy another worker has moved past; copies inside a turn are left alone."""
+        if session.in_turn:
+            return
+        version = self.store.version(session.session_id)
+        if version is None or version == session.version:
+            return
+        stored = self.store.load(session.session_id)
+        if stored is not None:
+            session.load_state(stored[1], stored[0])
+            self.reloads += 1
+
+    def save(self, session: ChatSession, attempts: int = 5):
+        for _ in range(attempts):
+            try:
+                session.version = self.store.save(session.session_id, session.to_state(), session.version)
+                session.synced = len(session.transcript)
+                break
+            except SessionConflict:
+                # Another worker saved a turn of this session meanwhile: put ours after it
+                self.conflicts += 1
+                stored = self.store.load(session.session_id)
+                if stored is None:  # deleted meanwhile; store this copy as new
+                    session.version = None
+                else:
+                    session.rebase(stored[1], stored[0])
+        else:
+            logger.warning("Session %s not saved: kept conflicting with other workers", session.session_id)
+        with self._lock:
+            if session.session_id in self._sessions:
+                self._sizes[session.session_id] = session.approx_bytes()
+
+    def _end_turn(self, session: ChatSession):
+        self.save(session)
+        self.evict()
+
+    @contextmanager
+    def turn(self, session: ChatSession):
+        """Keeps the session resident while a turn runs and saves it afterwards."""
+        self.sync(session)
+        session.in_turn += 1
+        try:
+            yield session
+        finally:
+            session.in_turn -= 1
+            session.last_used = time.time()
+            self._end_turn(session)
+
+    @asynccontextmanager
+    async def aturn(self, session: ChatSession):
+        """turn() for async callers; the store reads and writes run in a worker thread."""
+        await asyncio.to_thread(self.sync, session)
+        session.in_turn += 1
+        try:
+            yield session
+        finally:
+            session.in_turn -= 1
+            session.last_used = time.time()
+            await asyncio.to_thread(self._end_turn, session)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            resident = self._sessions.pop(session_id, None) is not None
+            self._sizes.pop(session_id, None)
+        stored = self.store.load(session_id) is not None
+        self.store.delete(session_id)
+        return resident or stored
+
+    async def adelete(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self.delete, session_id)
+
+    def evict(self):
+        now = time.time()
+        with self._lock:
+            total = sum(self._sizes.values())
+            for session_id, session in list(self._sessions.items()):  # least recently used first
+                over_budget = total > self.memory_cap_bytes or len(self._sessions) > self.max_resident
+                idle = now - session.last_used > self.idle_seconds
+                if not (over_budget or idle):
+                    continue
+                if session.in_turn:
+                    continue
+                # Every turn was written through, so nothing is lost here
+                del self._sessions[session_id]
+                total -= self._sizes.pop(session_id, 0)
+                self.evictions += 1
+        self.purge(now)
+
+    def purge(self, now: float = None):
+        """Drops sessions untouched for ttl_seconds from the store, at most once per purge_interval."""
+        now = time.time() if now is None else now
+        if not self.ttl_seconds or now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        try:
+            self.store.purge(self.ttl_seconds)
+        except Exception as e:
+            logger.warning("Session purge failed: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident": len(self._sessions),
+                "resident_bytes": sum(self._sizes.values()),
+                "memory_cap_bytes": self.memory_cap_bytes,
+                "loads": self.loads,
+                "reloads": self.reloads,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide sessions; SESSION_STORE=memory keeps them in this process only
+session_manager = SessionManager(make_session_store())
+
+
+__all__ = [
+    "ChatSession", "SessionManager", "SessionConflict", "session_manager", "InMemorySessionStore", "SQLiteSessionStore",
+    "make_session_store", "encode_state", "decode_state", "DEFAULT_MODEL",
+]
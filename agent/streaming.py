@@ -0,0 +1,118 @@
+import re
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# The structured-chat agent answers with a JSON blob such as
+#   {"action": "Final Answer", "action_input": "..."}
+# These helpers pull the action_input text out of the token stream as it
+# arrives, so the UI can show the answer before the completion finishes.
+# A tool-calling agent streams its answer as plain message content instead
+# (tool calls carry no content), so there the tokens are passed through as is.
+
+_FINAL_ACTION = re.compile(r'"action"\s*:\s*"Final Answer"')
+_ACTION_INPUT = re.compile(r'"action_input"\s*:\s*"')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class FinalAnswerStreamer:
+    """Incrementally decodes the Final Answer action_input from streamed model tokens."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._buffer = ""
+        self._pos = None  # index in _buffer where the action_input string body starts
+        self.text = ""
+        self.done = False
+
+    def feed(self, token: str) -> str:
+        """Adds a token and returns the newly decoded answer text (may be empty)."""
+        if self.done:
+            return ""
+        self._buffer += token
+
+        if self._pos is None:
+            if not _FINAL_ACTION.search(self._buffer):
+                return ""
+            match = _ACTION_INPUT.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        new_text = []
+        buffer, i = self._buffer, self._pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch == "\\":
+                if i + 1 >= len(buffer):
+                    break  # wait for the rest of the escape sequence
+                code = buffer[i + 1]
+                if code == "u":
+                    if i + 6 > len(buffer):
+                        break
+                    try:
+                        new_text.append(chr(int(buffer[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                else:
+                    new_text.append(_ESCAPES.get(code, code))
+                    i += 2
+                continue
+            new_text.append(ch)
+            i += 1
+        self._pos = i
+
+        decoded = "".join(new_text)
+        self.text += decoded
+        return decoded
+
+
+class PlainAnswerStreamer:
+    """Streamer for answers sent as plain content (tool-calling agents)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+
+    def feed(self, token: str) -> str:
+        self.text += token
+        return token
+
+
+class FinalAnswerCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler that forwards the agent's final answer as it streams.
+    `on_text` is called with the full answer text decoded so far.
+    Pass structured=False for tool-calling agents.
+    """
+
+    # Tokens must be fed in order; on the async path LangChain would otherwise
+    # dispatch each callback of a sync handler to a thread pool
+    run_inline = True
+
+    def __init__(self, on_text, structured: bool = True):
+        self.on_text = on_text
+        self._streamer = FinalAnswerStreamer() if structured else PlainAnswerStreamer()
+
+    @property
+    def text(self) -> str:
+        return self._streamer.text
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        # Each ReAct step is a new completion; only the last one holds the final answer
+        self._streamer.reset()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self._streamer.feed(token):
+            self.on_text(self._streamer.text)
+
+
+__all__ = ["FinalAnswerStreamer", "PlainAnswerStreamer", "FinalAnswerCallbackHandler"]
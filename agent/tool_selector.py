@@ -0,0 +1,107 @@
+import math
+import re
+
+from tools.tool_registry import tools
+
+# Cheap lexical tool selection.
+# Scores every registered tool against the query so the agent prompt only has to
+# describe the few tools that can plausibly help, instead of the full catalogue.
+
+DEFAULT_TOP_K = 4
+
+# Tools always offered as a general-purpose fallback
+FALLBACK_TOOLS = ["Google Search"]
+# Used when nothing in the query points at a specific tool
+GENERAL_TOOLS = ["Google Search", "Wikipedia"]
+
+TOOL_KEYWORDS = {
+    "Time": ["time", "clock", "hour", "now"],
+    "Wikipedia": ["who", "what", "history", "biography", "capital", "founded", "invented", "define", "meaning", "wiki", "explain", "born", "population"],
+    "Google Search": ["news", "latest", "search", "current", "recent", "update", "score", "election", "trending", "won", "today"],
+    "Stock Price Checker": ["stock", "share", "ticker", "nse", "bse", "nasdaq", "nyse", "market", "sensex", "nifty", "equity"],
+    "Weather": ["weather", "temperature", "rain", "humidity", "forecast", "hot", "cold", "climate", "sunny", "raining", "degrees"],
+    "Currency Converter": ["convert", "currency", "exchange", "usd", "inr", "eur", "gbp", "jpy", "aed", "dollar", "rupee", "euro", "pound", "yen"],
+    "YouTube Video Search": ["youtube", "video", "watch", "channel", "vlog", "trailer"],
+    "E-commerce Product Search": ["buy", "amazon", "flipkart", "product", "phone", "laptop", "earbud", "best", "under", "deal", "shopping", "mobile", "headphone", "tv", "cheapest"],
+    "Indian Holiday Lookup": ["holiday", "festival", "vacation", "diwali", "holi", "eid", "christmas", "off"],
+    "Train Live Status Checker": ["train", "running", "railway", "irctc", "station", "platform", "late"],
+    "PNR Status Checker": ["pnr", "ticket", "booking", "confirmed", "waitlist", "seat", "berth", "rac"],
+    "Flight Status Checker": ["flight", "airline", "departure", "arrival", "airport", "delayed", "plane", "indigo"],
+    "FD Rates Checker": ["fd", "fixed", "deposit", "interest", "bank", "sbi", "hdfc", "icici", "senior", "tenure"],
+    "Recharge Plan Search": ["recharge", "plan", "prepaid", "postpaid", "airtel", "jio", "vi", "vodafone", "telecom", "talktime"],
+}
+
+# Structural cues that identify a tool with high confidence
+PATTERN_BOOSTS = [
+    ("PNR Status Checker", re.compile(r"\b\d{10}\b")),
+    ("Train Live Status Checker", re.compile(r"\b\d{5}\b")),
+    ("Flight Status Checker", re.compile(r"\b(?:[a-z][a-z0-9]|[0-9][a-z])\s?\d{2,4}\b", re.IGNORECASE)),
+    ("Currency Converter", re.compile(r"\b\d+(?:\.\d+)?\s*[a-z]{3}\s+(?:to|in|into)\s+[a-z]{3}\b", re.IGNORECASE)),
+    ("Stock Price Checker", re.compile(r"\b[A-Z]{2,5}(?:\.(?:NS|BO))?\b")),
+]
+PATTERN_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 0.3
+HISTORY_WEIGHT = 0.5
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "of", "to", "in", "for", "on", "and", "or", "me", "my", "i",
+    "you", "your", "it", "this", "that", "use", "tool", "like", "with", "by", "from", "as", "be",
+    "can", "should", "input", "get", "tell", "show", "find", "please", "about", "using",
+}
+
+
+def _tokens(text: str) -> list:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    # crude plural folding: "holidays" -> "holiday", "rates" -> "rate"
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words if w not in _STOPWORDS]
+
+
+class ToolSelector:
+    """Ranks tools for a query by weighted keyword overlap plus structural patterns."""
+
+    def __init__(self, tool_list=tools, keywords=TOOL_KEYWORDS):
+        self.tool_names = [tool.name for tool in tool_list]
+        weights = {name: {} for name in self.tool_names}
+
+        for tool in tool_list:
+            for token in _tokens(f"{tool.name} {tool.description}"):
+                weights[tool.name][token] = max(weights[tool.name].get(token, 0.0), DESCRIPTION_WEIGHT)
+            for token in _tokens(" ".join(keywords.get(tool.name, []))):
+                weights[tool.name][token] = 1.0
+
+        # IDF-style damping: words shared by many tools say little about any one of them
+        document_frequency = {}
+        for table in weights.values():
+            for token in table:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        n = len(self.tool_names)
+        self._weights = {
+            name: {t: w * (1.0 + math.log(n / document_frequency[t])) for t, w in table.items()}
+            for name, table in weights.items()
+        }
+
+    def score(self, query: str, history: str = "") -> dict:
+        scores = dict.fromkeys(self.tool_names, 0.0)
+        for text, factor in ((query, 1.0), (history, HISTORY_WEIGHT)):
+            if not text:
+                continue
+            tokens = set(_tokens(text))
+            for name, table in self._weights.items():
+                scores[name] += factor * sum(table.get(t, 0.0) for t in tokens)
+            for name, pattern in PATTERN_BOOSTS:
+                if name in scores and pattern.search(text):
+                    scores[name] += factor * PATTERN_WEIGHT
+        return scores
+
+    def select(self, query: str, history: str = "", top_k: int = DEFAULT_TOP_K) -> tuple:
+        """Returns the names of the most relevant tools, in registry order."""
+        scores = self.score(query, history)
+        ranked = [name for name, s in sorted(scores.items(), key=lambda kv: -kv[1]) if s > 0][:top_k]
+        chosen = set(ranked or GENERAL_TOOLS) | set(FALLBACK_TOOLS)
+        return tuple(name for name in self.tool_names if name in chosen)
+
+
+tool_selector = ToolSelector()
+
+
+__all__ = ["ToolSelector", "tool_selector", "DEFAULT_TOP_K"]
@@ -0,0 +1,264 @@
+import os, json, uuid, asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from openai import RateLimitError, APIError
+from pydantic import BaseModel
+
+from agent.agent_setup import AGENT_MODE
+from agent.answer_cache import get_answer_cache_stats
+from agent.fast_router import get_fast_path_stats
+from agent.metrics import MetricsCallbackHandler, render_prometheus
+from agent.session_store import session_manager, ChatSession, DEFAULT_MODEL
+from agent.streaming import FinalAnswerCallbackHandler
+from models.model_enum import ModelName
+from tools.http_client import circuit_breakers
+from tools.rate_limiter import UpstreamRateLimited, get_quota_stats
+from tools.records import render_markdown
+from tools.single_flight import get_single_flight_stats
+
+# Headless chat service: the same agent as streamlit_app.py over HTTP.
+#
+#   uvicorn api.main:app --host 0.0.0.0 --port 8000 --workers 4
+#
+# Turns run on the async agent path. A process-wide limiter bounds concurrent
+# turns and the queue in front of them, so overload turns into fast 503s
+# instead of piling up. Sessions come from the shared session store (see
+# agent/session_store.py) and are written through after every turn. Stored
+# sessions are versioned: a worker reloads its copy when another worker has
+# saved a newer turn, and racing turns are merged rather than overwritten, so
+# any worker can serve any session; sticky routing only saves the reloads.
+# Sessions store answers in the compact form the agent saw (see
+# tools/records.py); responses carry the rendered markdown.
+
+MAX_CONCURRENT_TURNS = int(os.getenv("API_MAX_CONCURRENT_TURNS", "16"))
+MAX_QUEUED_TURNS = int(os.getenv("API_MAX_QUEUED_TURNS", "64"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("API_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class TurnLimiter:
+    """At most `max_concurrent` turns run at once; up to `max_queued` more wait for a slot."""
+
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self.queued >= self.max_queued:
+            self.rejected += 1
+            raise QueueFull("Too many requests are waiting; try again shortly.")
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise QueueFull("Timed out waiting for a free worker; try again shortly.")
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active, "queued": self.queued, "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent, "max_queued": self.max_queued,
+        }
+
+
+limiter = TurnLimiter(MAX_CONCURRENT_TURNS, MAX_QUEUED_TURNS, QUEUE_TIMEOUT_SECONDS)
+
+
+def _parse_model(name: Optional[str]) -> ModelName:
+    if not name:
+        return DEFAULT_MODEL
+    for model in ModelName:
+        if name in (model.name, model.value):
+            return model
+    raise HTTPException(status_code=400, detail=f"Unknown model {name!r}")
+
+
+async def _get_session(session_id: Optional[str], model_name: Optional[str]) -> ChatSession:
+    model = _parse_model(model_name) if model_name else None
+    # Store I/O runs off the event loop, so a slow load does not stall other streams
+    return await session_manager.aget(session_id or uuid.uuid4().hex, model)
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    model: Optional[str] = None
+
+
+class SessionRequest(BaseModel):
+    model: Optional[str] = None
+
+
+def _error_status(error: Exception) -> tuple:
+    if isinstance(error, QueueFull):
+        return 503, str(error)
+    if isinstance(error, (RateLimitError, UpstreamRateLimited)):
+        return 429, "⚠️ I'm currently over my usage limit. Please try again later."
+    if isinstance(error, APIError):
+        return 502, f"🚨 API Error: {error}"
+    return 500, f"An unexpected error occurred: {error}"
+
+
+async def _run_turn(session: ChatSession, message: str, callbacks: list) -> dict:
+    metrics_handler = MetricsCallbackHandler(session_id=session.session_id)
+    if session.turn_lock is None:
+        # One turn at a time per session, so the history stays in order
+        session.turn_lock = asyncio.Lock()
+    async with limiter.slot(), session.turn_lock:
+        async with session_manager.aturn(session):
+            response = await session.executor.ainvoke(
+                {"input": message}, config={"callbacks": [*callbacks, metrics_handler]}
+            )
+            session.add("user", message)
+            session.add("assistant", response.get("output", "[No output]"))
+    return {
+        "session_id": session.session_id,
+        "model": session.model.value,
+        "output": render_markdown(response.get("output", "[No output]")),
+        "fast_path": bool(response.get("fast_path")),
+        "cached": response.get("cached"),
+        "deadline_exceeded": bool(response.get("deadline_exceeded")),
+        "turn": metrics_handler.last_turn,
+    }
+
+
+app = FastAPI(title="ZeeNova AI Agent")
+
+
+@app.post("/sessions")
+async def create_session(request: SessionRequest = None):
+    session = await _get_session(None, request.model if request else None)
+    return {"session_id": session.session_id, "model": session.model.value}
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    session = await _get_session(session_id, None)
+    transcript = [[role, render_markdown(content)] for role, content in session.transcript]
+    return {"session_id": session_id, "model": session.model.value, "transcript": transcript}
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    if not await session_manager.adelete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return {"deleted": session_id}
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    session = await _get_session(request.session_id, request.model)
+    try:
+        return await _run_turn(session, request.message, [])
+    except Exception as e:
+        status, detail = _error_status(e)
+        headers = {"Retry-After": "1"} if status == 503 else None
+        return JSONResponse({"session_id": session.session_id, "error": detail}, status_code=status, headers=headers)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-sent events: `token` events carry answer text as it is generated,
+    then one `done` event with the full result (or an `error` event).
+    """
+    session = await _get_session(request.session_id, request.model)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    stream_handler = FinalAnswerCallbackHandler(
+        lambda text: loop.call_soon_threadsafe(queue.put_nowait, text),
+        structured=AGENT_MODE == "structured_chat",
+    )
+    turn = asyncio.create_task(_run_turn(session, request.message, [stream_handler]))
+    turn.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def events():
+        yield _sse("session", {"session_id": session.session_id})
+        sent = 0
+        while True:
+            text = await queue.get()
+            if text is None:
+                break
+            # The handler reports the whole answer so far; send only what is new
+            if len(text) > sent:
+                yield _sse("token", {"text": text[sent:]})
+                sent = len(text)
+            elif len(text) < sent:
+                sent = len(text)  # a new completion started over
+        try:
+            yield _sse("done", turn.result())
+        except Exception as e:
+            status, detail = _error_status(e)
+            yield _sse("error", {"status": status, "error": detail})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "agent_mode": AGENT_MODE,
+        "sessions": session_manager.stats(),
+        "turns": limiter.stats(),
+        "fast_path": get_fast_path_stats(),
+        "answer_cache": get_answer_cache_stats(),
+        "single_flight": get_single_flight_stats(),
+        "breakers": circuit_breakers.snapshot(),
+        "quotas": get_quota_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    stats = limiter.stats()
+    gauges = [
+        "# HELP zeenova_api_turns_in_flight Agent turns currently running",
+        "# TYPE zeenova_api_turns_in_flight gauge",
+        f"zeenova_api_turns_in_flight {stats['active']}",
+        "# HELP zeenova_api_turns_queued Agent turns waiting for a slot",
+        "# TYPE zeenova_api_turns_queued gauge",
+        f"zeenova_api_turns_queued {stats['queued']}",
+        "# HELP zeenova_api_turns_rejected_total Turns rejected because the queue was full",
+        "# TYPE zeenova_api_turns_rejected_total counter",
+        f"zeenova_api_turns_rejected_total {stats['rejected']}",
+        "# HELP zeenova_api_sessions Sessions resident in this worker",
+        "# TYPE zeenova_api_sessions gauge",
+        f"zeenova_api_sessions {session_manager.stats()['resident']}",
+    ]
+    return render_prometheus() + "\n".join(gauges) + "\n"
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("api.main:app", host=os.getenv("API_HOST", "0.0.0.0"), port=int(os.getenv("API_PORT", "8000")))
@@ -0,0 +1,294 @@
+"""
+Offline latency benchmark: tools and full agent turns against local stubs.
+
+Starts benchmarks/stub_servers.py, points every upstream (and the LLM) at it,
+then times each tool call and each end-to-end agent turn. No keys or network
+access are needed.
+
+    python -m benchmarks.offline_benchmark
+    python -m benchmarks.offline_benchmark --iterations 50 --latency 40 --latency llm=300 --json run.json
+    python -m benchmarks.offline_benchmark --json new.json --compare run.json --max-regression 15
+    python -m benchmarks.offline_benchmark --model GPT_4_1 --cascade --latency llm=150 --latency llm:openai/gpt-4.1=600
+
+Tool calls run cold by default (tool caches are cleared before every call);
+pass --warm to measure cache hits instead. Wikipedia and Stock Price Checker
+go through third-party client libraries rather than a URL and are not covered.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.stub_servers import StubCluster, LatencyConfig
+
+TOOL_CASES = [
+    ("Time", ""),
+    ("Google Search", "latest AI news"),
+    ("Weather", "Mumbai"),
+    ("Weather", ""),  # location from ipinfo
+    ("Currency Converter", "100 USD to INR, EUR and GBP"),
+    ("YouTube Video Search", "ISRO launch"),
+    ("E-commerce Product Search", "earbuds under 2000"),
+    ("Indian Holiday Lookup", "upcoming holidays"),
+    ("Train Live Status Checker", {"train_number": "12951", "start_day": "1"}),
+    ("PNR Status Checker", "1234567890"),
+    ("Flight Status Checker", "AI101"),
+    ("FD Rates Checker", "top 3"),
+    ("Recharge Plan Search", "Airtel prepaid under 500"),
+]
+SKIPPED_TOOLS = ["Wikipedia", "Stock Price Checker"]
+
+TURN_QUERIES = [
+    "hello there",
+    "what's the weather like in Mumbai today?",
+    "how much is 100 usd in inr, eur and gbp?",
+    "check my pnr 1234567890",
+    "where is my train 12951 right now?",
+    "status of flight AI101",
+    "best fd rates right now",
+    "airtel recharge plans under 500",
+    "suggest good earbuds under 2000",
+    "find a video about the latest ISRO launch",
+    "any holiday coming up?",
+    "latest AI news",
+    "weather in Mumbai plus 100 usd to inr",  # two tools in one step with tool calling
+]
+
+ERROR_PREFIXES = ("⚠️", "error", "❌ could not", "❌ error", "failed", "please format", "no flight found")
+
+
+def percentiles(samples: list) -> dict:
+    """Latency summary in milliseconds (linear interpolation between ranks)."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        rank = (len(ordered) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(pct(50), 3),
+        "p90_ms": round(pct(90), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def _reset_caches():
+    from agent.answer_cache import answer_cache
+    from tools.tool_cache import tool_cache
+    from tools.currency_rates import currency_engine
+
+    tool_cache.clear()
+    currency_engine.clear()
+    answer_cache.clear()
+
+
+def _looks_like_error(result) -> bool:
+    return str(result).strip().lower().startswith(ERROR_PREFIXES)
+
+
+def bench_tools(iterations: int, warm: bool, warmup: int = 1) -> dict:
+    from tools.tool_registry import tools
+
+    by_name = {tool.name: tool for tool in tools}
+    results = {}
+    for name, tool_input in TOOL_CASES:
+        label = name if tool_input != "" or name == "Time" else f"{name} (ip lookup)"
+        samples, errors = [], 0
+        for i in range(warmup + iterations):
+            if not warm:
+                _reset_caches()
+            start = time.perf_counter()
+            output = by_name[name].invoke(tool_input)
+            if i >= warmup:
+                samples.append((time.perf_counter() - start) * 1000)
+                errors += _looks_like_error(output)
+        results[label] = {**percentiles(samples), "errors": errors}
+    return results
+
+
+async def _abench_turns(iterations: int, model, fast_path: bool, warmup: int, agent_mode: str, cascade: bool) -> dict:
+    from agent.agent_setup import get_agent_executor
+    from agent.memory import TokenBudgetMemory
+
+    per_query = {}
+    for query in TURN_QUERIES:
+        samples, errors = [], 0
+        for i in range(warmup + iterations):
+            _reset_caches()
+            # A fresh session per turn, like a first message in a new chat
+            executor = get_agent_executor(model, TokenBudgetMemory.for_model(model), fast_path=fast_path,
+                                          agent_mode=agent_mode, cascade=cascade)
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):  # AgentExecutor runs verbose
+                    await executor.ainvoke({"input": query})
+            except Exception:
+                errors += i >= warmup
+            if i >= warmup:
+                samples.append((time.perf_counter() - start) * 1000)
+        per_query[query] = (samples, errors)
+    return per_query
+
+
+def _bench_turns_sync(iterations: int, model, fast_path: bool, warmup: int, agent_mode: str, cascade: bool) -> dict:
+    from agent.agent_setup import get_agent_executor
+    from agent.memory import TokenBudgetMemory
+
+    per_query = {}
+    for query in TURN_QUERIES:
+        samples, errors = [], 0
+        for i in range(warmup + iterations):
+            _reset_caches()
+            executor = get_agent_executor(model, TokenBudgetMemory.for_model(model), fast_path=fast_path,
+                                          agent_mode=agent_mode, cascade=cascade)
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    executor.invoke({"input": query})
+            except Exception:
+                errors += i >= warmup
+            if i >= warmup:
+                samples.append((time.perf_counter() - start) * 1000)
+        per_query[query] = (samples, errors)
+    return per_query
+
+
+def bench_turns(iterations: int, model_name: str, fast_path: bool, use_async: bool, warmup: int = 1,
+                agent_mode: str = None, cascade: bool = False) -> dict:
+    from agent.agent_setup import AGENT_MODE
+    from models.model_enum import ModelName
+
+    model = ModelName[model_name]
+    if use_async:
+        # One event loop for every turn, as in a long-running async server
+        raw = asyncio.run(_abench_turns(iterations, model, fast_path, warmup, agent_mode or AGENT_MODE, cascade))
+    else:
+        raw = _bench_turns_sync(iterations, model, fast_path, warmup, agent_mode or AGENT_MODE, cascade)
+
+    all_samples = [ms for samples, _ in raw.values() for ms in samples]
+    return {
+        "end_to_end": percentiles(all_samples),
+        "per_query": {query: {**percentiles(samples), "errors": errors} for query, (samples, errors) in raw.items()},
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list:
+    """Rows of (metric, baseline p50/p95, current p50/p95, worst change %, regressed)."""
+    rows = []
+    pairs = [("end_to_end", current["turns"]["end_to_end"], baseline.get("turns", {}).get("end_to_end"))]
+    pairs += [(f"tool:{name}", stats, baseline.get("tools", {}).get(name)) for name, stats in current["tools"].items()]
+    for metric, now, before in pairs:
+        if not before or not before.get("n") or not now.get("n"):
+            continue
+        changes = [
+            (now[k] - before[k]) / before[k] * 100 if before[k] else 0.0
+            for k in ("p50_ms", "p95_ms")
+        ]
+        worst = max(changes)
+        rows.append((metric, before["p50_ms"], before["p95_ms"], now["p50_ms"], now["p95_ms"], worst, worst > max_regression))
+    return rows
+
+
+def print_report(report: dict):
+    print(f"\n{'tool':<42}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, stats in report["tools"].items():
+        print(f"{name:<42}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['errors']:>8}")
+
+    if not report["turns"]["per_query"]:
+        print(f"\nupstream requests: {json.dumps(report['upstream_requests'], sort_keys=True)}")
+        return
+    print(f"\n{'turn':<42}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for query, stats in report["turns"]["per_query"].items():
+        print(f"{query[:41]:<42}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['errors']:>8}")
+    e2e = report["turns"]["end_to_end"]
+    print(f"{'END TO END':<42}{e2e['p50_ms']:>10.2f}{e2e['p95_ms']:>10.2f}{e2e['p99_ms']:>10.2f}")
+    print(f"\nupstream requests: {json.dumps(report['upstream_requests'], sort_keys=True)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="samples per tool case and per turn")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs first (imports, connection setup)")
+    parser.add_argument("--latency", action="append", metavar="[SERVICE=]MS", help="injected stub latency (repeatable)")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="MS", help="uniform +/- latency jitter")
+    parser.add_argument("--model", default="GPT_4_1_MINI", help="ModelName member used for agent turns")
+    parser.add_argument("--warm", action="store_true", help="keep tool caches between tool calls")
+    parser.add_argument("--no-fast-path", action="store_true", help="send every turn through the LLM agent")
+    parser.add_argument("--agent-mode", choices=("tool_calling", "structured_chat"),
+                        help="agent used for turns (default: ZEENOVA_AGENT_MODE or structured_chat)")
+    parser.add_argument("--cascade", action="store_true",
+                        help="route tool steps through the mini model, answer with --model (see agent/cascade.py)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="run turns with ainvoke")
+    parser.add_argument("--skip-turns", action="store_true", help="only benchmark the tools")
+    parser.add_argument("--json", metavar="PATH", help="write the full report as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0, metavar="PCT",
+                        help="with --compare, exit non-zero if p50/p95 got worse by more than this")
+    args = parser.parse_args(argv)
+
+    latency = LatencyConfig.parse(args.latency, args.jitter)
+    with StubCluster(latency) as cluster:
+        # Must happen before the tools/agent modules are imported: they read
+        # their endpoints and keys from the environment at import time
+        os.environ.update(cluster.env())
+        os.environ.pop("TOOL_CACHE_DB", None)
+
+        report = {
+            "meta": {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "latency": latency.as_dict(),
+                "model": args.model,
+                "warm": args.warm,
+                "fast_path": not args.no_fast_path,
+                "async": args.use_async,
+                "cascade": args.cascade,
+                "agent_mode": args.agent_mode or os.getenv("ZEENOVA_AGENT_MODE", "structured_chat"),
+                "skipped_tools": SKIPPED_TOOLS,
+            },
+            "tools": bench_tools(args.iterations, args.warm, args.warmup),
+            "turns": {"end_to_end": {"n": 0}, "per_query": {}},
+        }
+        if not args.skip_turns:
+            report["turns"] = bench_turns(args.iterations, args.model, not args.no_fast_path, args.use_async, args.warmup,
+                                          args.agent_mode, args.cascade)
+        report["upstream_requests"] = dict(cluster.requests)
+
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.max_regression)
+        print(f"\n{'metric':<42}{'base p50':>10}{'base p95':>10}{'p50':>10}{'p95':>10}{'change':>9}")
+        for metric, b50, b95, n50, n95, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{metric[:41]:<42}{b50:>10.2f}{b95:>10.2f}{n50:>10.2f}{n95:>10.2f}{change:>8.1f}%{flag}")
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Startup-time report: breaks down import cost per module using `python -X importtime`.
+
+    python -m benchmarks.startup_report
+    python -m benchmarks.startup_report --module tools.tool_registry --top 30 --json startup.json
+    python -m benchmarks.startup_report --budget-ms 1500   # non-zero exit if over budget
+
+Each target module is imported in a fresh interpreter so results are not
+skewed by modules another target already loaded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["agent.agent_setup", "tools.tool_registry", "tools.tool_functions"]
+
+# Libraries that should only load when their tool is first used
+LAZY_MODULES = ["yfinance", "pandas", "numpy", "wikipedia", "bs4", "holidays", "serpapi", "dateutil"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_import(module: str) -> dict:
+    """Imports `module` in a subprocess and parses its -X importtime output."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            # nesting is shown as two extra spaces of indentation per level
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    top_level = [e for e in entries if e["depth"] == 0]
+    loaded = {e["module"].split(".")[0] for e in entries}
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "total_ms": round(sum(e["cumulative_ms"] for e in top_level), 1),
+        "modules": entries,
+        "eagerly_loaded_lazy_deps": sorted(m for m in LAZY_MODULES if m in loaded),
+    }
+
+
+def _top(entries: list, n: int) -> list:
+    # Only report packages at their top-level import, so nested imports aren't double counted
+    by_package = {}
+    for e in entries:
+        package = e["module"].split(".")[0]
+        by_package[package] = max(by_package.get(package, 0.0), e["cumulative_ms"])
+    return sorted(by_package.items(), key=lambda kv: -kv[1])[:n]
+
+
+def print_report(results: list, top: int):
+    for result in results:
+        status = "ok" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"\n=== import {result['module']}: {result['total_ms']:.1f} ms ({status})")
+        print(f"{'package':<40}{'cumulative ms':>15}")
+        for package, ms in _top(result["modules"], top):
+            print(f"{package:<40}{ms:>15.1f}")
+        if result["eagerly_loaded_lazy_deps"]:
+            print(f"warning: loaded at import time, expected lazy: {', '.join(result['eagerly_loaded_lazy_deps'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="module to profile (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="packages to list per module")
+    parser.add_argument("--json", metavar="PATH", help="also write the full report as JSON")
+    parser.add_argument("--budget-ms", type=float, help="exit non-zero if any import exceeds this")
+    args = parser.parse_args(argv)
+
+    results = [profile_import(m) for m in (args.module or DEFAULT_MODULES)]
+    print_report(results, args.top)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [r for r in results if not r["ok"]]
+    over_budget = [r for r in results if args.budget_ms and r["total_ms"] > args.budget_ms]
+    return 1 if failed or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
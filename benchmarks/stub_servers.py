@@ -0,0 +1,346 @@
+"""
+Local stand-ins for every upstream the agent talks to, for offline benchmarks.
+
+Each service runs its own ThreadingHTTPServer on 127.0.0.1 (so per-host
+connection pooling behaves like production) and can add a fixed latency plus
+optional jitter before answering. `StubCluster.env()` returns the environment
+overrides that point the tools and GitHubChatLLM at the stubs.
+
+    python -m benchmarks.stub_servers --latency 50 --latency llm=400   # serve until Ctrl+C
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FD_FIXTURE = """<html><head><title>FD Interest Rates</title></head><body>
+<div class="intro">Compare fixed deposit rates across banks.</div>
+<table>
+<tr><th>Bank</th><th>General Citizens</th><th>Senior Citizens</th></tr>
+<tr><td>State Bank of India</td><td>6.50%</td><td>7.50%</td></tr>
+<tr><td>HDFC Bank</td><td>7.00%</td><td>7.50%</td></tr>
+<tr><td>ICICI Bank</td><td>7.00%</td><td>7.50%</td></tr>
+<tr><td>Axis Bank</td><td>7.10%</td><td>7.60%</td></tr>
+<tr><td>Kotak Mahindra Bank</td><td>6.20%</td><td>6.70%</td></tr>
+<tr><td>Punjab National Bank</td><td>6.50%</td><td>7.00%</td></tr>
+<tr><td>Bank of Baroda</td><td>6.50%</td><td>7.15%</td></tr>
+<tr><td>Unity Small Finance Bank</td><td>3.00% - 8.60%</td><td>9.10%</td></tr>
+</table>
+<table><tr><td>Related articles</td></tr></table>
+</body></html>"""
+
+# query fragment -> (tool name, tool input) the scripted LLM answers with
+LLM_SCRIPT = [
+    ("weather", "Weather", "Mumbai"),
+    ("usd", "Currency Converter", "100 USD to INR, EUR and GBP"),
+    ("pnr", "PNR Status Checker", "1234567890"),
+    ("train", "Train Live Status Checker", {"train_number": "12951", "start_day": "1"}),
+    ("flight", "Flight Status Checker", "AI101"),
+    ("fd", "FD Rates Checker", "top 3"),
+    ("recharge", "Recharge Plan Search", "Airtel prepaid under 500"),
+    ("earbuds", "E-commerce Product Search", "earbuds under 2000"),
+    ("video", "YouTube Video Search", "ISRO launch"),
+    ("holiday", "Indian Holiday Lookup", "upcoming holidays"),
+    ("news", "Google Search", "latest AI news"),
+]
+
+
+def _organic_results(query: str, n: int = 3) -> dict:
+    site = re.search(r"site:([\w.]+)", query)
+    domain = site.group(1) if site else "example.com"
+    slug = re.sub(r"\W+", "-", query.split(" site:")[0].lower()).strip("-")
+    return {"organic_results": [
+        {"title": f"{query.split(' site:')[0]} result {i + 1}", "link": f"https://{domain}/{slug}/{i + 1}",
+         "snippet": f"Snippet {i + 1} about {query.split(' site:')[0]}."}
+        for i in range(n)
+    ]}
+
+
+def _usage(prompt: str, completion: str) -> dict:
+    prompt_tokens, completion_tokens = max(1, len(prompt) // 4), max(1, len(completion) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def scripted_reply(messages: list) -> str:
+    """Structured-chat reply: one tool action, then a final answer once an observation is present."""
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    question = user.split("\n\n")[0].lower()
+    if "Observation:" in user:
+        observation = user.rsplit("Observation:", 1)[1].split("\nThought:")[0].strip()
+        answer = {"action": "Final Answer", "action_input": f"Here is what I found: {observation[:400]}"}
+    else:
+        step = next(((tool, args) for key, tool, args in LLM_SCRIPT if key in question), None)
+        if step is None:
+            answer = {"action": "Final Answer", "action_input": "Hello! How can I help you today?"}
+        else:
+            answer = {"action": step[0], "action_input": step[1]}
+    return "Thought: working on it\nAction:\n```\n" + json.dumps(answer, ensure_ascii=False) + "\n```"
+
+
+def scripted_tool_calls(messages: list, offered: set) -> tuple:
+    """
+    Tool-calling reply: (content, tool_calls). Every offered tool the question
+    mentions is called at once; once tool results are present, a final answer.
+    """
+    if messages and messages[-1].get("role") == "tool":
+        results = [m.get("content") or "" for m in messages if m.get("role") == "tool"]
+        return "Here is what I found: " + " | ".join(r[:200] for r in results), []
+    question = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "").lower()
+    calls = []
+    for key, tool, args in LLM_SCRIPT:
+        if key in question and tool in offered and all(c["function"]["name"] != tool for c in calls):
+            arguments = args if isinstance(args, dict) else {"__arg1": args}
+            calls.append({"id": f"call_{len(calls)}", "type": "function",
+                          "function": {"name": tool, "arguments": json.dumps(arguments)}})
+    if not calls:
+        return "Hello! How can I help you today?", []
+    return "", calls
+
+
+# --- per-service handlers: (path, query params, json body) -> (status, content type, body) ---
+
+def llm_handler(path, params, body):
+    body = body or {}
+    messages = body.get("messages", [])
+    if body.get("tools"):
+        text, tool_calls = scripted_tool_calls(messages, {t["function"]["name"] for t in body["tools"]})
+    else:
+        text, tool_calls = scripted_reply(messages), []
+    usage = _usage(json.dumps(messages), text + json.dumps(tool_calls))
+    created = int(time.time())
+    finish_reason = "tool_calls" if tool_calls else "stop"
+    if body.get("stream"):
+        deltas = [{"content": word} for word in re.findall(r"\S+\s*", text)]
+        deltas += [{"tool_calls": [{"index": i, **call}]} for i, call in enumerate(tool_calls)]
+        events = []
+        for delta in deltas:
+            events.append({"id": "stub", "object": "chat.completion.chunk", "created": created, "model": body.get("model"),
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        events.append({"id": "stub", "object": "chat.completion.chunk", "created": created, "model": body.get("model"),
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage})
+        payload = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        return 200, "text/event-stream", payload
+    message = {"role": "assistant", "content": text or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return 200, "application/json", {
+        "id": "stub", "object": "chat.completion", "created": created, "model": body.get("model"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": usage,
+    }
+
+
+def serpapi_handler(path, params, body):
+    return 200, "application/json", _organic_results(params.get("q", ""), int(params.get("num", 3)))
+
+
+def weather_handler(path, params, body):
+    city = params.get("q", "")
+    return 200, "application/json", {
+        "name": city, "weather": [{"description": "scattered clouds"}],
+        "main": {"temp": 29.4, "feels_like": 33.1, "humidity": 71},
+    }
+
+
+def ipinfo_handler(path, params, body):
+    return 200, "application/json", {"ip": "127.0.0.1", "city": "Bengaluru", "region": "Karnataka", "country": "IN"}
+
+
+def exchangerate_handler(path, params, body):
+    base = path.rstrip("/").rsplit("/", 1)[-1].upper()
+    usd = {"USD": 1.0, "INR": 83.2, "EUR": 0.92, "GBP": 0.79, "JPY": 151.3, "AED": 3.67, "SGD": 1.35}
+    if base not in usd:
+        return 404, "application/json", {"result": "error", "error-type": "unsupported-code"}
+    rates = {code: value / usd[base] for code, value in usd.items()}
+    return 200, "application/json", {"result": "success", "base_code": base, "time_last_update_unix": int(time.time()), "conversion_rates": rates}
+
+
+def irctc_handler(path, params, body):
+    if path.endswith("/getPNRStatus"):
+        return 200, "application/json", {"status": True, "data": {
+            "train_number": "12951", "train_name": "MUMBAI RAJDHANI", "boarding_point": "BCT",
+            "reservation_upto": "NDLS", "journey_date": "17-10-2026",
+            "passengers": [{"no": 1, "booking_status": "WL 12", "current_status": "CNF B3 21"}],
+        }}
+    return 200, "application/json", {"status": True, "data": {
+        "train_number": params.get("trainNo", "12951"), "train_name": "MUMBAI RAJDHANI", "run_days": "Daily",
+        "source_stn_name": "Mumbai Central", "dest_stn_name": "New Delhi", "std": "17:00", "journey_time": 955,
+        "pantry_available": True, "current_station_name": "Vadodara Jn", "eta": "21:40", "cur_stn_sta": "21:35",
+        "delay": 5, "ahead_distance_text": "12 kms ahead", "platform_number": 2, "status_as_of": "1 min ago",
+    }}
+
+
+def aviationstack_handler(path, params, body):
+    code = params.get("flight_iata", "AI101")
+    return 200, "application/json", {"data": [{
+        "flight": {"iata": code}, "airline": {"name": "Air India"}, "flight_status": "active",
+        "departure": {"airport": "Indira Gandhi International", "scheduled": "2026-10-17T09:00:00+00:00"},
+        "arrival": {"airport": "John F Kennedy International", "scheduled": "2026-10-17T15:30:00+00:00"},
+    }]}
+
+
+def bankbazaar_handler(path, params, body):
+    return 200, "text/html; charset=utf-8", FD_FIXTURE
+
+
+SERVICES = {
+    # name: (handler, env var, path appended to the stub's base URL)
+    "llm": (llm_handler, "GITHUB_MODELS_BASE_URL", ""),
+    "serpapi": (serpapi_handler, "SERPAPI_URL", "/search"),
+    "openweather": (weather_handler, "WEATHER_URL", "/data/2.5/weather"),
+    "ipinfo": (ipinfo_handler, "IPINFO_URL", "/json"),
+    "exchangerate": (exchangerate_handler, "EXCHANGE_RATE_URL", "/v6"),
+    "irctc": (irctc_handler, "RAPIDAPI_IRCTC_URL", ""),
+    "aviationstack": (aviationstack_handler, "FLIGHTS_URL", "/v1/flights"),
+    "bankbazaar": (bankbazaar_handler, "FD_RATES_URL", "/fixed-deposit/5years-fd-interest-rates.html"),
+}
+
+# Keys the tools refuse to run without; the stubs accept anything
+DUMMY_KEYS = {
+    "GITHUB_TOKEN": "stub", "SERPAPI_API_KEY": "stub", "OPENWEATHER_API_KEY": "stub",
+    "EXCHANGE_RATE_API_KEY": "stub", "RAPIDAPI_KEY": "stub", "AVIATIONSTACK_KEY": "stub", "IPINFO_TOKEN": "stub",
+}
+
+
+class LatencyConfig:
+    """Per-service injected latency in milliseconds, with optional +/- jitter."""
+
+    def __init__(self, default_ms: float = 0.0, per_service: dict = None, jitter_ms: float = 0.0, seed: int = 0):
+        self.default_ms = default_ms
+        self.per_service = per_service or {}
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, specs: list, jitter_ms: float = 0.0) -> "LatencyConfig":
+        """
+        ['50', 'llm=400'] -> 50 ms everywhere except 400 ms for the LLM;
+        'llm:openai/gpt-4.1=900' sets one model's latency.
+        """
+        config = cls(jitter_ms=jitter_ms)
+        for spec in specs or []:
+            if "=" in spec:
+                name, ms = spec.rsplit("=", 1)
+                if name.split(":", 1)[0] not in SERVICES:
+                    raise ValueError(f"unknown service {name!r}; choose from {', '.join(SERVICES)}")
+                config.per_service[name] = float(ms)
+            else:
+                config.default_ms = float(spec)
+        return config
+
+    def delay(self, service: str, variant: str = None) -> float:
+        base = self.per_service.get(f"{service}:{variant}", self.per_service.get(service, self.default_ms))
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, base + jitter) / 1000
+
+    def as_dict(self) -> dict:
+        return {"default_ms": self.default_ms, "per_service": dict(self.per_service), "jitter_ms": self.jitter_ms}
+
+
+def _make_handler(service: str, handler, latency: LatencyConfig, counters: dict, counters_lock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately; without this, Nagle plus delayed
+        # ACKs add ~40 ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def _respond(self, body=None):
+            parts = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            # LLM requests are also counted and delayed per model
+            variant = body.get("model") if isinstance(body, dict) else None
+            time.sleep(latency.delay(service, variant))
+            status, content_type, payload = handler(parts.path, params, body)
+            data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            with counters_lock:
+                counters[service] = counters.get(service, 0) + 1
+                if variant:
+                    counters[f"{service}:{variant}"] = counters.get(f"{service}:{variant}", 0) + 1
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._respond()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            self._respond(json.loads(raw) if raw else None)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class StubCluster:
+    """Starts one local server per upstream service."""
+
+    def __init__(self, latency: LatencyConfig = None, host: str = "127.0.0.1"):
+        self.latency = latency or LatencyConfig()
+        self.host = host
+        self.requests = {}
+        self._requests_lock = threading.Lock()
+        self._servers = {}
+
+    def start(self) -> "StubCluster":
+        for name, (handler, _, _) in SERVICES.items():
+            server = ThreadingHTTPServer((self.host, 0), _make_handler(name, handler, self.latency, self.requests, self._requests_lock))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name=f"stub-{name}", daemon=True).start()
+            self._servers[name] = server
+        return self
+
+    def url(self, service: str) -> str:
+        host, port = self._servers[service].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Environment overrides pointing every upstream at the stubs."""
+        overrides = dict(DUMMY_KEYS)
+        # The stubs have no quotas; throttling would only skew the timings
+        overrides["RATE_LIMITS"] = "off"
+        for name, (_, env_var, suffix) in SERVICES.items():
+            overrides[env_var] = self.url(name) + suffix
+        return overrides
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", action="append", metavar="[SERVICE=]MS", help="injected latency (repeatable)")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="MS", help="uniform +/- jitter")
+    args = parser.parse_args(argv)
+
+    with StubCluster(LatencyConfig.parse(args.latency, args.jitter)) as cluster:
+        for key, value in cluster.env().items():
+            print(f"export {key}={value}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,9 @@ class ModelName(str, Enum):
     GPT_4_1_MINI = "openai/gpt-4.1-mini"
     GPT_4O = "openai/gpt-4o"
     GPT_4O_MINI = "openai/gpt-4o-mini"
+
+# Cheaper model of the same family, used when a model is near its rate limit
+FALLBACK_MODELS = {
+    ModelName.GPT_4_1: ModelName.GPT_4_1_MINI,
+    ModelName.GPT_4O: ModelName.GPT_4O_MINI,
+}
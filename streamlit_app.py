@@ -1,9 +1,14 @@
+import uuid
 import streamlit as st
 from openai import RateLimitError, APIError
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain.memory import ConversationBufferMemory
 from models.model_enum import ModelName
-from agent.agent_setup import get_agent_executor
+from agent.agent_setup import AGENT_MODE
+from agent.session_store import session_manager
+from agent.streaming import FinalAnswerCallbackHandler
+from agent.fast_router import get_fast_path_stats
+from agent.metrics import MetricsCallbackHandler, format_turn_breakdown
+from tools.rate_limiter import UpstreamRateLimited
+from tools.records import render_markdown
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -60,74 +65,91 @@ with st.sidebar:
     )
 
 # --- Init State ---
-if "memory" not in st.session_state:
-    st.session_state.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-    st.session_state.messages.append({
-            "role": "assistant",
-            "avatar": "❄️",
-            "content": (
-                "**Hello!👋 I'm ZeeNova — your smart AI assistant.**\n\n"
-                "I am designed to provide helpful, accurate and real-time answers to "
-                "your questions. I can access tools to look up facts, check the latest news, get stock "
-                "prices and more. My goal is to assist you with reliable information and thoughtful responses. "
-                "Just type your question below and I'm ready to help!"
-            )
-        })
-
-if (
-    "agent_executor" not in st.session_state or
-    st.session_state.get("model_used") != selected_model
-):
-    st.session_state.agent_executor = get_agent_executor(selected_model, st.session_state.memory)
-    st.session_state.model_used = selected_model
+# Only the session ID lives in the Streamlit session (and the URL, so a reload
+# or a restarted server resumes the chat); the conversation itself is kept by
+# the session store and may be evicted from RAM while the tab is idle.
+if "session_id" not in st.session_state:
+    st.session_state.session_id = st.query_params.get("session") or uuid.uuid4().hex
+    st.query_params["session"] = st.session_state.session_id
+
+# Token-budgeted history: recent turns verbatim, older ones folded into a summary
+session = session_manager.get(st.session_state.session_id, selected_model)
+
+GREETING = (
+    "**Hello!👋 I'm ZeeNova — your smart AI assistant.**\n\n"
+    "I am designed to provide helpful, accurate and real-time answers to "
+    "your questions. I can access tools to look up facts, check the latest news, get stock "
+    "prices and more. My goal is to assist you with reliable information and thoughtful responses. "
+    "Just type your question below and I'm ready to help!"
+)
+AVATARS = {"user": "👨‍💻", "assistant": "❄️", "error": "❄️"}
 
 #Input box:
-for msg in st.session_state.messages:
-    role = msg.get("role", "assistant")
-    avatar = msg.get("avatar", None)
-
-    if avatar:
-        with st.chat_message(role, avatar=avatar):
-            st.markdown(msg["content"])
-    else:
-        with st.chat_message(role):
-            st.markdown(msg["content"])
+with st.chat_message("assistant", avatar=AVATARS["assistant"]):
+    st.markdown(GREETING)
+for role, content in session.transcript:
+    with st.chat_message("user" if role == "user" else "assistant", avatar=AVATARS.get(role)):
+        st.markdown(render_markdown(content))
 
 if user_prompt := st.chat_input("Ask anything..."):
-    st.session_state.messages.append({"role": "user", "avatar": "👨‍💻", "content": user_prompt})
-    with st.chat_message("user", avatar ="👨‍💻"):
+    with st.chat_message("user", avatar=AVATARS["user"]):
         st.markdown(user_prompt)
 
-    with st.chat_message("assistant", avatar="❄️"):
+    with st.chat_message("assistant", avatar=AVATARS["assistant"]), session_manager.turn(session):
         message_placeholder = st.empty()  # Reserve a UI space
         try:
-            st.session_state.memory.chat_memory.add_message(HumanMessage(content=user_prompt))
+            # Stream the final answer into the placeholder as the model writes it
+            stream_handler = FinalAnswerCallbackHandler(
+                lambda text: message_placeholder.markdown(text + "▌"),
+                structured=AGENT_MODE == "structured_chat",
+            )
+            metrics_handler = MetricsCallbackHandler(session_id=session.session_id)
 
             with st.spinner("Thinking..."):
-                response = st.session_state.agent_executor.invoke({"input": user_prompt})
+                response = session.executor.invoke(
+                    {"input": user_prompt},
+                    config={"callbacks": [stream_handler, metrics_handler]},
+                )
                 output = response.get("output", "[No output]")
 
-            # Once response is ready, update UI
-            message_placeholder.markdown(output)
+            # Once response is ready, update UI; fast-path answers are compact
+            # tool records, rendered as markdown only here
+            message_placeholder.markdown(render_markdown(output))
+
+            # AgentExecutor already saved the exchange to memory; only the transcript is updated here
+            session.add("user", user_prompt)
+            session.add("assistant", output)
 
-            # Save to memory and messages
-            st.session_state.memory.chat_memory.add_message(AIMessage(content=output))
-            st.session_state.messages.append({"role": "assistant", "avatar": "❄️", "content": output})
+            if response.get("cached"):
+                st.sidebar.caption(f"⚡ Answered from the answer cache ({response['cached']} answer)")
+
+            if response.get("fast_path"):
+                fast_path_stats = get_fast_path_stats()
+                st.sidebar.caption(f"⚡ Answered without the LLM (fast-path hit ratio {fast_path_stats['hit_ratio']:.0%})")
+
+            if metrics_handler.last_turn:
+                st.sidebar.caption(format_turn_breakdown(metrics_handler.last_turn))
+
+            memory_stats = session.memory.stats()
+            st.sidebar.caption(
+                f"🧠 History: {memory_stats['history_tokens']}/{memory_stats['budget']} tokens · "
+                f"saved {memory_stats['tokens_saved_last_turn']} this turn"
+            )
 
-        except RateLimitError:
+        except (RateLimitError, UpstreamRateLimited):
             msg = "⚠️ I'm currently over my usage limit. Please try again later."
             st.error(msg)
-            st.session_state.messages.append({"role": "assistant", "avatar": "❄️", "content": msg})
+            session.add("user", user_prompt)
+            session.add("error", msg)
 
         except APIError as e:
             msg = f"🚨 API Error: {str(e)}"
             st.error(msg)
-            st.session_state.messages.append({"role": "assistant", "avatar": "❄️", "content": msg})
+            session.add("user", user_prompt)
+            session.add("error", msg)
 
         except Exception as e:
             msg = f"An unexpected error occurred: {str(e)}"
             st.error(msg)
-            st.session_state.messages.append({"role": "assistant", "avatar": "❄️", "content": msg})
+            session.add("user", user_prompt)
+            session.add("error", msg)
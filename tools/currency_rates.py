@@ -0,0 +1,114 @@
+import os, time, threading
+from array import array
+
+from tools.http_client import http_get, ahttp_get
+
+# Rate-table currency engine.
+# One exchangerate-api "latest" call returns every rate against a base currency.
+# The table is kept as a code -> slot index plus a flat array of doubles and is
+# refreshed once per interval; any cross-rate is then two array reads, so
+# repeated and multi-target conversions cost no network round-trips.
+
+EXCHANGE_RATE_URL = os.getenv("EXCHANGE_RATE_URL", "https://v6.exchangerate-api.com/v6")
+EXCHANGE_RATE_BASE = os.getenv("EXCHANGE_RATE_BASE", "USD").upper()
+EXCHANGE_RATE_REFRESH_SECONDS = float(os.getenv("EXCHANGE_RATE_REFRESH_SECONDS", "3600"))
+EXCHANGE_RATE_TIMEOUT = 5
+# After a failed refresh the previous table is served for this long before retrying
+EXCHANGE_RATE_RETRY_SECONDS = 60
+
+
+class RateTableError(Exception):
+    pass
+
+
+class RateTable:
+    """Rates of every currency against one base, stored as a compact array."""
+
+    __slots__ = ("base", "index", "rates", "fetched_at", "updated_at")
+
+    def __init__(self, base: str, conversion_rates: dict, fetched_at: float, updated_at: int = None):
+        self.base = base
+        self.index = {code: i for i, code in enumerate(conversion_rates)}
+        self.rates = array("d", conversion_rates.values())
+        self.fetched_at = fetched_at
+        self.updated_at = updated_at
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+    def rate(self, from_curr: str, to_curr: str) -> float:
+        """Units of `to_curr` per one `from_curr`."""
+        return self.rates[self.index[to_curr]] / self.rates[self.index[from_curr]]
+
+    def convert(self, amount: float, from_curr: str, to_curr: str) -> float:
+        return amount * self.rate(from_curr, to_curr)
+
+
+class CurrencyEngine:
+    """
+    Holds the current RateTable and refreshes it after `refresh_seconds`.
+    If a refresh fails, the previous table keeps serving until the next attempt.
+    """
+
+    def __init__(self, base: str = EXCHANGE_RATE_BASE, refresh_seconds: float = EXCHANGE_RATE_REFRESH_SECONDS,
+                 timeout: float = EXCHANGE_RATE_TIMEOUT, clock=time.monotonic):
+        self.base = base
+        self.refresh_seconds = refresh_seconds
+        self.timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._table = None
+        self._next_refresh = 0.0
+        self.refreshes = 0
+
+    def _url(self, api_key: str) -> str:
+        return f"{EXCHANGE_RATE_URL}/{api_key}/latest/{self.base}"
+
+    def _is_fresh(self) -> bool:
+        return self._table is not None and self._clock() < self._next_refresh
+
+    def _store(self, data: dict) -> RateTable:
+        if data.get("result") != "success":
+            raise RateTableError(data.get("error-type", "Unknown error"))
+        table = RateTable(data.get("base_code", self.base), data["conversion_rates"], self._clock(), data.get("time_last_update_unix"))
+        self._table = table
+        self._next_refresh = table.fetched_at + self.refresh_seconds
+        self.refreshes += 1
+        return table
+
+    def _stale_or_raise(self, error: Exception) -> RateTable:
+        if self._table is not None:
+            self._next_refresh = self._clock() + min(EXCHANGE_RATE_RETRY_SECONDS, self.refresh_seconds)
+            return self._table
+        raise error
+
+    def table(self, api_key: str) -> RateTable:
+        if self._is_fresh():
+            return self._table
+        with self._lock:
+            if self._is_fresh():
+                return self._table
+            try:
+                return self._store(http_get(self._url(api_key), timeout=self.timeout).json())
+            except Exception as e:
+                return self._stale_or_raise(e)
+
+    async def atable(self, api_key: str) -> RateTable:
+        if self._is_fresh():
+            return self._table
+        try:
+            response = await ahttp_get(self._url(api_key), timeout=self.timeout)
+            return self._store(response.json())
+        except Exception as e:
+            return self._stale_or_raise(e)
+
+    def clear(self):
+        with self._lock:
+            self._table = None
+
+
+# Process-wide engine shared by the sync and async currency tools
+currency_engine = CurrencyEngine()
+
+
+__all__ = ["RateTable", "RateTableError", "CurrencyEngine", "currency_engine"]
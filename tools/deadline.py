@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import functools
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import httpx
+
+# Per-turn latency budget.
+# The agent sets an absolute deadline when a turn starts; the HTTP transport,
+# the LLM wrapper and the fan-out helpers read it from this context variable and
+# shrink their timeouts to whatever is left. contextvars follow asyncio tasks and
+# asyncio.to_thread automatically; thread pools need copy_context() (see fan_out).
+
+_deadline = contextvars.ContextVar("zeenova_turn_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    def __init__(self, message: str = "turn time budget exhausted; skipped"):
+        super().__init__(message)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Runs the block with a deadline `seconds` from now (an outer, earlier deadline wins)."""
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current turn, or None when no deadline is set."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+    return left
+
+
+def clamp_timeout(timeout):
+    """Shrinks a float or httpx.Timeout to the time left in the turn."""
+    left = check_deadline()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    if isinstance(timeout, httpx.Timeout):
+        return httpx.Timeout(
+            connect=min(timeout.connect or left, left),
+            read=min(timeout.read or left, left),
+            write=min(timeout.write or left, left),
+            pool=min(timeout.pool or left, left),
+        )
+    return min(timeout, left)
+
+
+# Tool results for a spent budget, phrased for the model: short and final
+SKIPPED_RESULT = "⚠️ {tool} skipped: the time budget for this answer is used up. Answer with what you already have."
+TIMED_OUT_RESULT = "⚠️ {tool} timed out. Do not retry it; answer with what you already have."
+
+# Blocking tools run here so a sync caller can stop waiting at the deadline.
+# An abandoned call keeps its worker until its HTTP request ends. For tools on
+# the shared HTTP transport that is bounded by the same deadline (the transport
+# clamps its timeout to the turn), so workers free up within about one turn
+# budget. The default leaves room for the API's 16 concurrent turns with a few
+# tool calls in flight each; threads are only started on demand.
+TOOL_DEADLINE_WORKERS = int(os.getenv("TOOL_DEADLINE_WORKERS", "64"))
+_executor = ThreadPoolExecutor(max_workers=TOOL_DEADLINE_WORKERS, thread_name_prefix="tool-deadline")
+
+
+def guard_tool(tool):
+    """
+    Bounds a LangChain tool by the turn deadline, in place. Once the budget is
+    spent the tool is skipped; a call that outlives it is abandoned and the model
+    gets a short timeout result instead of the turn hanging.
+    """
+    func, coroutine = tool.func, tool.coroutine
+
+    if func is not None:
+        @functools.wraps(func)
+        def guarded(*args, **kwargs):
+            left = remaining()
+            if left is None:
+                return func(*args, **kwargs)
+            if left <= 0:
+                return SKIPPED_RESULT.format(tool=tool.name)
+            future = _executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+            try:
+                return future.result(timeout=left)
+            except FutureTimeout:
+                return TIMED_OUT_RESULT.format(tool=tool.name)
+            except DeadlineExceeded:
+                return SKIPPED_RESULT.format(tool=tool.name)
+        tool.func = guarded
+
+    if coroutine is not None:
+        @functools.wraps(coroutine)
+        async def aguarded(*args, **kwargs):
+            left = remaining()
+            if left is None:
+                return await coroutine(*args, **kwargs)
+            if left <= 0:
+                return SKIPPED_RESULT.format(tool=tool.name)
+            try:
+                return await asyncio.wait_for(coroutine(*args, **kwargs), left)
+            except asyncio.TimeoutError:
+                return TIMED_OUT_RESULT.format(tool=tool.name)
+            except DeadlineExceeded:
+                return SKIPPED_RESULT.format(tool=tool.name)
+        tool.coroutine = aguarded
+
+    return tool
+
+
+__all__ = ["DeadlineExceeded", "deadline_scope", "remaining", "check_deadline", "clamp_timeout", "guard_tool"]
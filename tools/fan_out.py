@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from tools.deadline import remaining
+
+# Concurrent fan-out over independent sources with a shared deadline.
+# All sources start at once, so total latency is bounded by the slowest
+# source that finishes in time (or the deadline), not the sum of them.
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fan-out")
+
+
+class FanOutResult:
+    """Results of the sources that finished in time, plus the ones that did not."""
+
+    __slots__ = ("results", "timed_out", "failed")
+
+    def __init__(self):
+        self.results = {}
+        self.timed_out = []
+        self.failed = {}
+
+    def __repr__(self):
+        return f"FanOutResult(results={list(self.results)}, timed_out={self.timed_out}, failed={list(self.failed)})"
+
+
+def _within_turn(deadline: float) -> float:
+    left = remaining()
+    return deadline if left is None else max(0.0, min(deadline, left))
+
+
+def fan_out(calls: dict, deadline: float, executor: ThreadPoolExecutor = None) -> FanOutResult:
+    """
+    Runs {name: zero-arg callable} concurrently on a shared thread pool (or
+    `executor`). Returns whatever completed within `deadline` seconds (or the
+    turn's remaining budget, if smaller); late sources are abandoned.
+    """
+    outcome = FanOutResult()
+    deadline = _within_turn(deadline)
+    executor = executor or _executor
+    # Each worker gets a copy of the caller's context so the turn deadline follows it
+    futures = {executor.submit(contextvars.copy_context().run, fn): name for name, fn in calls.items()}
+    done, pending = wait(futures, timeout=deadline)
+
+    for future, name in futures.items():
+        if future in pending:
+            future.cancel()
+            outcome.timed_out.append(name)
+        elif future.exception() is not None:
+            outcome.failed[name] = future.exception()
+        else:
+            outcome.results[name] = future.result()
+    return outcome
+
+
+async def afan_out(calls: dict, deadline: float) -> FanOutResult:
+    """Async variant of fan_out: {name: zero-arg coroutine function}."""
+    outcome = FanOutResult()
+    deadline = _within_turn(deadline)
+    tasks = {asyncio.ensure_future(fn()): name for name, fn in calls.items()}
+    if not tasks:
+        return outcome
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    for task, name in tasks.items():
+        if task in pending:
+            outcome.timed_out.append(name)
+        elif task.exception() is not None:
+            outcome.failed[name] = task.exception()
+        else:
+            outcome.results[name] = task.result()
+    return outcome
+
+
+__all__ = ["FanOutResult", "fan_out", "afan_out"]
@@ -0,0 +1,193 @@
+import os, re, time, threading, logging
+from difflib import get_close_matches
+
+from tools.http_client import http_get
+from tools.rate_limiter import priority_scope, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# Background-refreshed FD rate store.
+# BankBazaar's rate tables change about once a day, so they are scraped on a
+# schedule rather than per question. Only the <table> elements are parsed, and
+# the rows are kept as structured records indexed by normalized bank name and
+# tenure, so the tool answers from memory.
+
+FD_RATES_URL = os.getenv("FD_RATES_URL", "https://www.bankbazaar.com/fixed-deposit/5years-fd-interest-rates.html")
+# tenure -> BankBazaar page listing rates for that tenure
+FD_RATE_PAGES = {"5 years": FD_RATES_URL}
+DEFAULT_TENURE = "5 years"
+FD_RATES_REFRESH_SECONDS = float(os.getenv("FD_RATES_REFRESH_SECONDS", str(12 * 3600)))
+FD_RATES_TIMEOUT = 10
+
+BANK_ALIASES = {
+    "sbi": "state bank of india",
+    "pnb": "punjab national",
+    "bob": "bank of baroda",
+    "boi": "bank of india",
+    "ubi": "union bank of india",
+    "idbi": "idbi",
+    "au": "au small finance",
+}
+_BANK_NOISE = {"bank", "ltd", "limited", "the", "co", "of"}
+
+
+def normalize_bank(name: str) -> str:
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    text = " ".join(words)
+    text = BANK_ALIASES.get(text, text)
+    return " ".join(w for w in text.split() if w not in _BANK_NOISE)
+
+
+def _percent(text: str) -> float:
+    # "6.50%" or "3.00% - 7.10%": rank by the best rate on offer
+    values = [float(v) for v in re.findall(r"\d+(?:\.\d+)?", text)]
+    return max(values) if values else 0.0
+
+
+class FDRate:
+    __slots__ = ("bank", "key", "tenure", "general", "senior", "general_pct", "senior_pct")
+
+    def __init__(self, bank: str, tenure: str, general: str, senior: str):
+        self.bank = bank
+        self.key = normalize_bank(bank)
+        self.tenure = tenure
+        self.general = general
+        self.senior = senior
+        self.general_pct = _percent(general)
+        self.senior_pct = _percent(senior)
+
+
+def parse_fd_table(html: str, tenure: str) -> list:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    try:
+        import lxml  # noqa: F401
+        parser = "lxml"
+    except ImportError:
+        parser = "html.parser"
+
+    soup = BeautifulSoup(html, parser, parse_only=SoupStrainer("table"))
+    table = soup.find("table")
+    if table is None:
+        return []
+
+    records = []
+    for row in table.find_all("tr")[1:]:  # skip table header
+        cols = [c.get_text(strip=True) for c in row.find_all("td")]
+        if len(cols) >= 3 and cols[0]:
+            records.append(FDRate(cols[0], tenure, cols[1], cols[2]))
+    return records
+
+
+class FDRateStore:
+    """In-memory FD rate records, refreshed by a daemon thread."""
+
+    def __init__(self, pages: dict = FD_RATE_PAGES, refresh_seconds: float = FD_RATES_REFRESH_SECONDS):
+        self.pages = pages
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._by_tenure = {}
+        self._by_bank = {}
+        self.loaded_at = None
+        self.last_error = None
+        self._thread = None
+
+    def refresh(self):
+        """Scrapes every page and swaps in the new index; keeps the old one on failure."""
+        by_tenure = {}
+        for tenure, url in self.pages.items():
+            try:
+                records = parse_fd_table(http_get(url, timeout=FD_RATES_TIMEOUT).text, tenure)
+            except Exception as e:
+                self.last_error = e
+                logger.warning("FD rate refresh failed for %s: %s", url, e)
+                records = self._by_tenure.get(tenure, [])
+            if records:
+                by_tenure[tenure] = records
+        if not by_tenure:
+            raise self.last_error or ValueError("No FD rate table found")
+
+        by_bank = {}
+        for records in by_tenure.values():
+            for record in records:
+                by_bank.setdefault(record.key, []).append(record)
+        with self._lock:
+            self._by_tenure, self._by_bank = by_tenure, by_bank
+            self.loaded_at = time.time()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_seconds)
+            try:
+                # Scheduled refreshes must not use up quota that user turns are waiting for
+                with priority_scope(BACKGROUND):
+                    self.refresh()
+            except Exception:
+                pass  # already logged; the previous records keep serving
+
+    def ensure_loaded(self):
+        """Loads synchronously on first use, then keeps refreshing in the background."""
+        if self.loaded_at is not None:
+            return
+        with self._lock:
+            start = self._thread is None
+            if start:
+                self._thread = threading.Thread(target=self._refresh_loop, name="fd-rate-refresh", daemon=True)
+        try:
+            if self.loaded_at is None:
+                self.refresh()
+        finally:
+            # Even when the first load fails: later calls see the thread as
+            # claimed and would never start it
+            if start:
+                self._thread.start()
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def tenures(self) -> list:
+        return list(self._by_tenure)
+
+    def match_banks(self, bank_name: str, tenure: str = DEFAULT_TENURE) -> list:
+        """Exact, then substring, then fuzzy match on the normalized bank name."""
+        key = normalize_bank(bank_name)
+        if not key:
+            return []
+        by_bank = self._by_bank
+        keys = [key] if key in by_bank else [k for k in by_bank if key in k or k in key.split()]
+        if not keys:
+            keys = get_close_matches(key, list(by_bank), n=2, cutoff=0.6)
+        return [r for k in keys for r in by_bank[k] if r.tenure == tenure]
+
+    def top(self, n: int = 5, tenure: str = DEFAULT_TENURE, senior: bool = False) -> list:
+        records = self._by_tenure.get(tenure, [])
+        key = (lambda r: r.senior_pct) if senior else (lambda r: r.general_pct)
+        return sorted(records, key=key, reverse=True)[:n]
+
+
+fd_rate_store = FDRateStore()
+
+
+_QUERY_NOISE = {
+    "fd", "fds", "rate", "rates", "interest", "fixed", "deposit", "deposits", "top", "best", "highest",
+    "for", "in", "of", "the", "and", "year", "years", "yr", "yrs", "senior", "seniors", "citizen", "citizens",
+    "show", "me", "what", "is", "are", "current", "latest", "today", "compare", "banks",
+}
+
+
+def parse_fd_query(query: str) -> dict:
+    """'top 3 senior citizen FD rates' -> {'bank': '', 'top': 3, 'senior': True, 'tenure': None}"""
+    text = (query or "").lower()
+    top = re.search(r"\b(?:top|best|highest)\s+(\d{1,2})\b", text)
+    tenure = re.search(r"\b(\d{1,2})\s*(?:-\s*)?(?:years?|yrs?)\b", text)
+    words = [w for w in re.findall(r"[a-z0-9]+", text) if w not in _QUERY_NOISE and not w.isdigit()]
+    return {
+        "bank": " ".join(words),
+        "top": int(top.group(1)) if top else None,
+        "senior": "senior" in text,
+        "tenure": f"{int(tenure.group(1))} years" if tenure else None,
+    }
+
+
+__all__ = ["FDRate", "FDRateStore", "fd_rate_store", "parse_fd_table", "parse_fd_query", "normalize_bank", "FD_RATES_URL"]
@@ -0,0 +1,175 @@
+import os, re, datetime, threading
+from bisect import bisect_left, bisect_right
+
+# Precomputed Indian holiday index.
+# Holiday rules are expanded once per (country, state) and kept as sorted date
+# arrays, so date checks are bisect lookups and month queries read a prebuilt
+# bucket instead of regenerating and scanning the holiday calendar each call.
+
+HOLIDAY_YEARS_SPAN = int(os.getenv("HOLIDAY_YEARS_SPAN", "2"))
+
+
+class HolidayIndex:
+    """Sorted holiday calendar for a span of years starting at the current year."""
+
+    def __init__(self, country: str = "IN", subdiv: str = None, years_span: int = HOLIDAY_YEARS_SPAN, today=datetime.date.today):
+        self.country = country
+        self.subdiv = subdiv
+        self.years_span = max(1, years_span)
+        self._today = today
+        self._lock = threading.Lock()
+        self._base_year = None
+        self._dates = []
+        self._names = []
+        self._months = {}
+        self._other_years = {}
+
+    def _build(self, base_year: int):
+        import holidays
+
+        calendar = holidays.country_holidays(
+            self.country, subdiv=self.subdiv, years=range(base_year, base_year + self.years_span)
+        )
+        items = sorted(calendar.items())
+        dates = [d for d, _ in items]
+        names = [name for _, name in items]
+
+        months = {}
+        for i, d in enumerate(dates):
+            start, _ = months.get((d.year, d.month), (i, i))
+            months[(d.year, d.month)] = (start, i + 1)
+
+        self._dates, self._names, self._months = dates, names, months
+        self._base_year = base_year
+
+    def _ensure_current(self):
+        # Roll the window forward when the calendar year changes
+        year = self._today().year
+        if self._base_year != year:
+            with self._lock:
+                if self._base_year != year:
+                    self._build(year)
+
+    @property
+    def first_year(self) -> int:
+        self._ensure_current()
+        return self._base_year
+
+    @property
+    def last_year(self) -> int:
+        return self.first_year + self.years_span - 1
+
+    def _outside_window(self, day: datetime.date):
+        # Rare: dates outside the indexed span get a one-off calendar for their year
+        calendar = self._other_years.get(day.year)
+        if calendar is None:
+            with self._lock:
+                calendar = self._other_years.get(day.year)
+                if calendar is None:
+                    import holidays
+
+                    calendar = self._other_years[day.year] = holidays.country_holidays(
+                        self.country, subdiv=self.subdiv, years=day.year
+                    )
+        return calendar.get(day)
+
+    def get(self, day: datetime.date):
+        """Returns the holiday name for `day`, or None. O(log n)."""
+        self._ensure_current()
+        if not self._base_year <= day.year < self._base_year + self.years_span:
+            return self._outside_window(day)
+        i = bisect_left(self._dates, day)
+        if i < len(self._dates) and self._dates[i] == day:
+            return self._names[i]
+        return None
+
+    def is_holiday(self, day: datetime.date) -> bool:
+        return self.get(day) is not None
+
+    def lookup_many(self, days) -> dict:
+        """Bulk lookup: {date: holiday name or None} for every date in `days`."""
+        self._ensure_current()
+        dates, names = self._dates, self._names
+        first, end = self._base_year, self._base_year + self.years_span
+        result = {}
+        for day in days:
+            if not first <= day.year < end:
+                result[day] = self._outside_window(day)
+                continue
+            i = bisect_left(dates, day)
+            result[day] = names[i] if i < len(dates) and dates[i] == day else None
+        return result
+
+    def upcoming(self, start: datetime.date, limit: int = 5) -> list:
+        """Returns up to `limit` (date, name) pairs on or after `start`."""
+        self._ensure_current()
+        i = bisect_left(self._dates, start)
+        return list(zip(self._dates[i:i + limit], self._names[i:i + limit]))
+
+    def in_month(self, year: int, month: int, start: datetime.date = None) -> list:
+        """Returns (date, name) pairs in the given month, optionally only on or after `start`."""
+        self._ensure_current()
+        lo, hi = self._months.get((year, month), (0, 0))
+        if start is not None:
+            lo = max(lo, bisect_left(self._dates, start, lo, hi))
+        return list(zip(self._dates[lo:hi], self._names[lo:hi]))
+
+    def between(self, start: datetime.date, end: datetime.date) -> list:
+        """Returns (date, name) pairs with start <= date <= end."""
+        self._ensure_current()
+        lo = bisect_left(self._dates, start)
+        hi = bisect_right(self._dates, end)
+        return list(zip(self._dates[lo:hi], self._names[lo:hi]))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_holiday_index(subdiv: str = None) -> HolidayIndex:
+    """Returns the shared, lazily built index for India or one of its states."""
+    key = subdiv.upper() if subdiv else None
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = HolidayIndex(subdiv=key)
+    return index
+
+
+_state_aliases = None
+_state_pattern = None
+_state_names = {}
+
+
+def _load_states():
+    global _state_aliases, _state_pattern
+    from holidays.countries import India
+
+    for name, code in India.subdivisions_aliases.items():
+        _state_names.setdefault(code, name)
+    aliases = {name.lower(): code for name, code in India.subdivisions_aliases.items()}
+    # Whole words only ("goa" is not in "goal"); longest names first so
+    # "Andhra Pradesh" wins over shorter overlaps
+    _state_pattern = re.compile(
+        r"\b(?:" + "|".join(re.escape(name) for name in sorted(aliases, key=len, reverse=True)) + r")\b"
+    )
+    _state_aliases = aliases
+
+
+def detect_state(query: str):
+    """Returns the subdivision code of an Indian state/UT named in `query`, if any."""
+    if _state_aliases is None:
+        _load_states()
+    match = _state_pattern.search(query.lower())
+    return _state_aliases[match.group()] if match else None
+
+
+def state_name(code: str) -> str:
+    if _state_aliases is None:
+        _load_states()
+    return _state_names.get(code, code)
+
+
+__all__ = ["HolidayIndex", "get_holiday_index", "detect_state", "state_name", "HOLIDAY_YEARS_SPAN"]
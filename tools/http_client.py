@@ -0,0 +1,428 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from tools.deadline import clamp_timeout
+from tools.rate_limiter import quota_scheduler
+
+# Shared HTTP transport used by every tool.
+# One pooled, keep-alive client per upstream host, so repeated agent steps
+# reuse warm TCP/TLS connections instead of handshaking on every call.
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+DEFAULT_HEADERS = {"User-Agent": "ZeeNova-AI-Agent/1.0"}
+
+# HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+def _drop_none(mapping):
+    # requests silently skipped None values; keep that behaviour for the tools
+    if mapping is None:
+        return None
+    return {k: v for k, v in mapping.items() if v is not None}
+
+
+class _HostStats:
+    __slots__ = ("requests", "new_connections", "reused_connections", "errors")
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict:
+        hit_ratio = self.reused_connections / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "errors": self.errors,
+            "pool_hit_ratio": round(hit_ratio, 3),
+        }
+
+
+class _ConnectionTrace:
+    """httpcore trace hook that records whether a request had to open a new connection."""
+
+    __slots__ = ("opened",)
+
+    def __init__(self):
+        self.opened = False
+
+    def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self.opened = True
+
+
+class _AsyncConnectionTrace(_ConnectionTrace):
+    """httpcore requires a coroutine trace hook on the async interface."""
+
+    __slots__ = ()
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self.opened = True
+
+
+class PoolStats:
+    """Thread-safe per-host request and connection-reuse counters shared by both transports."""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, origin: str, trace: _ConnectionTrace, failed: bool = False):
+        with self._lock:
+            stats = self._hosts.get(origin)
+            if stats is None:
+                stats = self._hosts[origin] = _HostStats()
+            stats.requests += 1
+            if failed:
+                stats.errors += 1
+            if trace.opened:
+                stats.new_connections += 1
+            elif not failed:
+                stats.reused_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            per_host = {origin: s.as_dict() for origin, s in self._hosts.items()}
+        total = _HostStats()
+        for s in per_host.values():
+            total.requests += s["requests"]
+            total.new_connections += s["new_connections"]
+            total.reused_connections += s["reused_connections"]
+            total.errors += s["errors"]
+        return {"hosts": per_host, "total": total.as_dict()}
+
+
+# Per-host circuit breakers: after BREAKER_FAILURE_THRESHOLD consecutive failures
+# (connection errors, timeouts, 5xx) a host is skipped for BREAKER_RESET_SECONDS,
+# then a single probe request decides whether it is healthy again.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+
+class CircuitOpenError(httpx.TransportError):
+    def __init__(self, origin: str, retry_in: float):
+        host = urlsplit(origin).netloc
+        super().__init__(f"{host} is unavailable right now (retry in {max(1, round(retry_in))}s); do not retry this tool")
+        self.origin = origin
+
+
+class CircuitBreaker:
+    """closed -> open after repeated failures -> half-open probe after a cool-down."""
+
+    __slots__ = ("origin", "failure_threshold", "reset_seconds", "failures", "opened_at", "probing", "trips", "rejected", "_lock", "_clock")
+
+    def __init__(self, origin: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS, clock=time.monotonic):
+        self.origin = origin
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self._clock() - self.opened_at >= self.reset_seconds else "open"
+
+    def check(self):
+        """Raises CircuitOpenError while the host is being skipped, without claiming the probe."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = self._clock() - self.opened_at
+            if waited >= self.reset_seconds and not self.probing:
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.origin, self.reset_seconds - waited)
+
+    def before_request(self):
+        """Raises CircuitOpenError while the host is being skipped, else lets the request (or probe) through."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = self._clock() - self.opened_at
+            if waited >= self.reset_seconds and not self.probing:
+                self.probing = True  # let exactly one request through as a probe
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.origin, self.reset_seconds - waited)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release_probe(self):
+        """The probe ended without an answer from the host (cancelled); the next request probes instead."""
+        with self._lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = self._clock()
+                self.trips += 1
+            self.probing = False
+
+    def as_dict(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips, "rejected": self.rejected}
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per origin, shared by the sync and async transports."""
+
+    def __init__(self, **breaker_kwargs):
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._kwargs = breaker_kwargs
+
+    def get(self, origin: str) -> CircuitBreaker:
+        breaker = self._breakers.get(origin)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(origin, CircuitBreaker(origin, **self._kwargs))
+        return breaker
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.origin: b.as_dict() for b in breakers}
+
+
+def _is_upstream_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500
+
+
+def _client_kwargs(origin: str, timeout, limits, http2: bool) -> dict:
+    return {
+        "base_url": origin,
+        "timeout": timeout,
+        "limits": limits,
+        "http2": http2,
+        "headers": DEFAULT_HEADERS,
+        "follow_redirects": True,
+    }
+
+
+class HttpTransport:
+    """Per-host pooled httpx clients with keep-alive, optional HTTP/2 and usage statistics."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS, http2: bool = HTTP2_AVAILABLE, stats: PoolStats = None,
+                 breakers: CircuitBreakers = None):
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self.pool_stats = stats or PoolStats()
+        self.breakers = breakers or CircuitBreakers()
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client_for(self, origin: str) -> httpx.Client:
+        client = self._clients.get(origin)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(origin)
+                if client is None:
+                    client = httpx.Client(**_client_kwargs(origin, self.timeout, self.limits, self.http2))
+                    self._clients[origin] = client
+        return client
+
+    def request(self, method: str, url: str, *, params=None, headers=None, timeout=None, **kwargs) -> httpx.Response:
+        origin = _origin(url)
+        # Fail fast, before touching the network, when the turn is out of time
+        # or the host's breaker is open; then wait for a slot in the host's quota.
+        # Only once nothing else can stop the request does it claim the breaker
+        # (possibly as the half-open probe), and every exit below settles it.
+        clamp_timeout(self.timeout if timeout is None else timeout)
+        breaker = self.breakers.get(origin)
+        breaker.check()
+        host = _host(url)
+        quota_scheduler.acquire(host)
+        effective_timeout = clamp_timeout(self.timeout if timeout is None else timeout)
+        breaker.before_request()
+        trace = _ConnectionTrace()
+        try:
+            client = self._client_for(origin)
+            response = client.request(
+                method,
+                url,
+                params=_drop_none(params),
+                headers=_drop_none(headers),
+                timeout=effective_timeout,
+                extensions={"trace": trace},
+                **kwargs,
+            )
+        except Exception:
+            self.pool_stats.record(origin, trace, failed=True)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release_probe()  # cancelled: says nothing about the host
+            raise
+        self.pool_stats.record(origin, trace)
+        quota_scheduler.observe(host, response.headers, response.status_code)
+        if _is_upstream_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Returns pool-hit and connection-reuse statistics per host plus a total."""
+        return {"http2": self.http2, **self.pool_stats.snapshot(), "breakers": self.breakers.snapshot()}
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+class AsyncHttpTransport:
+    """Async counterpart of HttpTransport.
+
+    httpx async connections are bound to the event loop that opened them, so
+    pools are kept per running loop and dropped together with the loop.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS, http2: bool = HTTP2_AVAILABLE, stats: PoolStats = None,
+                 breakers: CircuitBreakers = None):
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self.pool_stats = stats or PoolStats()
+        self.breakers = breakers or CircuitBreakers()
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client_for(self, origin: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None:
+            clients = self._clients[loop] = {}
+        client = clients.get(origin)
+        if client is None:
+            client = clients[origin] = httpx.AsyncClient(**_client_kwargs(origin, self.timeout, self.limits, self.http2))
+        return client
+
+    async def request(self, method: str, url: str, *, params=None, headers=None, timeout=None, **kwargs) -> httpx.Response:
+        origin = _origin(url)
+        clamp_timeout(self.timeout if timeout is None else timeout)
+        breaker = self.breakers.get(origin)
+        breaker.check()
+        host = _host(url)
+        await quota_scheduler.aacquire(host)
+        effective_timeout = clamp_timeout(self.timeout if timeout is None else timeout)
+        breaker.before_request()
+        trace = _AsyncConnectionTrace()
+        try:
+            client = self._client_for(origin)
+            response = await client.request(
+                method,
+                url,
+                params=_drop_none(params),
+                headers=_drop_none(headers),
+                timeout=effective_timeout,
+                extensions={"trace": trace},
+                **kwargs,
+            )
+        except Exception:
+            self.pool_stats.record(origin, trace, failed=True)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release_probe()  # cancelled: says nothing about the host
+            raise
+        self.pool_stats.record(origin, trace)
+        quota_scheduler.observe(host, response.headers, response.status_code)
+        if _is_upstream_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        clients = self._clients.pop(loop, {})
+        for client in clients.values():
+            await client.aclose()
+
+
+# Process-wide transports shared by all tools
+pool_stats = PoolStats()
+circuit_breakers = CircuitBreakers()
+transport = HttpTransport(stats=pool_stats, breakers=circuit_breakers)
+async_transport = AsyncHttpTransport(stats=pool_stats, breakers=circuit_breakers)
+atexit.register(transport.close)
+
+
+def http_get(url: str, **kwargs) -> httpx.Response:
+    """GET through the shared pooled transport (same call shape as requests.get)."""
+    return transport.get(url, **kwargs)
+
+
+async def ahttp_get(url: str, **kwargs) -> httpx.Response:
+    """Async GET through the shared pooled transport for the running event loop."""
+    return await async_transport.get(url, **kwargs)
+
+
+def get_pool_stats() -> dict:
+    return transport.stats()
+
+
+__all__ = [
+    "HttpTransport",
+    "AsyncHttpTransport",
+    "transport",
+    "async_transport",
+    "http_get",
+    "ahttp_get",
+    "get_pool_stats",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "circuit_breakers",
+]
@@ -0,0 +1,407 @@
+import asyncio
+import contextvars
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from tools.deadline import remaining
+
+# Upstream quota scheduler.
+# Every upstream with a quota (each GitHub Models model, SerpAPI, RapidAPI,
+# Aviationstack) gets a token bucket. A call takes a token before it goes out;
+# when the bucket is empty the call waits its turn instead of failing, up to
+# RATE_LIMIT_MAX_WAIT_SECONDS or the turn's remaining budget. Rate-limit
+# response headers and 429s adjust the bucket at runtime: the refill rate
+# follows what the upstream says is left, halves on a 429, and creeps back to
+# the configured rate while responses are healthy.
+#
+# Interactive calls queue in arrival order. Background calls (the FD rate
+# refresher) only take tokens that leave a reserve for interactive traffic, and
+# never queue ahead of it.
+#
+#   RATE_LIMITS="openai/gpt-4.1=50/min,serpapi.com=100/hour"   overrides
+#   RATE_LIMITS=off                                             disables it
+
+INTERACTIVE, BACKGROUND = "interactive", "background"
+
+# Requests per period. Models are keyed by model ID, tools by host; a host key
+# also covers its subdomains ("p.rapidapi.com" is every RapidAPI API).
+DEFAULT_RATE_LIMITS = {
+    # GitHub Models free tier: the "high" models get fewer requests than the mini ones
+    "openai/gpt-4.1": "10/min",
+    "openai/gpt-4o": "10/min",
+    "openai/gpt-4.1-mini": "15/min",
+    "openai/gpt-4o-mini": "15/min",
+    "serpapi.com": "30/min",
+    "p.rapidapi.com": "10/min",
+    "api.aviationstack.com": "5/min",
+    "api.openweathermap.org": "60/min",
+}
+# For upstreams without a configured limit that start sending rate-limit headers or 429s
+UNKNOWN_UPSTREAM_LIMIT = "60/min"
+
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "20"))
+# How long a call waits for its own model before taking the cheaper one instead
+MODEL_FALLBACK_WAIT_SECONDS = float(os.getenv("MODEL_FALLBACK_WAIT_SECONDS", "1"))
+# Share of each bucket that background calls leave to interactive ones
+BACKGROUND_RESERVE = 0.25
+# A 429 never throttles an upstream below this share of its configured rate
+_MIN_RATE_SHARE = 0.05
+
+_PERIODS = {"s": 1, "sec": 1, "second": 1, "min": 60, "minute": 60, "h": 3600, "hour": 3600, "day": 86400}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+_priority = contextvars.ContextVar("zeenova_call_priority", default=INTERACTIVE)
+
+
+class UpstreamRateLimited(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is over its request quota (retry in {max(1, round(retry_in))}s); do not retry this tool")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def parse_limit(spec: str) -> tuple:
+    """'30/min' -> (30.0, 60.0): requests and the period they refill over, in seconds."""
+    count, _, period = spec.strip().partition("/")
+    period = period.strip() or "min"
+    if period not in _PERIODS:
+        raise ValueError(f"Unknown rate limit period {period!r} in {spec!r}")
+    return float(count), float(_PERIODS[period])
+
+
+def parse_limits(overrides: str = RATE_LIMITS, defaults: dict = DEFAULT_RATE_LIMITS):
+    """Merges 'name=N/period,...' overrides into the defaults; None when disabled with 'off'."""
+    if overrides.strip().lower() in ("off", "0", "false", "no"):
+        return None
+    limits = dict(defaults)
+    for item in filter(None, (part.strip() for part in overrides.split(","))):
+        name, _, spec = item.rpartition("=")
+        if not name:
+            raise ValueError(f"RATE_LIMITS entries look like name=N/period, got {item!r}")
+        if spec.strip().lower() == "off":
+            limits.pop(name.strip(), None)
+        else:
+            limits[name.strip()] = spec
+    return {name: parse_limit(spec) for name, spec in limits.items()}
+
+
+def _seconds(value: str):
+    """'20', '1.5s', '6m0s', '120ms', an epoch timestamp or an HTTP date -> seconds from now."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if parts:
+            scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+            return sum(float(n) * scale[unit] for n, unit in parts)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    # Some APIs send the reset time as a Unix timestamp rather than a delay
+    return max(0.0, seconds - time.time()) if seconds > 1e9 else seconds
+
+
+def _first(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def parse_rate_limit_headers(headers) -> tuple:
+    """
+    (remaining, reset_seconds, retry_after) from the rate-limit headers of
+    OpenAI-style APIs (GitHub Models), RapidAPI and the generic/IETF variants;
+    each is None when absent.
+    """
+    if not headers:
+        return None, None, None
+    remaining_value = _first(headers, "x-ratelimit-remaining-requests", "x-ratelimit-requests-remaining",
+                             "x-ratelimit-remaining", "ratelimit-remaining")
+    try:
+        remaining_requests = float(remaining_value) if remaining_value is not None else None
+    except ValueError:
+        remaining_requests = None
+    reset = _seconds(_first(headers, "x-ratelimit-reset-requests", "x-ratelimit-requests-reset",
+                            "x-ratelimit-reset", "ratelimit-reset"))
+    retry_after_ms = headers.get("retry-after-ms")
+    retry_after = float(retry_after_ms) / 1000 if retry_after_ms else _seconds(headers.get("retry-after"))
+    return remaining_requests, reset, retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket whose balance may go negative: a negative balance is the queue
+    of interactive calls that have reserved a slot and are waiting for it.
+    """
+
+    def __init__(self, name: str, requests: float, period: float, clock=time.monotonic):
+        self.name = name
+        self.burst = max(1.0, requests)
+        self.configured_rate = requests / period
+        self.rate = self.configured_rate
+        self.tokens = self.burst
+        self.paused_until = 0.0
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.throttled = 0
+        self._updated = clock()
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _wait_for(self, now: float, floor: float) -> float:
+        deficit = floor + 1 - self.tokens
+        return max(self.paused_until - now, deficit / self.rate if deficit > 0 else 0.0)
+
+    def reserve(self, max_wait: float):
+        """Takes a slot for an interactive call: seconds to wait for it, or None if that exceeds max_wait."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = self._wait_for(now, 0.0)
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            self.tokens -= 1
+            self.granted += 1
+            if wait > 0:
+                self.queued += 1
+            return wait
+
+    def take_spare(self, max_wait: float):
+        """
+        Takes a token for a background call only above the interactive reserve.
+        Otherwise takes nothing and returns the seconds until there may be one,
+        or None if that exceeds max_wait.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = self._wait_for(now, self.burst * BACKGROUND_RESERVE)
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            if wait > 0:
+                return wait
+            self.tokens -= 1
+            self.granted += 1
+            return 0.0
+
+    def refund(self):
+        """Gives back a reserved slot whose caller stopped waiting."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+            self.granted -= 1
+
+    def retry_in(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return self._wait_for(now, 0.0)
+
+    def observe(self, status: int, remaining_requests=None, reset=None, retry_after=None):
+        """Adjusts the bucket to what the upstream reported about its quota."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if status == 429:
+                # Back off hard: stop until the upstream's retry time, then refill at half speed
+                self.throttled += 1
+                self.paused_until = max(self.paused_until, now + (retry_after if retry_after is not None else 1 / self.rate))
+                self.tokens = min(self.tokens, 0.0)
+                self.rate = max(self.configured_rate * _MIN_RATE_SHARE, self.rate / 2)
+            elif remaining_requests is not None:
+                # The upstream's count wins when it is lower than ours (other clients share the quota)
+                self.tokens = min(self.tokens, remaining_requests)
+                if reset:
+                    if remaining_requests < 1:
+                        self.paused_until = max(self.paused_until, now + reset)
+                    # Spread what is left evenly over the rest of the upstream's window
+                    self.rate = max(self.configured_rate * _MIN_RATE_SHARE,
+                                    min(self.configured_rate, remaining_requests / reset))
+            elif status < 400 and self.rate < self.configured_rate:
+                # No headers: recover additively after a throttle
+                self.rate = min(self.configured_rate, self.rate + self.configured_rate * 0.1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return {
+                "tokens": round(self.tokens, 2), "burst": self.burst,
+                "rate_per_min": round(self.rate * 60, 2), "configured_per_min": round(self.configured_rate * 60, 2),
+                "paused_for": round(max(0.0, self.paused_until - now), 2),
+                "granted": self.granted, "queued": self.queued, "rejected": self.rejected, "throttled": self.throttled,
+            }
+
+
+@contextmanager
+def priority_scope(priority: str):
+    """Runs the enclosed upstream calls at `priority` (INTERACTIVE or BACKGROUND)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class QuotaScheduler:
+    """One TokenBucket per model ID or host, created on first use."""
+
+    def __init__(self, limits, max_wait: float = RATE_LIMIT_MAX_WAIT_SECONDS,
+                 fallback_wait: float = MODEL_FALLBACK_WAIT_SECONDS, clock=time.monotonic):
+        self.enabled = limits is not None
+        self.limits = limits or {}
+        self.max_wait = max_wait
+        self.fallback_wait = fallback_wait
+        self.fallbacks = 0
+        self._buckets = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _limit_for(self, name: str):
+        if name in self.limits:
+            return self.limits[name]
+        # Hosts match their configured parent domain
+        for key, limit in self.limits.items():
+            if name.endswith("." + key):
+                return limit
+        return None
+
+    def bucket(self, name: str, create: bool = False):
+        """The bucket for `name`; with create=True an unconfigured upstream gets the default one."""
+        if not self.enabled or not name:
+            return None
+        bucket = self._buckets.get(name)
+        if bucket is not None:
+            return bucket
+        limit = self._limit_for(name) or (parse_limit(UNKNOWN_UPSTREAM_LIMIT) if create else None)
+        if limit is None:
+            return None
+        with self._lock:
+            return self._buckets.setdefault(name, TokenBucket(name, *limit, clock=self._clock))
+
+    def _max_wait(self, max_wait: float = None) -> float:
+        budget = self.max_wait if max_wait is None else max_wait
+        left = remaining()
+        return budget if left is None else max(0.0, min(budget, left))
+
+    def _try(self, bucket: TokenBucket, max_wait: float):
+        """Seconds to sleep before the call (interactive), or None if it cannot go within max_wait."""
+        if _priority.get() == INTERACTIVE:
+            return bucket.reserve(max_wait)
+        wait = bucket.take_spare(max_wait)
+        return wait if not wait else -wait  # negative: nothing taken yet, try again after this long
+
+    def _acquire(self, bucket: TokenBucket, max_wait: float) -> bool:
+        until = self._clock() + max_wait
+        while True:
+            wait = self._try(bucket, max(0.0, until - self._clock()))
+            if wait is None:
+                return False
+            if wait:
+                time.sleep(abs(wait))
+            if wait >= 0:
+                return True
+
+    async def _aacquire(self, bucket: TokenBucket, max_wait: float) -> bool:
+        until = self._clock() + max_wait
+        while True:
+            wait = self._try(bucket, max(0.0, until - self._clock()))
+            if wait is None:
+                return False
+            if wait:
+                try:
+                    await asyncio.sleep(abs(wait))
+                except asyncio.CancelledError:
+                    if wait > 0:
+                        bucket.refund()
+                    raise
+            if wait >= 0:
+                return True
+
+    def acquire(self, name: str):
+        """Waits for a slot on `name`'s quota; raises UpstreamRateLimited when none comes in time."""
+        bucket = self.bucket(name)
+        if bucket is not None and not self._acquire(bucket, self._max_wait()):
+            raise UpstreamRateLimited(name, bucket.retry_in())
+
+    async def aacquire(self, name: str):
+        bucket = self.bucket(name)
+        if bucket is not None and not await self._aacquire(bucket, self._max_wait()):
+            raise UpstreamRateLimited(name, bucket.retry_in())
+
+    def acquire_model(self, model: str, fallback: str = None) -> str:
+        """
+        Waits for a slot on `model`. If it cannot get one within the fallback
+        wait and a cheaper `fallback` model has room, returns that model instead.
+        """
+        primary, cheaper = self.bucket(model), self.bucket(fallback) if fallback else None
+        if primary is None:
+            return model
+        if cheaper is not None:
+            if self._acquire(primary, min(self.fallback_wait, self._max_wait())):
+                return model
+            if self._acquire(cheaper, self._max_wait()):
+                self.fallbacks += 1
+                return fallback
+        if not self._acquire(primary, self._max_wait()):
+            raise UpstreamRateLimited(model, primary.retry_in())
+        return model
+
+    async def aacquire_model(self, model: str, fallback: str = None) -> str:
+        primary, cheaper = self.bucket(model), self.bucket(fallback) if fallback else None
+        if primary is None:
+            return model
+        if cheaper is not None:
+            if await self._aacquire(primary, min(self.fallback_wait, self._max_wait())):
+                return model
+            if await self._aacquire(cheaper, self._max_wait()):
+                self.fallbacks += 1
+                return fallback
+        if not await self._aacquire(primary, self._max_wait()):
+            raise UpstreamRateLimited(model, primary.retry_in())
+        return model
+
+    def observe(self, name: str, headers, status: int):
+        """Feeds a response's status and rate-limit headers back into `name`'s bucket."""
+        remaining_requests, reset, retry_after = parse_rate_limit_headers(headers)
+        reported = status == 429 or remaining_requests is not None
+        bucket = self.bucket(name, create=reported)
+        if bucket is not None:
+            bucket.observe(status, remaining_requests, reset, retry_after)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {"enabled": self.enabled, "fallbacks": self.fallbacks, "buckets": {b.name: b.as_dict() for b in buckets}}
+
+
+# Process-wide, shared by the HTTP transports and the LLM wrapper
+quota_scheduler = QuotaScheduler(parse_limits())
+
+
+def get_quota_stats() -> dict:
+    return quota_scheduler.snapshot()
+
+
+__all__ = [
+    "QuotaScheduler", "TokenBucket", "UpstreamRateLimited", "quota_scheduler", "get_quota_stats",
+    "priority_scope", "parse_rate_limit_headers", "parse_limits", "INTERACTIVE", "BACKGROUND",
+]
@@ -0,0 +1,217 @@
+import json
+from abc import ABC, abstractmethod
+
+# Compact tool results.
+# Whatever a tool returns is fed back into the agent scratchpad on every later
+# step, and emoji-heavy markdown tokenizes poorly. The structured tools return
+# a record instead: one line of JSON holding only the fields worth reasoning
+# about. The markdown users see is rendered from the same text at display time
+# (render_markdown, used by streamlit_app.py and api/main.py), so transcripts,
+# memory and caches all keep the compact form.
+
+SNIPPET_CHARS = 160
+
+# Storefront headings for product results; unknown sites get a generic label
+STOREFRONT_LABELS = {
+    "amazon.in": "🛒 Amazon",
+    "flipkart.com": "🛍️ Flipkart",
+}
+
+
+def storefront_label(site: str) -> str:
+    return STOREFRONT_LABELS.get(site, f"🛒 {site.split('.')[0].capitalize()}")
+
+
+def clip(text, limit: int = SNIPPET_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def link(title, url, snippet) -> list:
+    """One search hit as [title, url, clipped snippet]."""
+    return [title or "No title", url or "", clip(snippet)]
+
+
+class Record(ABC):
+    """
+    Base for compact tool results. Subclasses list their fields in __slots__
+    and render them in markdown(); empty fields are left out of the JSON.
+    """
+
+    __slots__ = ()
+    kind = ""
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def to_dict(self) -> dict:
+        values = ((name, getattr(self, name)) for name in self.__slots__)
+        return {name: value for name, value in values if value not in (None, "", [], {})}
+
+    def to_text(self) -> str:
+        return json.dumps({"kind": self.kind, **self.to_dict()}, ensure_ascii=False, separators=(",", ":"))
+
+    @abstractmethod
+    def markdown(self) -> str:
+        """The layout shown to users."""
+
+    def __str__(self):
+        return self.to_text()
+
+
+class TrainStatus(Record):
+    __slots__ = ("train", "name", "source", "dest", "departs", "run_days", "journey_min", "pantry",
+                 "station", "eta", "scheduled", "delay_min", "ahead", "platform", "updated")
+    kind = "train"
+
+    def markdown(self) -> str:
+        journey = self.journey_min or 0
+        return (
+            f"🚆 **Train {self.train} - {self.name}**\n"
+            f"📅 Run Days: {self.run_days or 'N/A'}\n"
+            f"🛤️ Route: {self.source or 'N/A'} ➝ {self.dest or 'N/A'}\n"
+            f"⏱️ Departure Time: {self.departs or 'N/A'}\n"
+            f"⌛ Journey Time: {journey // 60} hrs {journey % 60} mins\n"
+            f"🍱 Pantry Available: {'Yes' if self.pantry else 'No'}\n\n"
+            f"📍 **Current Station**: {self.station or 'N/A'}\n"
+            f"🕒 ETA: {self.eta or 'N/A'} | Scheduled: {self.scheduled or 'N/A'}\n"
+            f"🔄 Delay: {self.delay_min if self.delay_min is not None else 'N/A'} mins\n"
+            f"📏 Ahead Distance: {self.ahead or 'N/A'}\n"
+            f"🛑 Platform: {self.platform or 'Not assigned'}\n"
+            f"🕓 Last Updated: {self.updated or 'N/A'}"
+        )
+
+
+class PnrStatus(Record):
+    # passengers: [booking status, current status] per passenger, in order
+    __slots__ = ("pnr", "train", "name", "date", "boarding", "upto", "passengers")
+    kind = "pnr"
+
+    def markdown(self) -> str:
+        passengers = "\n".join(
+            f"👤 Passenger {no}: {booking} ➡ {current}"
+            for no, (booking, current) in enumerate(self.passengers or [], 1)
+        )
+        return (
+            f"📋 **PNR: {self.pnr}**\n🚆 {self.train} - {self.name}\n📅 Date: {self.date}\n"
+            f"🛤 Route: {self.boarding} → {self.upto}\n{passengers}"
+        )
+
+
+class FlightStatus(Record):
+    # dep/arr: [airport, scheduled time]
+    __slots__ = ("flight", "airline", "status", "dep", "arr")
+    kind = "flight"
+
+    def markdown(self) -> str:
+        return (
+            f"✈️ Flight **{self.flight} ({self.airline})**\n"
+            f"Departure: {self.dep[0]} at {self.dep[1]}\n"
+            f"Arrival: {self.arr[0]} at {self.arr[1]}\n"
+            f"Status: {self.status}"
+        )
+
+
+class FdRates(Record):
+    # banks/others: [bank, general rate, senior rate]; `others` are the top banks
+    # listed next to a bank the user asked about. `requested` is set when the
+    # asked-for tenure is not tracked and `tenure` was shown instead.
+    __slots__ = ("tenure", "requested", "banks", "others")
+    kind = "fd"
+
+    def markdown(self) -> str:
+        def rows(rates):
+            return [f"🏦 {bank}: {general} (General), {senior} (Senior)" for bank, general, senior in rates or []]
+
+        lines = rows(self.banks)
+        if self.others:
+            lines += ["\n📊 Here are a few other banks:"] + rows(self.others)
+        note = f"(Rates shown for {self.tenure}; {self.requested} rates are not tracked.)\n" if self.requested else ""
+        return note + "\n".join(lines)
+
+
+class Products(Record):
+    # results: storefront -> [link(...)], in storefront order
+    __slots__ = ("results", "missing")
+    kind = "products"
+
+    def markdown(self) -> str:
+        sections = []
+        for site, items in (self.results or {}).items():
+            sections.append(f"### {storefront_label(site)} Results:\n")
+            sections.extend(
+                f"**{title}**\n{snippet}\n[🛒 View Product]({url})\n---" for title, url, snippet in items
+            )
+        if self.missing:
+            sections.append(f"_No timely results from: {', '.join(self.missing)}_")
+        return "\n\n".join(sections)
+
+
+class Videos(Record):
+    # results: [link(...)]
+    __slots__ = ("results",)
+    kind = "videos"
+
+    def markdown(self) -> str:
+        return "\n".join(f"**{title}**\n{snippet}\n🔗 {url}\n" for title, url, snippet in self.results or [])
+
+
+class RechargePlans(Record):
+    __slots__ = ("results",)
+    kind = "plans"
+
+    def markdown(self) -> str:
+        return "\n\n".join(f"**{title}**\n{snippet}\n🔗 {url}" for title, url, snippet in self.results or [])
+
+
+RECORD_TYPES = {cls.kind: cls for cls in (TrainStatus, PnrStatus, FlightStatus, FdRates, Products, Videos, RechargePlans)}
+
+
+def parse_record(text):
+    """The Record a tool returned as text, or None for any other output."""
+    if not isinstance(text, str) or not text.startswith('{"kind":'):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    cls = RECORD_TYPES.get(data.pop("kind", None)) if isinstance(data, dict) else None
+    return cls(**data) if cls else None
+
+
+_decoder = json.JSONDecoder()
+
+
+def render_markdown(text):
+    """
+    Display form of an answer: a tool record becomes markdown, and so does a
+    record the model pasted into its prose; other text is returned unchanged.
+    """
+    record = parse_record(text)
+    if record is not None:
+        return record.markdown()
+    if not isinstance(text, str) or '{"kind":' not in text:
+        return text
+    parts, pos = [], 0
+    while (start := text.find('{"kind":', pos)) != -1:
+        try:
+            _, end = _decoder.raw_decode(text, start)
+        except ValueError:
+            end = None
+        record = parse_record(text[start:end]) if end else None
+        if record is None:
+            parts.append(text[pos:start + 1])
+            pos = start + 1
+            continue
+        parts.append(text[pos:start])
+        parts.append(record.markdown())
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+__all__ = [
+    "Record", "TrainStatus", "PnrStatus", "FlightStatus", "FdRates", "Products", "Videos", "RechargePlans",
+    "RECORD_TYPES", "STOREFRONT_LABELS", "storefront_label", "clip", "link", "parse_record", "render_markdown",
+]
@@ -0,0 +1,144 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future
+
+from tools.tool_cache import make_key, looks_like_error
+
+# Single-flight coalescing for tool calls.
+# Concurrent calls with the same tool and normalized arguments share one
+# upstream request: the first caller (the leader) runs it, everyone who arrives
+# while it is in flight waits for the same result. Sync and async callers share
+# flights, since both wait on a concurrent.futures.Future. This sits below the
+# result cache, which only helps once the first call has finished.
+#
+# The leader's call runs under the leader's turn deadline. A failure may be
+# down to that budget (a clamped timeout, DeadlineExceeded) rather than the
+# upstream, so followers only share successful results; after a failure or
+# timeout each follower runs the call itself, under its own deadline.
+
+
+class _Abandoned(Exception):
+    """The leader was cancelled or failed; followers run the call themselves."""
+
+
+class _FlightCounters:
+    __slots__ = ("calls", "coalesced")
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._counters = {}
+
+    def _join(self, name: str, key: str):
+        """Returns (future, is_leader) for the flight under `key`."""
+        with self._lock:
+            counters = self._counters.get(name)
+            if counters is None:
+                counters = self._counters[name] = _FlightCounters()
+            future = self._flights.get(key)
+            if future is not None:
+                counters.coalesced += 1
+                return future, False
+            future = self._flights[key] = Future()
+            # Running futures cannot be cancelled by a waiter, only completed by the leader
+            future.set_running_or_notify_cancel()
+            counters.calls += 1
+            return future, True
+
+    def _land(self, key: str, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is None and not looks_like_error(result):
+            future.set_result(result)
+        else:
+            # Raised errors and the tools' "⚠️ ... timed out" / "Error fetching ..."
+            # strings alike: followers retry under their own deadline
+            future.set_exception(_Abandoned())
+
+    def do(self, name: str, key: str, func, *args, **kwargs):
+        future, leader = self._join(name, key)
+        if not leader:
+            try:
+                return future.result()
+            except _Abandoned:
+                return func(*args, **kwargs)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+
+    async def ado(self, name: str, key: str, coroutine, *args, **kwargs):
+        future, leader = self._join(name, key)
+        if not leader:
+            try:
+                # shield: a cancelled follower must not cancel the shared flight
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                return await coroutine(*args, **kwargs)
+        try:
+            result = await coroutine(*args, **kwargs)
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+
+    def wrap_tool(self, tool):
+        """Coalesces concurrent identical calls to a LangChain tool, in place."""
+        name, func, coroutine = tool.name, tool.func, tool.coroutine
+
+        if func is not None:
+            @functools.wraps(func)
+            def coalesced(*args, **kwargs):
+                return self.do(name, make_key(name, args, kwargs), func, *args, **kwargs)
+            tool.func = coalesced
+
+        if coroutine is not None:
+            @functools.wraps(coroutine)
+            async def acoalesced(*args, **kwargs):
+                return await self.ado(name, make_key(name, args, kwargs), coroutine, *args, **kwargs)
+            tool.coroutine = acoalesced
+
+        return tool
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_tool = {name: c.as_dict() for name, c in self._counters.items()}
+            in_flight = len(self._flights)
+        calls = sum(c["calls"] for c in per_tool.values())
+        coalesced = sum(c["coalesced"] for c in per_tool.values())
+        return {
+            "in_flight": in_flight,
+            "calls": calls,
+            "coalesced": coalesced,
+            "coalesced_ratio": round(coalesced / (calls + coalesced), 3) if calls + coalesced else 0.0,
+            "tools": per_tool,
+        }
+
+
+# Process-wide, shared by every session and by the fast path
+single_flight = SingleFlight()
+
+
+def get_single_flight_stats() -> dict:
+    return single_flight.stats()
+
+
+__all__ = ["SingleFlight", "single_flight", "get_single_flight_stats"]
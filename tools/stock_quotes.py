@@ -0,0 +1,234 @@
+import os, re, json, time, threading
+
+# Batched stock quote engine.
+# Company names are resolved to tickers from a local symbol index (seeded below,
+# extended by Yahoo symbol search and optionally persisted to disk). Prices come
+# from one batched yfinance download of the daily bars instead of the heavy
+# per-ticker `.info` quote summary, and are kept in a short-TTL quote table so
+# concurrent sessions asking about the same ticker share a single fetch.
+
+QUOTE_TTL_SECONDS = float(os.getenv("STOCK_QUOTE_TTL_SECONDS", "15"))
+QUOTE_FETCH_TIMEOUT = 10
+# Optional JSON file that remembers names resolved through Yahoo symbol search
+SYMBOL_INDEX_PATH = os.getenv("STOCK_SYMBOL_INDEX") or None
+
+SEED_SYMBOLS = {
+    "apple": ("AAPL", "Apple Inc."),
+    "microsoft": ("MSFT", "Microsoft Corporation"),
+    "google": ("GOOGL", "Alphabet Inc."),
+    "alphabet": ("GOOGL", "Alphabet Inc."),
+    "amazon": ("AMZN", "Amazon.com, Inc."),
+    "meta": ("META", "Meta Platforms, Inc."),
+    "facebook": ("META", "Meta Platforms, Inc."),
+    "tesla": ("TSLA", "Tesla, Inc."),
+    "nvidia": ("NVDA", "NVIDIA Corporation"),
+    "netflix": ("NFLX", "Netflix, Inc."),
+    "intel": ("INTC", "Intel Corporation"),
+    "amd": ("AMD", "Advanced Micro Devices, Inc."),
+    "ibm": ("IBM", "International Business Machines"),
+    "oracle": ("ORCL", "Oracle Corporation"),
+    "reliance": ("RELIANCE.NS", "Reliance Industries"),
+    "tcs": ("TCS.NS", "Tata Consultancy Services"),
+    "tata consultancy services": ("TCS.NS", "Tata Consultancy Services"),
+    "infosys": ("INFY.NS", "Infosys"),
+    "wipro": ("WIPRO.NS", "Wipro"),
+    "hdfc bank": ("HDFCBANK.NS", "HDFC Bank"),
+    "icici bank": ("ICICIBANK.NS", "ICICI Bank"),
+    "sbi": ("SBIN.NS", "State Bank of India"),
+    "state bank of india": ("SBIN.NS", "State Bank of India"),
+    "itc": ("ITC.NS", "ITC"),
+    "airtel": ("BHARTIARTL.NS", "Bharti Airtel"),
+    "bharti airtel": ("BHARTIARTL.NS", "Bharti Airtel"),
+    "tata motors": ("TATAMOTORS.NS", "Tata Motors"),
+    "adani enterprises": ("ADANIENT.NS", "Adani Enterprises"),
+    "hcl": ("HCLTECH.NS", "HCL Technologies"),
+    "larsen": ("LT.NS", "Larsen & Toubro"),
+    "larsen & toubro": ("LT.NS", "Larsen & Toubro"),
+    "maruti": ("MARUTI.NS", "Maruti Suzuki India"),
+    "zomato": ("ZOMATO.NS", "Zomato"),
+}
+
+CURRENCY_BY_SUFFIX = {".NS": "₹", ".BO": "₹", ".L": "£", ".T": "¥", ".HK": "HK$"}
+
+_FILLER_WORDS = {
+    "what", "whats", "is", "the", "current", "latest", "live", "today", "todays", "stock", "stocks",
+    "share", "shares", "price", "prices", "of", "for", "quote", "quotes", "check", "get", "show", "me", "value",
+}
+_TICKER = re.compile(r"^\^?[A-Z0-9]{1,10}(?:[.=-][A-Z]{1,3})?$")
+
+
+def currency_symbol(symbol: str) -> str:
+    for suffix, sign in CURRENCY_BY_SUFFIX.items():
+        if symbol.endswith(suffix):
+            return sign
+    return "$"
+
+
+class Quote:
+    __slots__ = ("symbol", "price", "fetched_at")
+
+    def __init__(self, symbol: str, price, fetched_at: float):
+        self.symbol = symbol
+        self.price = price
+        self.fetched_at = fetched_at
+
+
+class SymbolIndex:
+    """Normalized company name -> (ticker, display name)."""
+
+    def __init__(self, seed: dict = SEED_SYMBOLS, path: str = SYMBOL_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names = dict(seed)
+        self._display = {ticker: name for ticker, name in seed.values()}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    for key, (ticker, name) in json.load(f).items():
+                        self._names.setdefault(key, (ticker, name))
+                        self._display.setdefault(ticker, name)
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        words = re.findall(r"[a-z0-9&]+", name.lower())
+        return " ".join(w for w in words if w not in _FILLER_WORDS)
+
+    def display_name(self, ticker: str) -> str:
+        return self._display.get(ticker, ticker)
+
+    def _search(self, name: str):
+        import yfinance as yf
+
+        try:
+            quotes = yf.Search(name, max_results=1, news_count=0).quotes
+        except Exception:
+            return None
+        if not quotes:
+            return None
+        best = quotes[0]
+        return best.get("symbol"), best.get("shortname") or best.get("longname") or best.get("symbol")
+
+    def _persist(self):
+        if not self.path:
+            return
+        seeded = set(SEED_SYMBOLS)
+        try:
+            with open(self.path, "w") as f:
+                json.dump({k: v for k, v in self._names.items() if k not in seeded}, f)
+        except OSError:
+            pass
+
+    def resolve(self, text: str):
+        """Returns (ticker, display name) for a ticker or company name, or None."""
+        raw = " ".join(w for w in text.split() if w.lower().strip("'?") not in _FILLER_WORDS)
+        key = self.normalize(raw)
+        if not key:
+            return None
+        if key in self._names:
+            return self._names[key]
+        if _TICKER.match(raw):
+            return raw, self.display_name(raw)
+
+        found = self._search(key)
+        if not found or not found[0]:
+            # lower-case ticker typed by the user ("aapl")
+            if _TICKER.match(key.upper()):
+                return key.upper(), self.display_name(key.upper())
+            return None
+        with self._lock:
+            self._names[key] = found
+            self._display.setdefault(found[0], found[1])
+            self._persist()
+        return found
+
+
+class QuoteEngine:
+    """Short-TTL quote table in front of batched yfinance downloads."""
+
+    def __init__(self, ttl: float = QUOTE_TTL_SECONDS, timeout: float = QUOTE_FETCH_TIMEOUT, clock=time.monotonic):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._table = {}
+        self._inflight = {}
+        self.batches = 0
+        self.shared_waits = 0
+
+    def _fetch(self, symbols: list) -> dict:
+        import yfinance as yf
+
+        frame = yf.download(
+            symbols, period="5d", interval="1d", progress=False,
+            auto_adjust=False, threads=True, timeout=self.timeout,
+        )
+        prices = {}
+        if frame is None or frame.empty:
+            return prices
+        closes = frame["Close"]
+        for symbol in symbols:
+            if symbol in closes:
+                series = closes[symbol].dropna()
+                if not series.empty:
+                    prices[symbol] = float(series.iloc[-1])
+        return prices
+
+    def quotes(self, symbols: list) -> dict:
+        """symbol -> price (None when the symbol could not be priced)."""
+        now = self._clock()
+        with self._lock:
+            fresh = {}
+            waiting = set()
+            for s in symbols:
+                quote = self._table.get(s)
+                if quote is not None and now - quote.fetched_at < self.ttl:
+                    fresh[s] = quote.price
+                elif s in self._inflight:
+                    waiting.add(self._inflight[s])
+            mine = [s for s in symbols if s not in fresh and s not in self._inflight]
+            done = threading.Event()
+            for s in mine:
+                self._inflight[s] = done
+            if waiting:
+                self.shared_waits += 1
+
+        if mine:
+            prices = {}
+            try:
+                prices = self._fetch(mine)
+            except Exception:
+                prices = {}
+            finally:
+                fetched_at = self._clock()
+                with self._lock:
+                    self.batches += 1
+                    for s in mine:
+                        self._table[s] = Quote(s, prices.get(s), fetched_at)
+                        self._inflight.pop(s, None)
+                done.set()
+
+        # Someone else is already fetching these; wait for their batch
+        for event in waiting:
+            event.wait(self.timeout)
+
+        with self._lock:
+            return {s: fresh[s] if s in fresh else getattr(self._table.get(s), "price", None) for s in symbols}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"cached_quotes": len(self._table), "batches": self.batches, "shared_waits": self.shared_waits}
+
+
+symbol_index = SymbolIndex()
+quote_engine = QuoteEngine()
+
+
+def split_stock_query(query: str) -> list:
+    """'AAPL, MSFT and Infosys' -> ['AAPL', 'MSFT', 'Infosys']"""
+    parts = re.split(r"\s*(?:,|;|\band\b|\bvs\.?\b|\bversus\b)\s*", query.strip().rstrip("?."), flags=re.IGNORECASE)
+    return [p for p in parts if p.strip()]
+
+
+__all__ = ["SymbolIndex", "QuoteEngine", "symbol_index", "quote_engine", "split_stock_query"]
@@ -0,0 +1,273 @@
+import os, json, time, sqlite3, datetime, threading, functools
+from collections import OrderedDict
+
+from tools.records import parse_record
+
+# Shared result cache for tool calls.
+# Identical calls (same tool, same normalized input) within a tool's TTL are
+# answered locally instead of going upstream again and burning API quota.
+
+FOREVER = None
+
+# TTL per registered tool name, in seconds. Tools missing here are never cached.
+TOOL_TTLS = {
+    "Stock Price Checker": 15,
+    "Train Live Status Checker": 30,
+    "PNR Status Checker": 60,
+    "Flight Status Checker": 60,
+    "Weather": 10 * 60,
+    "Google Search": 10 * 60,
+    "E-commerce Product Search": 30 * 60,
+    "YouTube Video Search": 60 * 60,
+    "Currency Converter": 60 * 60,
+    "FD Rates Checker": 6 * 60 * 60,
+    "Recharge Plan Search": 6 * 60 * 60,
+    "Wikipedia": 24 * 60 * 60,
+    "Indian Holiday Lookup": FOREVER,
+}
+
+# Answers that depend on today's date ("is tomorrow a holiday") are keyed per day
+# and expire at the next midnight, whatever their TTL
+DATE_SENSITIVE_TOOLS = {"Indian Holiday Lookup"}
+
+# Results missing some of their sources (e.g. a storefront that timed out) are
+# kept only briefly, so one slow source does not blank it out for the full TTL
+PARTIAL_RESULT_TTL = 60
+
+# Tools report failures as friendly strings instead of raising; never cache those
+# (a superset of the fast path's list in agent/fast_router.py)
+_ERROR_PREFIXES = (
+    "⚠️", "❌", "error", "failed", "something went wrong", "i couldn't", "couldn't", "no relevant results",
+    "no flight found", "no videos found", "no real-time recharge data", "please format",
+    "weather service is not configured", "currency api key",
+)
+
+
+def looks_like_error(value) -> bool:
+    return isinstance(value, str) and value.strip().lower().startswith(_ERROR_PREFIXES)
+
+
+def next_midnight() -> float:
+    """Epoch seconds of the coming local midnight."""
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+
+def looks_partial(value) -> bool:
+    record = parse_record(value)
+    return bool(getattr(record, "missing", None))
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(tool_name: str, args: tuple, kwargs: dict) -> str:
+    """Builds a stable cache key from the tool name and case/whitespace-normalized arguments."""
+    parts = {"tool": tool_name, "args": _normalize(list(args)), "kwargs": _normalize(kwargs)}
+    if tool_name in DATE_SENSITIVE_TOOLS:
+        parts["date"] = datetime.date.today().isoformat()
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class _ToolCounters:
+    __slots__ = ("hits", "disk_hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class _SQLiteTier:
+    """Optional on-disk tier so cached results survive restarts."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value, expires_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        today = f'%"date": "{datetime.date.today().isoformat()}"%'
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM tool_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            # Date-keyed rows stored without an expiry by older versions
+            self._conn.execute(
+                "DELETE FROM tool_cache WHERE expires_at IS NULL AND key LIKE '%\"date\": \"%' AND key NOT LIKE ?",
+                (today,),
+            )
+
+
+class ToolCache:
+    """Bounded in-memory LRU with per-entry TTL and an optional SQLite tier."""
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int = 2048, sqlite_path: str = None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._disk = _SQLiteTier(sqlite_path) if sqlite_path else None
+        if self._disk:
+            self._disk.purge_expired()
+
+    def _counter(self, tool_name: str) -> _ToolCounters:
+        counters = self._counters.get(tool_name)
+        if counters is None:
+            counters = self._counters[tool_name] = _ToolCounters()
+        return counters
+
+    def get(self, tool_name: str, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counter(tool_name).hits += 1
+                    return value
+                del self._entries[key]
+
+        if self._disk:
+            stored = self._disk.get(key)
+            if stored is not None:
+                value, expires_at = stored
+                with self._lock:
+                    self._counter(tool_name).disk_hits += 1
+                    self._store(tool_name, key, value, expires_at)
+                return value
+
+        with self._lock:
+            self._counter(tool_name).misses += 1
+        return self._MISSING
+
+    def _store(self, tool_name: str, key: str, value, expires_at):
+        self._entries[key] = (expires_at, value, tool_name)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, (_, _, evicted_tool) = self._entries.popitem(last=False)
+            self._counter(evicted_tool).evictions += 1
+
+    def set(self, tool_name: str, key: str, value, ttl):
+        if looks_like_error(value):
+            return
+        if looks_partial(value):
+            ttl = PARTIAL_RESULT_TTL if ttl is FOREVER else min(ttl, PARTIAL_RESULT_TTL)
+        expires_at = None if ttl is FOREVER else time.time() + ttl
+        if tool_name in DATE_SENSITIVE_TOOLS:
+            # Keyed by today's date: useless (and never hit again) after midnight
+            expires_at = next_midnight() if expires_at is None else min(expires_at, next_midnight())
+        with self._lock:
+            self._store(tool_name, key, value, expires_at)
+        if self._disk:
+            self._disk.set(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_tool = {name: c.as_dict() for name, c in self._counters.items()}
+            size = len(self._entries)
+        return {"entries": size, "max_entries": self.max_entries, "disk": bool(self._disk), "tools": per_tool}
+
+    def wrap(self, tool_name: str, func, ttl):
+        """Wraps a sync tool function with this cache."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(tool_name, args, kwargs)
+            value = self.get(tool_name, key)
+            if value is not self._MISSING:
+                return value
+            value = func(*args, **kwargs)
+            self.set(tool_name, key, value, ttl)
+            return value
+        return wrapper
+
+    def awrap(self, tool_name: str, coroutine, ttl):
+        """Wraps an async tool coroutine function with this cache."""
+        @functools.wraps(coroutine)
+        async def wrapper(*args, **kwargs):
+            key = make_key(tool_name, args, kwargs)
+            value = self.get(tool_name, key)
+            if value is not self._MISSING:
+                return value
+            value = await coroutine(*args, **kwargs)
+            self.set(tool_name, key, value, ttl)
+            return value
+        return wrapper
+
+    def wrap_tool(self, tool):
+        """Adds caching to a LangChain tool in place, using its TOOL_TTLS entry."""
+        if tool.name not in TOOL_TTLS:
+            return tool
+        ttl = TOOL_TTLS[tool.name]
+        if tool.func is not None:
+            tool.func = self.wrap(tool.name, tool.func, ttl)
+        if tool.coroutine is not None:
+            tool.coroutine = self.awrap(tool.name, tool.coroutine, ttl)
+        return tool
+
+
+# Process-wide cache; set TOOL_CACHE_DB=/path/to/cache.sqlite3 to enable the on-disk tier
+tool_cache = ToolCache(
+    max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "2048")),
+    sqlite_path=os.getenv("TOOL_CACHE_DB") or None,
+)
+
+
+def get_cache_stats() -> dict:
+    return tool_cache.stats()
+
+
+__all__ = ["ToolCache", "TOOL_TTLS", "tool_cache", "make_key", "get_cache_stats", "looks_like_error", "looks_partial"]
@@ -1,23 +1,54 @@
-from wikipedia import summary, exceptions
-from serpapi import GoogleSearch
-import yfinance as yf
-import os, requests, re, datetime, json
-import holidays
+import os, re, datetime, json, asyncio
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from bs4 import BeautifulSoup
+
+from tools.http_client import http_get, ahttp_get
+from tools.fan_out import fan_out, afan_out
+from tools.holiday_index import get_holiday_index, detect_state, state_name
+from tools.currency_rates import currency_engine
+from tools.fd_rates import fd_rate_store, parse_fd_query, DEFAULT_TENURE
+from tools.stock_quotes import symbol_index, quote_engine, split_stock_query, currency_symbol
+from tools.records import TrainStatus, PnrStatus, FlightStatus, FdRates, Products, Videos, RechargePlans, link
 
 # Load environment variables
 load_dotenv()
 
+# Heavy third-party libraries (wikipedia, yfinance -> pandas/numpy, bs4, holidays,
+# dateutil) are imported inside the tools that need them, on first use, so importing
+# this module stays cheap and cold start doesn't pay for tools nobody calls.
+
+# Each network tool has a sync version (used by AgentExecutor.invoke) and an async
+# 'a'-prefixed version (used by AgentExecutor.ainvoke). Both share the same request
+# building and response parsing helpers; only the HTTP call differs.
+
+# Upstream endpoints can be overridden through the environment (same name as the
+# constant), e.g. to point the tools at the local stubs in benchmarks/.
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
+
+def _serpapi_params(params: dict) -> dict:
+    return {"engine": "google", "output": "json", "source": "python", **params}
+
+def serpapi_get_dict(params: dict, timeout: float = 15) -> dict:
+    """Runs a SerpAPI Google search through the shared pooled HTTP transport."""
+    response = http_get(SERPAPI_URL, params=_serpapi_params(params), timeout=timeout)
+    return response.json()
+
+async def aserpapi_get_dict(params: dict, timeout: float = 15) -> dict:
+    response = await ahttp_get(SERPAPI_URL, params=_serpapi_params(params), timeout=timeout)
+    return response.json()
+
 # Tool: Get current time
 def get_current_time(*args, **kwargs):
     import datetime
     return datetime.datetime.now().strftime("%I:%M %p")
 
+async def aget_current_time(*args, **kwargs):
+    return get_current_time()
+
 # Tool: Search Wikipedia
 def search_wikipedia(query: str) -> str:
     """Searches Wikipedia and returns the summary of the first result."""
+    from wikipedia import summary, exceptions
 
     try:
         return summary(query, sentences=2)
@@ -28,48 +59,119 @@ def search_wikipedia(query: str) -> str:
     except Exception as e:
         return f"Something went wrong: {str(e)}"
 
+async def asearch_wikipedia(query: str) -> str:
+    # The wikipedia package is blocking-only; keep it off the event loop
+    return await asyncio.to_thread(search_wikipedia, query)
+
 # Tool: Web Search using SerpAPI
+def _format_search_snippets(results: dict) -> str:
+    try:
+        return "\n".join([r["snippet"] for r in results["organic_results"][:3]])
+    except:
+        return "No relevant results found."
+
 def serpapi_search(query: str) -> str:
-    search = GoogleSearch({
+    results = serpapi_get_dict({
         "q": query,
         "api_key": os.environ["SERPAPI_API_KEY"],
         "num": 3
     })
-    results = search.get_dict()
-    try:
-        return "\n".join([r["snippet"] for r in results["organic_results"][:3]])
-    except:
-        return "No relevant results found."
+    return _format_search_snippets(results)
+
+async def aserpapi_search(query: str) -> str:
+    results = await aserpapi_get_dict({
+        "q": query,
+        "api_key": os.environ["SERPAPI_API_KEY"],
+        "num": 3
+    })
+    return _format_search_snippets(results)
 
 # Tool: Get stock price using yfinance
-def get_stock_price(query: str) -> str:
-    """Fetches real-time stock price for a given ticker or company name."""
-    try:
-        ticker = yf.Ticker(query)
-        price = ticker.info.get("regularMarketPrice", None)
-        name = ticker.info.get("shortName", query)
+# Names are resolved through the local symbol index and all tickers in the query
+# are priced in one batched download (see tools/stock_quotes.py).
+def _format_stock_quotes(resolved: list, prices: dict) -> str:
+    lines = []
+    for ticker, name in resolved:
+        price = prices.get(ticker)
         if price:
-            return f"The current stock price of {name} ({query.upper()}) is ${price:.2f}."
+            lines.append(f"The current stock price of {name} ({ticker}) is {currency_symbol(ticker)}{price:.2f}.")
         else:
+            lines.append(f"I couldn't retrieve the stock price for {ticker}. Please check the ticker symbol.")
+    return "\n".join(lines)
+
+def get_stock_price(query: str) -> str:
+    """Fetches real-time stock prices for one or more tickers or company names."""
+    try:
+        resolved, unknown = [], []
+        for part in split_stock_query(query):
+            match = symbol_index.resolve(part)
+            if match and match not in resolved:
+                resolved.append(match)
+            elif not match:
+                unknown.append(part.strip())
+        if not resolved:
             return "I couldn't retrieve the stock price. Please check the ticker symbol."
+
+        result = _format_stock_quotes(resolved, quote_engine.quotes([ticker for ticker, _ in resolved]))
+        if unknown:
+            result += f"\nI couldn't find a ticker for: {', '.join(unknown)}."
+        return result
     except Exception as e:
         return f"Error fetching stock price: {str(e)}"
-    
+
+async def aget_stock_price(query: str) -> str:
+    # yfinance is blocking-only; keep it off the event loop
+    return await asyncio.to_thread(get_stock_price, query)
+
 # Tool: Get weather information
+IPINFO_URL = os.getenv("IPINFO_URL", "https://ipinfo.io/json")
+
+def _ipinfo_url() -> str:
+    ipinfo_token = os.getenv("IPINFO_TOKEN", None)
+    url = IPINFO_URL
+    if ipinfo_token:
+        url += f"?token={ipinfo_token}"
+    return url
+
 def detect_location_from_ip() -> str:
     """Returns city name based on IP address."""
     try:
-        ipinfo_token = os.getenv("IPINFO_TOKEN", None)
-        url = "https://ipinfo.io/json"
-        if ipinfo_token:
-            url += f"?token={ipinfo_token}"
+        response = http_get(_ipinfo_url(), timeout=3)
+        data = response.json()
+        return data.get("city", "")
+    except Exception as e:
+        return ""
 
-        response = requests.get(url, timeout=3)
+async def adetect_location_from_ip() -> str:
+    try:
+        response = await ahttp_get(_ipinfo_url(), timeout=3)
         data = response.json()
         return data.get("city", "")
     except Exception as e:
         return ""
 
+WEATHER_URL = os.getenv("WEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+def _format_weather(city: str, response) -> str:
+    data = response.json()
+
+    if response.status_code != 200:
+        return f"⚠️ Weather API Error: {data.get('message', 'Unknown error')}"
+
+    if "weather" not in data or "main" not in data:
+        return "⚠️ Unexpected response format. Please try again later."
+
+    weather = data["weather"][0]["description"].capitalize()
+    temp = data["main"]["temp"]
+    feels_like = data["main"]["feels_like"]
+    humidity = data["main"]["humidity"]
+
+    return (
+        f"The weather in {city.title()} is {weather}, "
+        f"{temp}°C (feels like {feels_like}°C), "
+        f"with {humidity}% humidity."
+    )
+
 def get_weather(city: str = "") -> str:
     """Returns current weather info for a given or detected city."""
     if not city:
@@ -81,181 +183,267 @@ def get_weather(city: str = "") -> str:
     if not api_key:
         return "Weather service is not configured properly, please check your API key."
 
-    url = "https://api.openweathermap.org/data/2.5/weather"
     params = {"q": city, "appid": api_key, "units": "metric"}
 
     try:
-        response = requests.get(url, params=params, timeout=5)
-        data = response.json()
-
-        if response.status_code != 200:
-            return f"⚠️ Weather API Error: {data.get('message', 'Unknown error')}"
+        response = http_get(WEATHER_URL, params=params, timeout=5)
+        return _format_weather(city, response)
+    except Exception as e:
+        return f"Error retrieving weather: {str(e)}"
 
-        if "weather" not in data or "main" not in data:
-            return "⚠️ Unexpected response format. Please try again later."
+async def aget_weather(city: str = "") -> str:
+    if not city:
+        city = await adetect_location_from_ip()
+        if not city:
+            return "I couldn't determine your location. Please provide a city name."
 
-        weather = data["weather"][0]["description"].capitalize()
-        temp = data["main"]["temp"]
-        feels_like = data["main"]["feels_like"]
-        humidity = data["main"]["humidity"]
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if not api_key:
+        return "Weather service is not configured properly, please check your API key."
 
-        return (
-            f"The weather in {city.title()} is {weather}, "
-            f"{temp}°C (feels like {feels_like}°C), "
-            f"with {humidity}% humidity."
-        )
+    params = {"q": city, "appid": api_key, "units": "metric"}
 
+    try:
+        response = await ahttp_get(WEATHER_URL, params=params, timeout=5)
+        return _format_weather(city, response)
     except Exception as e:
         return f"Error retrieving weather: {str(e)}"
 
 # Tool: Convert currency using exchangerate-api.com
+# Conversions are computed locally from a periodically refreshed rate table
+# (see tools/currency_rates.py), so only a table refresh touches the network.
+_CURRENCY_QUERY = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([A-Za-z]{3})\s+(?:to|in|into)\s+(.+)", re.IGNORECASE)
+_CURRENCY_TARGET_SEPARATORS = {"AND"}
+
+def _parse_currency_query(query: str):
+    """'100 USD to INR, EUR and GBP' -> ('100', 'USD', ['INR', 'EUR', 'GBP'])"""
+    match = _CURRENCY_QUERY.search(query)
+    if not match:
+        return None
+    amount, from_curr, rest = match.groups()
+    targets = []
+    for code in re.findall(r"\b[A-Za-z]{3}\b", rest):
+        code = code.upper()
+        if code not in _CURRENCY_TARGET_SEPARATORS and code not in targets:
+            targets.append(code)
+    if not targets:
+        return None
+    return amount.replace(",", ""), from_curr.upper(), targets
+
+def _format_conversion(amount: str, from_curr: str, to_currs: list, table) -> str:
+    # The parser takes every three-letter word after "to" ("INR for me" -> INR, FOR),
+    # so targets the rate table does not know are dropped rather than failing the query
+    targets = [code for code in to_currs if code in table]
+    if from_curr not in table or not targets:
+        unknown = [code for code in [from_curr, *to_currs] if code not in table]
+        return f"Failed to convert from {from_curr} to {', '.join(to_currs)}. Error: unsupported-code {', '.join(unknown)}"
+
+    to_currs = targets
+    value = float(amount)
+    if len(to_currs) == 1:
+        converted = table.convert(value, from_curr, to_currs[0])
+        return f"As of today's exchange rates, {amount} {from_curr} is approximately {converted:.2f} {to_currs[0]}."
+    lines = [f"- {table.convert(value, from_curr, code):.2f} {code}" for code in to_currs]
+    return f"As of today's exchange rates, {amount} {from_curr} is approximately:\n" + "\n".join(lines)
+
 def convert_currency(query: str) -> str:
     """
     Converts currency using exchangerate-api.com
-    Format: '100 USD to INR'
+    Format: '100 USD to INR' or '100 USD to INR, EUR and GBP'
     """
-    match = re.search(r"(\d+(?:\.\d+)?)\s*([A-Za-z]{3})\s+(?:to|in)\s+([A-Za-z]{3})", query)
-    if not match:
+    parsed = _parse_currency_query(query)
+    if not parsed:
         return "Please format your query like '100 USD to INR'."
 
-    amount, from_curr, to_curr = match.groups()
-    from_curr = from_curr.upper()
-    to_curr = to_curr.upper()
+    amount, from_curr, to_currs = parsed
     api_key = os.environ.get("EXCHANGE_RATE_API_KEY")
 
     if not api_key:
         return "Currency API key not set. Please configure EXCHANGE_RATE_API_KEY."
 
     try:
-        url = f"https://v6.exchangerate-api.com/v6/{api_key}/pair/{from_curr}/{to_curr}/{amount}"
-        response = requests.get(url)
-        data = response.json()
+        return _format_conversion(amount, from_curr, to_currs, currency_engine.table(api_key))
+    except Exception as e:
+        return f"Error during currency conversion: {str(e)}"
 
-        if data["result"] == "success":
-            converted = data["conversion_result"]
-            return f"As of today's exchange rates,{amount} {from_curr} is approximately {converted:.2f} {to_curr}."
-        else:
-            return f"Failed to convert from {from_curr} to {to_curr}. Error: {data.get('error-type', 'Unknown error')}"
+async def aconvert_currency(query: str) -> str:
+    parsed = _parse_currency_query(query)
+    if not parsed:
+        return "Please format your query like '100 USD to INR'."
 
+    amount, from_curr, to_currs = parsed
+    api_key = os.environ.get("EXCHANGE_RATE_API_KEY")
+
+    if not api_key:
+        return "Currency API key not set. Please configure EXCHANGE_RATE_API_KEY."
+
+    try:
+        return _format_conversion(amount, from_curr, to_currs, await currency_engine.atable(api_key))
     except Exception as e:
         return f"Error during currency conversion: {str(e)}"
 
-# Tool: Search YouTube videos using SerpAPI  
+# Tool: Search YouTube videos using SerpAPI
+def _format_videos(results: dict) -> str:
+    videos = [link(r.get("title"), r.get("link"), r.get("snippet")) for r in results.get("organic_results", [])[:3]]
+    return Videos(results=videos).to_text() if videos else "No videos found."
+
 def search_youtube_videos(query: str) -> str:
     """Uses SerpAPI to search YouTube and return top 2–3 recent videos."""
-    from serpapi import GoogleSearch
-    import os
-
-    search = GoogleSearch({
-        "q": f"{query} site:youtube.com",
-        "api_key": os.environ["SERPAPI_API_KEY"]
-    })
+    try:
+        results = serpapi_get_dict({
+            "q": f"{query} site:youtube.com",
+            "api_key": os.environ["SERPAPI_API_KEY"]
+        })
+        return _format_videos(results)
+    except Exception as e:
+        return f"Error fetching YouTube videos: {str(e)}"
 
+async def asearch_youtube_videos(query: str) -> str:
     try:
-        results = search.get_dict()
-        video_links = []
-        for result in results.get("organic_results", [])[:3]:
-            title = result.get("title")
-            link = result.get("link")
-            snippet = result.get("snippet", "")
-            video_links.append(f"**{title}**\n{snippet}\n🔗 {link}\n")
-        
-        return "\n".join(video_links) if video_links else "No videos found."
+        results = await aserpapi_get_dict({
+            "q": f"{query} site:youtube.com",
+            "api_key": os.environ["SERPAPI_API_KEY"]
+        })
+        return _format_videos(results)
     except Exception as e:
         return f"Error fetching YouTube videos: {str(e)}"
-    
-# Tool: Search Amazon products using SerpAPI
+
+# Tool: Search e-commerce storefronts (Amazon, Flipkart, ...) using SerpAPI
+# Storefronts are queried concurrently; override the list with e.g.
+# ECOMMERCE_STOREFRONTS="amazon.in,flipkart.com,croma.com"
+ECOMMERCE_STOREFRONTS = [
+    s.strip() for s in os.getenv("ECOMMERCE_STOREFRONTS", "amazon.in,flipkart.com").split(",") if s.strip()
+]
+ECOMMERCE_SOURCE_DEADLINE = float(os.getenv("ECOMMERCE_SOURCE_DEADLINE", "8"))
+
+def _extract_listings(results: dict) -> list:
+    listings = []
+    for r in results.get("organic_results", [])[:3]:
+        listings.append(link(r.get("title"), r.get("link"), r.get("snippet")))
+    return listings
+
+def _listing_keys(listing: list):
+    title, url, _ = listing
+    return url.split("?")[0].split("#")[0].rstrip("/").lower(), " ".join(title.lower().split())
+
+def _merge_storefront_results(per_site: dict, sites: list, missing: list) -> str:
+    """Merges listings in storefront order, dropping duplicates by canonical link or title."""
+    seen_links, seen_titles = set(), set()
+    merged = {}
+
+    for site in sites:
+        items = []
+        for listing in per_site.get(site, []):
+            link_key, title_key = _listing_keys(listing)
+            if (link_key and link_key in seen_links) or title_key in seen_titles:
+                continue
+            seen_links.add(link_key)
+            seen_titles.add(title_key)
+            items.append(listing)
+        if items:
+            merged[site] = items
+
+    return Products(results=merged, missing=missing).to_text()
+
+def _ecommerce_params(query: str, site: str) -> dict:
+    return {
+        "q": f"{query} site:{site}",
+        "api_key": os.environ["SERPAPI_API_KEY"]
+    }
+
 def e_commerce_search(query: str) -> str:
-    """Searches Amazon and Flipkart via SerpAPI and combines results with product links."""
-    from serpapi import GoogleSearch
-    import os
+    """Searches Amazon, Flipkart and other configured storefronts concurrently via SerpAPI."""
+    sites = ECOMMERCE_STOREFRONTS
+    deadline = ECOMMERCE_SOURCE_DEADLINE
+
+    def fetch_results(site: str):
+        return lambda: _extract_listings(
+            serpapi_get_dict(_ecommerce_params(query, site), timeout=deadline)
+        )
+
+    try:
+        outcome = fan_out({site: fetch_results(site) for site in sites}, deadline)
+        if not outcome.results and outcome.failed:
+            raise next(iter(outcome.failed.values()))
+        missing = outcome.timed_out + list(outcome.failed)
+        return _merge_storefront_results(outcome.results, sites, missing)
 
-    serpapi_key = os.environ["SERPAPI_API_KEY"]
+    except Exception as e:
+        return f"❌ Error fetching product info: {str(e)}"
+
+async def ae_commerce_search(query: str) -> str:
+    sites = ECOMMERCE_STOREFRONTS
+    deadline = ECOMMERCE_SOURCE_DEADLINE
 
     def fetch_results(site: str):
-        search = GoogleSearch({
-            "q": f"{query} site:{site}",
-            "api_key": serpapi_key
-        })
-        results = search.get_dict()
-        items = []
-        for r in results.get("organic_results", [])[:3]:
-            title = r.get("title", "No title")
-            link = r.get("link", "")
-            snippet = r.get("snippet", "")
-            
-            item_str = (
-                f"**{title}**\n"
-                f"{snippet}\n"
-                f"[🛒 View Product]({link})\n"
-                f"---"
-            )
-            items.append(item_str)
-        return items
+        async def fetch():
+            results = await aserpapi_get_dict(_ecommerce_params(query, site), timeout=deadline)
+            return _extract_listings(results)
+        return fetch
 
     try:
-        amazon_results = fetch_results("amazon.in")
-        flipkart_results = fetch_results("flipkart.com")
-
-        all_results = [
-            "### 🛒 Amazon Results:\n",
-            *amazon_results,
-            "\n### 🛍️ Flipkart Results:\n",
-            *flipkart_results
-        ]
-
-        return "\n\n".join(all_results)
-    
+        outcome = await afan_out({site: fetch_results(site) for site in sites}, deadline)
+        if not outcome.results and outcome.failed:
+            raise next(iter(outcome.failed.values()))
+        missing = outcome.timed_out + list(outcome.failed)
+        return _merge_storefront_results(outcome.results, sites, missing)
+
     except Exception as e:
         return f"❌ Error fetching product info: {str(e)}"
 
 
-# Tool: Lookup Indian holidays using the 'holidays' library
+# Tool: Lookup Indian holidays using a precomputed index over the 'holidays' library
 def lookup_indian_holidays(query: str) -> str:
-    """Answers questions about Indian holidays using the 'holidays' library."""
+    """Answers questions about Indian (optionally state-level) holidays."""
     try:
         today = datetime.date.today()
-        india_holidays = holidays.country_holidays('IN', years=range(today.year, today.year + 2))
+        state = detect_state(query)
+        india_holidays = get_holiday_index(state)
+        region = state_name(state) if state else "India"
 
         query_lower = query.lower()
 
         if "today" in query_lower:
-            return f"✅ Today is a holiday: {india_holidays.get(today)}" if today in india_holidays else "❌ Today is not a holiday in India."
+            name = india_holidays.get(today)
+            return f"✅ Today is a holiday: {name}" if name else f"❌ Today is not a holiday in {region}."
 
         elif "tomorrow" in query_lower:
             tomorrow = today + datetime.timedelta(days=1)
-            return f"✅ Tomorrow is a holiday: {india_holidays.get(tomorrow)}" if tomorrow in india_holidays else "❌ Tomorrow is not a holiday in India."
+            name = india_holidays.get(tomorrow)
+            return f"✅ Tomorrow is a holiday: {name}" if name else f"❌ Tomorrow is not a holiday in {region}."
 
         elif "this month" in query_lower:
-            holidays_this_month = {
-                date: name for date, name in india_holidays.items()
-                if date.month == today.month and date >= today
-            }
+            holidays_this_month = india_holidays.in_month(today.year, today.month, start=today)
             if not holidays_this_month:
-                return "No holidays remaining this month in India."
-            return "📅 Holidays this month:\n" + "\n".join([f"{date.strftime('%d %b %Y')}: {name}" for date, name in holidays_this_month.items()])
+                return f"No holidays remaining this month in {region}."
+            return "📅 Holidays this month:\n" + "\n".join([f"{date.strftime('%d %b %Y')}: {name}" for date, name in holidays_this_month])
 
         elif any(char.isdigit() for char in query):  # if there's a specific date
             from dateutil import parser
             try:
                 target_date = parser.parse(query, fuzzy=True).date()
-                if target_date in india_holidays:
-                    return f"✅ {target_date.strftime('%d %b %Y')} is a holiday: {india_holidays.get(target_date)}"
+                name = india_holidays.get(target_date)
+                if name:
+                    return f"✅ {target_date.strftime('%d %b %Y')} is a holiday: {name}"
                 else:
-                    return f"❌ {target_date.strftime('%d %b %Y')} is not a public holiday in India."
+                    return f"❌ {target_date.strftime('%d %b %Y')} is not a public holiday in {region}."
             except:
                 return "Couldn't understand the date. Please rephrase."
 
         else:
             # Default: show next 5 upcoming holidays
-            upcoming = sorted([d for d in india_holidays if d >= today])[:5]
-            return "🗓️ Next 5 public holidays in India:\n" + "\n".join(
-                [f"{d.strftime('%d %b %Y')}: {india_holidays[d]}" for d in upcoming]
+            upcoming = india_holidays.upcoming(today, 5)
+            return f"🗓️ Next 5 public holidays in {region}:\n" + "\n".join(
+                [f"{d.strftime('%d %b %Y')}: {name}" for d, name in upcoming]
             )
 
     except Exception as e:
         return f"Error checking holidays: {str(e)}"
 
+async def alookup_indian_holidays(query: str) -> str:
+    # Pure local computation, no I/O
+    return lookup_indian_holidays(query)
+
 
 # Tool: Get live train status
 class TrainStatusInput(BaseModel):
@@ -264,90 +452,117 @@ class TrainStatusInput(BaseModel):
 
 RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
 RAPIDAPI_HOST = "irctc1.p.rapidapi.com"
+RAPIDAPI_IRCTC_URL = os.getenv("RAPIDAPI_IRCTC_URL", f"https://{RAPIDAPI_HOST}")
 
-# Tool: Get live train status
-def get_train_live_status(train_number: str, start_day: str = "1") -> str:
-    """Fetches the live running status of a train with enriched details."""
-    url = "https://irctc1.p.rapidapi.com/api/v1/liveTrainStatus"
-    headers = {
+def _rapidapi_headers() -> dict:
+    return {
         "x-rapidapi-key": RAPIDAPI_KEY,
         "x-rapidapi-host": RAPIDAPI_HOST,
     }
+
+TRAIN_STATUS_URL = f"{RAPIDAPI_IRCTC_URL}/api/v1/liveTrainStatus"
+
+def _format_train_status(data: dict) -> str:
+    if not data.get("status", False):
+        return f"❌ Could not fetch live status. Reason: {data.get('message', 'Unknown error')}"
+
+    d = data["data"]
+    platform = d.get("platform_number")
+    return TrainStatus(
+        train=d["train_number"],
+        name=d["train_name"],
+        source=d.get("source_stn_name"),
+        dest=d.get("dest_stn_name"),
+        departs=d.get("std"),
+        run_days=d.get("run_days"),
+        journey_min=d.get("journey_time"),
+        pantry=bool(d.get("pantry_available")),
+        station=d.get("current_station_name"),
+        eta=d.get("eta"),
+        scheduled=d.get("cur_stn_sta"),
+        delay_min=d.get("delay"),
+        ahead=d.get("ahead_distance_text"),
+        platform=platform if platform and platform > 0 else None,
+        updated=d.get("status_as_of"),
+    ).to_text()
+
+# Tool: Get live train status
+def get_train_live_status(train_number: str, start_day: str = "1") -> str:
+    """Fetches the live running status of a train with enriched details."""
     params = {"trainNo": train_number, "startDay": start_day}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        data = response.json()
+        response = http_get(TRAIN_STATUS_URL, headers=_rapidapi_headers(), params=params)
+        return _format_train_status(response.json())
+    except Exception as e:
+        return f"⚠️ Error fetching train status: {str(e)}"
 
-        if not data.get("status", False):
-            return f"❌ Could not fetch live status. Reason: {data.get('message', 'Unknown error')}"
-
-        d = data["data"]
-
-        # Format journey time from minutes to "x hrs y mins"
-        journey_mins = d.get("journey_time", 0)
-        hours = journey_mins // 60
-        minutes = journey_mins % 60
-        journey_time_str = f"{hours} hrs {minutes} mins"
-
-        # Handle platform and pantry info
-        platform = d.get("platform_number")
-        platform_str = str(platform) if platform and platform > 0 else "Not assigned"
-        pantry = "Yes" if d.get("pantry_available", False) else "No"
-
-        return (
-            f"🚆 **Train {d['train_number']} - {d['train_name']}**\n"
-            f"📅 Run Days: {d.get('run_days', 'N/A')}\n"
-            f"🛤️ Route: {d.get('source_stn_name', 'N/A')} ➝ {d.get('dest_stn_name', 'N/A')}\n"
-            f"⏱️ Departure Time: {d.get('std', 'N/A')}\n"
-            f"⌛ Journey Time: {journey_time_str}\n"
-            f"🍱 Pantry Available: {pantry}\n\n"
-            f"📍 **Current Station**: {d.get('current_station_name', 'N/A')}\n"
-            f"🕒 ETA: {d.get('eta', 'N/A')} | Scheduled: {d.get('cur_stn_sta', 'N/A')}\n"
-            f"🔄 Delay: {d.get('delay', 'N/A')} mins\n"
-            f"📏 Ahead Distance: {d.get('ahead_distance_text', 'N/A')}\n"
-            f"🛑 Platform: {platform_str}\n"
-            f"🕓 Last Updated: {d.get('status_as_of', 'N/A')}"
-        )
+async def aget_train_live_status(train_number: str, start_day: str = "1") -> str:
+    params = {"trainNo": train_number, "startDay": start_day}
 
+    try:
+        response = await ahttp_get(TRAIN_STATUS_URL, headers=_rapidapi_headers(), params=params)
+        return _format_train_status(response.json())
     except Exception as e:
         return f"⚠️ Error fetching train status: {str(e)}"
 
 
 # Tool: Get PNR status
+PNR_STATUS_URL = f"{RAPIDAPI_IRCTC_URL}/api/v3/getPNRStatus"
+
+def _format_pnr_status(pnr_number: str, data: dict) -> str:
+    if not data.get("status", False):
+        return f"❌ Could not fetch PNR status. Reason: {data.get('message', 'Unknown error')}"
+
+    d = data["data"]
+    return PnrStatus(
+        pnr=pnr_number,
+        train=d["train_number"],
+        name=d["train_name"],
+        date=d["journey_date"],
+        boarding=d["boarding_point"],
+        upto=d["reservation_upto"],
+        passengers=[[p["booking_status"], p["current_status"]] for p in d["passengers"]],
+    ).to_text()
+
 def get_pnr_status(pnr_number: str) -> str:
     """Fetches the PNR status using IRCTC1 API."""
-    url = "https://irctc1.p.rapidapi.com/api/v3/getPNRStatus"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": RAPIDAPI_HOST,
-    }
     params = {"pnrNumber": pnr_number}
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        data = response.json()
-
-        if not data.get("status", False):
-            return f"❌ Could not fetch PNR status. Reason: {data.get('message', 'Unknown error')}"
+        response = http_get(PNR_STATUS_URL, headers=_rapidapi_headers(), params=params)
+        return _format_pnr_status(pnr_number, response.json())
+    except Exception as e:
+        return f"⚠️ Error fetching PNR status: {str(e)}"
 
-        d = data["data"]
-        train_info = f"🚆 {d['train_number']} - {d['train_name']}"
-        journey = f"{d['boarding_point']} → {d['reservation_upto']}"
-        date = d["journey_date"]
-        passengers = "\n".join([
-            f"👤 Passenger {p['no']}: {p['booking_status']} ➡ {p['current_status']}"
-            for p in d["passengers"]
-        ])
+async def aget_pnr_status(pnr_number: str) -> str:
+    params = {"pnrNumber": pnr_number}
 
-        return (
-            f"📋 **PNR: {pnr_number}**\n{train_info}\n📅 Date: {date}\n🛤 Route: {journey}\n{passengers}"
-        )
+    try:
+        response = await ahttp_get(PNR_STATUS_URL, headers=_rapidapi_headers(), params=params)
+        return _format_pnr_status(pnr_number, response.json())
     except Exception as e:
         return f"⚠️ Error fetching PNR status: {str(e)}"
 
 
 AVIATIONSTACK_KEY = os.getenv("AVIATIONSTACK_KEY")
+FLIGHTS_URL = os.getenv("FLIGHTS_URL", "http://api.aviationstack.com/v1/flights")
+
+def _format_flight_status(data: dict) -> str:
+    flights = data.get("data", [])
+    if not flights:
+        return "No flight found for that code."
+
+    flight = flights[0]
+    dep = flight["departure"]
+    arr = flight["arrival"]
+    return FlightStatus(
+        flight=flight["flight"]["iata"],
+        airline=flight["airline"]["name"],
+        status=flight["flight_status"],
+        dep=[dep["airport"], dep["scheduled"]],
+        arr=[arr["airport"], arr["scheduled"]],
+    ).to_text()
 
 # Tool: Get flight status
 def get_flight_status(flight_query: str) -> str:
@@ -355,83 +570,80 @@ def get_flight_status(flight_query: str) -> str:
     Query flight status using Aviationstack.
     Input examples: "UA246", "AI101"
     """
-    url = "http://api.aviationstack.com/v1/flights"
     params = {"access_key": AVIATIONSTACK_KEY, "flight_iata": flight_query}
     try:
-        res = requests.get(url, params=params)
-        data = res.json()
-        flights = data.get("data", [])
-        if not flights:
-            return "No flight found for that code."
-
-        flight = flights[0]
-        dep = flight["departure"]
-        arr = flight["arrival"]
-        return (
-            f"✈️ Flight **{flight['flight']['iata']} ({flight['airline']['name']})**\n"
-            f"Departure: {dep['airport']} at {dep['scheduled']}\n"
-            f"Arrival: {arr['airport']} at {arr['scheduled']}\n"
-            f"Status: {flight['flight_status']}"
-        )
+        res = http_get(FLIGHTS_URL, params=params)
+        return _format_flight_status(res.json())
+    except Exception as e:
+        return f"Error fetching flight data: {e}"
+
+async def aget_flight_status(flight_query: str) -> str:
+    params = {"access_key": AVIATIONSTACK_KEY, "flight_iata": flight_query}
+    try:
+        res = await ahttp_get(FLIGHTS_URL, params=params)
+        return _format_flight_status(res.json())
     except Exception as e:
         return f"Error fetching flight data: {e}"
 
 # Tool: Get FD rates from BankBazaar
+def _format_fd_rates(bank_name: str) -> str:
+    query = parse_fd_query(bank_name)
+    tenure = query["tenure"] if query["tenure"] in fd_rate_store.tenures() else DEFAULT_TENURE
+    requested = query["tenure"] if query["tenure"] and query["tenure"] != tenure else None
+
+    def rows(rates):
+        return [[r.bank, r.general, r.senior] for r in rates]
+
+    if query["bank"]:
+        matched = fd_rate_store.match_banks(query["bank"], tenure)
+        if matched:
+            others = [r for r in fd_rate_store.top(len(matched) + 3, tenure, query["senior"]) if r not in matched][:3]
+            return FdRates(tenure=tenure, requested=requested, banks=rows(matched), others=rows(others)).to_text()
+    top = fd_rate_store.top(query["top"] or 5, tenure, query["senior"])
+    return FdRates(tenure=tenure, requested=requested, banks=rows(top)).to_text()
+
 def get_fd_rates(bank_name: str = "") -> str:
     """
-    Scrape 1-year FD rates from BankBazaar.
-    If a bank name is provided, show its rate + 3 more top banks.
+    FD rates from BankBazaar, answered from the background-refreshed rate store.
+    If a bank name is provided, show its rate + 3 more top banks; "top N" and
+    "senior citizen" queries are ranked by the matching rate.
     """
-    url = "https://www.bankbazaar.com/fixed-deposit/5years-fd-interest-rates.html"
     try:
-        res = requests.get(url, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
-        table = soup.select_one("table")
-        rows = table.select("tr")[1:]  # skip table header
-
-        all_rates = []
-        matched_bank = []
-
-        for row in rows:
-            cols = [c.get_text(strip=True) for c in row.select("td")]
-            bank = cols[0]
-            general = cols[1]
-            senior = cols[2]
-            formatted = f"🏦 {bank}: {general} (General), {senior} (Senior)"
-            all_rates.append(formatted)
-
-            if bank_name and bank_name.lower() in bank.lower():
-                matched_bank.append(formatted)
-
-        if bank_name and matched_bank:
-            others = [r for r in all_rates if r not in matched_bank][:3]
-            return "\n".join(matched_bank + ["\n📊 Here are a few other banks:"] + others)
-        else:
-            return "\n".join(all_rates[:5])  # top 5 fallback
-
+        fd_rate_store.ensure_loaded()
+        return _format_fd_rates(bank_name)
     except Exception as e:
         return f"⚠️ Error fetching FD rates: {str(e)}"
 
+async def aget_fd_rates(bank_name: str = "") -> str:
+    if fd_rate_store.loaded:
+        return get_fd_rates(bank_name)
+    # The first load scrapes and parses the page; don't stall other conversations on the loop
+    return await asyncio.to_thread(get_fd_rates, bank_name)
+
 # Tool: Search real-time recharge plans
+def _recharge_query(operator_and_amount: str) -> dict:
+    api_key = os.getenv("SERPAPI_API_KEY")
+    q = f"{operator_and_amount} recharge plans site:paytm.com OR site:airtel.in OR site:jio.com"
+    return {"q": q, "api_key": api_key, "num": 3}
+
+def _format_recharge_plans(results: dict) -> str:
+    plans = [link(r.get("title"), r.get("link"), r.get("snippet")) for r in results.get("organic_results", [])]
+    return RechargePlans(results=plans).to_text() if plans else "No real-time recharge data found."
+
 def search_recharge_plans(operator_and_amount: str) -> str:
     """
     Search real-time recharge plans for telecom operators using SerpAPI.
     e.g., "Airtel prepaid recharge plans under 500"
     """
-    api_key = os.getenv("SERPAPI_API_KEY")
-    q = f"{operator_and_amount} recharge plans site:paytm.com OR site:airtel.in OR site:jio.com"
-    
-    search = GoogleSearch({"q": q, "api_key": api_key, "num": 3})
     try:
-        results = search.get_dict()
-        items = []
-        for r in results.get("organic_results", []):
-            title = r.get("title", "")
-            snippet = r.get("snippet", "")
-            link = r.get("link", "")
-            items.append(f"**{title}**\n{snippet}\n🔗 {link}")
-        return "\n\n".join(items) if items else "No real-time recharge data found."
+        results = serpapi_get_dict(_recharge_query(operator_and_amount))
+        return _format_recharge_plans(results)
     except Exception as e:
         return f"Error fetching recharge plans: {e}"
 
-
+async def asearch_recharge_plans(operator_and_amount: str) -> str:
+    try:
+        results = await aserpapi_get_dict(_recharge_query(operator_and_amount))
+        return _format_recharge_plans(results)
+    except Exception as e:
+        return f"Error fetching recharge plans: {e}"
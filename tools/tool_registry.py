@@ -1,4 +1,7 @@
 from langchain_core.tools import Tool, StructuredTool
+from tools.tool_cache import tool_cache
+from tools.deadline import guard_tool
+from tools.single_flight import single_flight
 from tools.tool_functions import (
     get_current_time,
     search_wikipedia,
@@ -14,85 +17,120 @@ from tools.tool_functions import (
     TrainStatusInput,
     get_flight_status,
     get_fd_rates,
-    search_recharge_plans
+    search_recharge_plans,
+    aget_current_time,
+    asearch_wikipedia,
+    aserpapi_search,
+    aget_stock_price,
+    aget_weather,
+    aconvert_currency,
+    asearch_youtube_videos,
+    ae_commerce_search,
+    alookup_indian_holidays,
+    aget_train_live_status,
+    aget_pnr_status,
+    aget_flight_status,
+    aget_fd_rates,
+    asearch_recharge_plans,
 )
 
 tools = [
     Tool(
         name="Time",
         func=get_current_time,
+        coroutine=aget_current_time,
         description="Useful for when you need to know the current time.",
     ),
     Tool(
         name="Wikipedia",
         func=search_wikipedia,
+        coroutine=asearch_wikipedia,
         description="Use this tool to look up general knowledge or facts about people, places or topics using Wikipedia.",
     ),
     Tool(
         name="Google Search",
         func=serpapi_search,
+        coroutine=aserpapi_search,
         description="Use this tool for general web searches, news, events, or when no specific product listing is needed or anything that Wikipedia cannot answer.",
     ),
     Tool(
         name="Stock Price Checker",
         func=get_stock_price,
-        description="Use this tool to get real-time stock prices. Input should be a company ticker symbol like 'TSLA' or 'AAPL'.",
+        coroutine=aget_stock_price,
+        description="Use this tool to get real-time stock prices. Input should be one or more ticker symbols or company names like 'TSLA' or 'AAPL, MSFT and Infosys'.",
     ),
     Tool(
         name="Weather",
         func=get_weather,
+        coroutine=aget_weather,
         description="Use this tool to check the current weather of a city. Input should be a city name like 'Mumbai' or 'New York' or using the IP of the user to detect location automatically.",
     ),
     Tool(
         name="Currency Converter",
         func=convert_currency,
-        description="Use this to convert between currencies, like '100 USD to INR'."
+        coroutine=aconvert_currency,
+        description="Use this to convert between currencies, like '100 USD to INR'. Several target currencies can be converted in one call, like '100 USD to INR, EUR and GBP'."
     ),
     Tool(
         name="YouTube Video Search",
         func=search_youtube_videos,
+        coroutine=asearch_youtube_videos,
         description="Use this to find recent YouTube videos about a topic or person."
     ),
     Tool(
         name="E-commerce Product Search",
         func=e_commerce_search,
-        description="Use this tool to find and recommend actual products and listings (like phones, earbuds, laptops, etc.) from Amazon and Flipkart. "
-        "Always prefer this tool for any product-related questions."
-        "Include the tool output directly in your final answer instead of paraphrasing."
+        coroutine=ae_commerce_search,
+        description="Use this tool to find and recommend actual products and listings (like phones, earbuds, laptops, etc.) from Amazon, Flipkart and other online stores. "
+        "Always prefer this tool for any product-related questions. "
+        "It returns JSON listings ([title, url, snippet] per store); in your final answer, list the products "
+        "with their names and clickable markdown links instead of pasting the JSON."
     ),
     Tool(
         name="Indian Holiday Lookup",
         func=lookup_indian_holidays,
+        coroutine=alookup_indian_holidays,
         description="Use this to check if a specific date is a public holiday in India, or to see upcoming Indian holidays.",
     ),
     StructuredTool.from_function(
         name="Train Live Status Checker",
         description="Use this tool to get the live running status of a train. Input should include 'train_number' and optional 'start_day' (default is 1).",
         func=get_train_live_status,
+        coroutine=aget_train_live_status,
         args_schema=TrainStatusInput,
     ),
     Tool(
         name="PNR Status Checker",
         func=get_pnr_status,
+        coroutine=aget_pnr_status,
         description="Check Indian Railways PNR status using a 10-digit PNR number like '1234567890'."
     ),
     Tool(
         name="Flight Status Checker",
         func=get_flight_status,
+        coroutine=aget_flight_status,
         description="Get current status of a flight using its IATA flight code, e.g. 'AI101' or 'UA246'."
     ),
     Tool(
         name="FD Rates Checker",
         func=get_fd_rates,
+        coroutine=aget_fd_rates,
         description=(
-            "Fetch latest fixed deposit interest rates from BankBazaar. Always show rates from other banks as well if available"
+            "Fetch latest fixed deposit interest rates from BankBazaar. Input can be a bank name (e.g. 'SBI'), "
+            "'top 5' or 'top 3 senior citizen'. Always show rates from other banks as well if available"
         )
     ),
     Tool(
     name="Recharge Plan Search",
     func=search_recharge_plans,
+    coroutine=asearch_recharge_plans,
     description="Fetch real-time prepaid recharge plans for telecom operators like Airtel, Jio, VI via trusted sources."
 ),
 
 
-]
\ No newline at end of file
+]
+
+# Serve repeated calls from the shared TTL result cache (see tools/tool_cache.py);
+# cache misses run within the turn's time budget (see tools/deadline.py), and
+# concurrent identical misses share one upstream call (see tools/single_flight.py)
+tools = [tool_cache.wrap_tool(guard_tool(single_flight.wrap_tool(tool))) for tool in tools]